@@ -1,14 +1,16 @@
 from __future__ import annotations
-import asyncio, httpx, jwt
+import httpx, jwt
 from yarl import URL
+from .scheduler import HostScheduler
+from .streaming import PROBE_BYTES, read_capped
 
 ADMIN_GUESSES=["/admin","/dashboard","/manage","/settings","/api/admin"]
 USER_TEMPLATES=["/api/users/{id}","/users/{id}","/api/user/{id}","/user/{id}","/account/{id}","/profile/{id}"]
 
 class AccessControl:
-    def __init__(self, client: httpx.AsyncClient, reporter, settings):
+    def __init__(self, client: httpx.AsyncClient, reporter, settings, scheduler: HostScheduler|None=None):
         self.client=client; self.reporter=reporter; self.settings=settings
-        self.sem=asyncio.Semaphore(getattr(settings,"MAX_CONCURRENCY",40))
+        self.scheduler=scheduler or HostScheduler.from_settings(settings)
     async def run(self,endpoints:list[str]):
         tokens=getattr(self.settings,"ROLE_TOKENS",{}) or {}
         if not tokens: return
@@ -21,8 +23,8 @@ class AccessControl:
             url=str(URL(root).with_path(guess))
             for role,token in tokens.items():
                 try:
-                    async with self.sem:
-                        r=await self.client.get(url,headers={"Authorization":f"Bearer {token}"})
+                    async with self.scheduler.slot(url):
+                        r=await read_capped(self.client,url,PROBE_BYTES,headers={"Authorization":f"Bearer {token}"})
                     if r.status_code<400 and "admin" not in role.lower():
                         ev=f"Role '{role}' accessed admin path (status {r.status_code})"
                         curl=f"curl -i -H 'Authorization: Bearer {token}' '{url}'"
@@ -45,8 +47,8 @@ class AccessControl:
                     if other==role: continue
                     url=str(URL(root).with_path(tmpl.format(id=oid)))
                     try:
-                        async with self.sem:
-                            r=await self.client.get(url,headers={"Authorization":f"Bearer {token}"})
+                        async with self.scheduler.slot(url):
+                            r=await read_capped(self.client,url,PROBE_BYTES,headers={"Authorization":f"Bearer {token}"})
                         if r.status_code<400:
                             ev=f"Role '{role}' accessed resource of '{other}' (status {r.status_code})"
                             curl=f"curl -i -H 'Authorization: Bearer {token}' '{url}'"
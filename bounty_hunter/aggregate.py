@@ -0,0 +1,131 @@
+"""Finding aggregation before reporting and LLM triage.
+
+A single reflected parameter trips many probe variants, and every hit used
+to become its own ``write_finding`` call with its own LLM impact summary.
+:class:`FindingAggregator` folds hits on the same
+``(category, canonical endpoint, parameter)`` key into one
+:class:`Aggregate` that keeps the highest-confidence variant as the
+representative, the distinct variant URLs and a bounded set of evidence
+excerpts.  The report writer summarises and writes an aggregate once it has
+stopped changing, so LLM spend and disk writes scale with distinct issues
+rather than with requests.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from .canonical import endpoint_key
+
+__all__ = ["Aggregate", "FindingAggregator", "finding_key"]
+
+# Distinct variant URLs and evidence excerpts kept per aggregate.
+MAX_VARIANTS = 10
+MAX_EXCERPTS = 3
+EXCERPT_CHARS = 400
+
+Key = Tuple[str, str, str]
+
+
+def finding_key(f: Any) -> Key:
+    """``(category, canonical endpoint, parameter)`` of a Finding-ish object."""
+    return (
+        getattr(f, "category", "Finding"),
+        endpoint_key(getattr(f, "url", "")),
+        getattr(f, "param", "") or "",
+    )
+
+
+@dataclass
+class Aggregate:
+    key: Key
+    best: Any
+    confidence: float
+    hits: int = 1
+    variants: List[str] = field(default_factory=list)
+    excerpts: List[str] = field(default_factory=list)
+    updated: float = field(default_factory=time.monotonic)
+    dirty: bool = True
+    impact: str | None = None  # LLM summary of ``best``; reset when ``best`` changes
+
+    @property
+    def slug_source(self) -> str:
+        # The full key: an injected parameter need not be among the endpoint's query keys.
+        return " ".join(part for part in self.key if part)
+
+    def merge(self, f: Any) -> None:
+        self.hits += 1
+        conf = float(getattr(f, "confidence", 0.0))
+        if conf > self.confidence:
+            self.best, self.confidence = f, conf
+            self.impact = None
+        self._note(f)
+        self.updated = time.monotonic()
+        self.dirty = True
+
+    def _note(self, f: Any) -> None:
+        url = getattr(f, "url", "")
+        if url in self.variants or len(self.variants) >= MAX_VARIANTS:
+            return
+        self.variants.append(url)
+        excerpt = (getattr(f, "evidence", "") or "")[:EXCERPT_CHARS]
+        if excerpt and excerpt not in self.excerpts and len(self.excerpts) < MAX_EXCERPTS:
+            self.excerpts.append(excerpt)
+
+    def evidence(self) -> str:
+        """The representative's evidence, followed by the other variants."""
+        out = getattr(self.best, "evidence", "") or ""
+        others = [u for u in self.variants if u != getattr(self.best, "url", "")]
+        if others:
+            extra = self.hits - 1 - len(others)
+            out += f"\n\n-- {self.hits} matching requests; other variants --\n" + "\n".join(others)
+            if extra > 0:
+                out += f"\n(+{extra} more)"
+        return out
+
+    def prompt(self) -> str:
+        """LLM triage prompt covering every kept variant."""
+        category, endpoint, param = self.key
+        lines = [
+            f"URL: {getattr(self.best, 'url', '')}",
+            f"Method: {getattr(self.best, 'method', '')}",
+            f"Category: {category}",
+            f"Endpoint: {endpoint}" + (f" (parameter `{param}`)" if param else ""),
+            f"Matching requests: {self.hits}",
+            "Evidence:",
+        ]
+        body = "\n---\n".join(self.excerpts) or (getattr(self.best, "evidence", "") or "")
+        return "\n".join(lines) + "\n" + body[:1000]
+
+
+class FindingAggregator:
+    """Folds findings on :func:`finding_key`; see the module docstring."""
+
+    def __init__(self) -> None:
+        self.aggregates: Dict[Key, Aggregate] = {}
+        self.hits = 0
+
+    def add(self, f: Any) -> Aggregate:
+        self.hits += 1
+        key = finding_key(f)
+        agg = self.aggregates.get(key)
+        if agg is None:
+            agg = Aggregate(key=key, best=f, confidence=float(getattr(f, "confidence", 0.0)))
+            agg._note(f)
+            self.aggregates[key] = agg
+        else:
+            agg.merge(f)
+        return agg
+
+    def settled(self, quiet_s: float) -> List[Aggregate]:
+        """Changed aggregates with no new hit for ``quiet_s`` seconds (all if ``quiet_s <= 0``)."""
+        now = time.monotonic()
+        return [
+            a for a in self.aggregates.values()
+            if a.dirty and (quiet_s <= 0 or now - a.updated >= quiet_s)
+        ]
+
+    def summary(self) -> dict:
+        return {"hits": self.hits, "issues": len(self.aggregates)}
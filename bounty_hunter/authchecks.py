@@ -6,6 +6,9 @@ from typing import Dict, List
 import httpx
 from yarl import URL
 
+from .scheduler import HostScheduler
+from .streaming import read_capped
+
 
 COMMON_ADMIN_PATHS = [
     "/admin",
@@ -37,11 +40,17 @@ HEADER_PROFILES = {"desktop": DESKTOP_HEADERS, "mobile": MOBILE_HEADERS}
 
 
 class AuthChecker:
-    def __init__(self, client: httpx.AsyncClient, reporter, settings):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        reporter,
+        settings,
+        scheduler: HostScheduler | None = None,
+    ):
         self.client = client
         self.reporter = reporter
         self.settings = settings
-        self.sem = asyncio.Semaphore(settings.MAX_CONCURRENCY)
+        self.scheduler = scheduler or HostScheduler.from_settings(settings)
         self.sessions = self._build_sessions()
 
     def _build_sessions(self) -> List[Dict]:
@@ -78,11 +87,15 @@ class AuthChecker:
             results = []
             for sess in self.sessions:
                 try:
-                    async with self.sem:
-                        r = await self.client.get(
-                            url, headers=sess["headers"], cookies=sess["cookies"]
+                    async with self.scheduler.slot(url):
+                        r = await read_capped(
+                            self.client,
+                            url,
+                            4000,
+                            headers=sess["headers"],
+                            cookies=sess["cookies"],
                         )
-                    body = (r.text or "")[:4000]
+                    body = r.text
                     results.append((sess["name"], r.status_code, body))
 
                     if r.status_code in (200, 302, 301):
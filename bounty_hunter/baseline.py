@@ -0,0 +1,148 @@
+"""Baseline response clustering.
+
+Many harvested endpoints serve the same page: SPA catch-all routes,
+soft-404s and login redirects.  Before the expensive modules run, every
+endpoint is fetched once and reduced to a compact :class:`Fingerprint`
+(status, log-scale length bucket and a 64-bit simhash of the normalised
+body).  Endpoints on the same host whose fingerprints are near-identical
+join one :class:`Cluster`, and only its representative is tested.
+
+Near-duplicate lookup uses simhash banding: with a Hamming-distance budget
+of ``d`` the hash is split into ``d + 1`` bands, and any two hashes within
+the budget must agree on at least one band, so each lookup only compares
+against clusters sharing a band value.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import mmh3
+
+__all__ = ["Fingerprint", "Cluster", "BaselineClusterer", "fingerprint", "fingerprint_body", "simhash"]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_DIGITS_RE = re.compile(r"\d")
+_MASK64 = (1 << 64) - 1
+# Byte values with bit k set, for k in 0..7.
+_WITH_BIT = [[b for b in range(256) if b >> k & 1] for k in range(8)]
+
+
+def simhash(text: str) -> int:
+    """64-bit simhash over word tokens, with digits folded to ``0``.
+
+    Folding digits keeps timestamps, CSRF tokens and request IDs from
+    splitting otherwise identical pages.
+
+    Each distinct token is hashed once and its count added to a histogram
+    per hash byte; bit ``8j + k`` is set when the tokens with that bit
+    outweigh the rest.  That is the per-bit +1/-1 vote of the textbook
+    loop, at 8 updates per distinct token instead of 64 per token.
+    """
+    counts = Counter(_TOKEN_RE.findall(_DIGITS_RE.sub("0", text.lower())))
+    hist = [[0] * 256 for _ in range(8)]
+    for tok, n in counts.items():
+        for j, b in enumerate(mmh3.hash64(tok, signed=False)[0].to_bytes(8, "little")):
+            hist[j][b] += n
+    total = sum(counts.values())
+    out = 0
+    for j, h in enumerate(hist):
+        for k, values in enumerate(_WITH_BIT):
+            if 2 * sum(h[b] for b in values) > total:
+                out |= 1 << (8 * j + k)
+    return out
+
+
+def length_bucket(n: int) -> int:
+    """Log-scale length bucket (~19% wide), so small size jitter collapses."""
+    return int(math.log2(n + 1) * 4)
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    status: int
+    bucket: int
+    simhash: int
+
+
+def fingerprint(status: int, body: str, location: str = "") -> Fingerprint:
+    """Fingerprint a response; redirects are keyed on their Location path."""
+    if 300 <= status < 400 and location:
+        loc = urlsplit(location)
+        body = f"{loc.netloc} {loc.path}"
+    return Fingerprint(status=status, bucket=length_bucket(len(body)), simhash=simhash(body))
+
+
+def fingerprint_body(content: bytes, encoding: str, status: int, location: str = "") -> Fingerprint:
+    """:func:`fingerprint` over a raw body, for :class:`~bounty_hunter.parsers.ParserPool`."""
+    return fingerprint(status, content.decode(encoding, errors="replace"), location)
+
+
+@dataclass
+class Cluster:
+    representative: str
+    fingerprint: Fingerprint
+    members: List[str] = field(default_factory=list)
+
+
+class BaselineClusterer:
+    """Assigns endpoints to near-identical response clusters per host."""
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max(0, int(max_distance))
+        self._bands = self.max_distance + 1
+        self._width = 64 // self._bands
+        self.clusters: List[Cluster] = []
+        self._index: Dict[Tuple[str, int, int, int, int], List[int]] = {}
+
+    def _band_keys(self, host: str, fp: Fingerprint) -> List[Tuple[str, int, int, int, int]]:
+        mask = (1 << self._width) - 1
+        return [
+            (host, fp.status, fp.bucket, b, (fp.simhash >> (b * self._width)) & mask)
+            for b in range(self._bands)
+        ]
+
+    def add(self, url: str, fp: Fingerprint) -> Tuple[Cluster, bool]:
+        """Place ``url`` in a cluster; returns (cluster, is_new_cluster)."""
+        host = urlsplit(url).netloc.lower()
+        keys = self._band_keys(host, fp)
+        for key in keys:
+            for idx in self._index.get(key, ()):
+                c = self.clusters[idx]
+                if bin((c.fingerprint.simhash ^ fp.simhash) & _MASK64).count("1") <= self.max_distance:
+                    c.members.append(url)
+                    return c, False
+        c = Cluster(representative=url, fingerprint=fp, members=[url])
+        self.clusters.append(c)
+        for key in keys:
+            self._index.setdefault(key, []).append(len(self.clusters) - 1)
+        return c, True
+
+    def summary(self) -> dict:
+        endpoints = sum(len(c.members) for c in self.clusters)
+        return {
+            "endpoints": endpoints,
+            "clusters": len(self.clusters),
+            "skipped": endpoints - len(self.clusters),
+        }
+
+    def to_json(self) -> dict:
+        return {
+            **self.summary(),
+            "groups": [
+                {
+                    "representative": c.representative,
+                    "status": c.fingerprint.status,
+                    "length_bucket": c.fingerprint.bucket,
+                    "simhash": f"{c.fingerprint.simhash:016x}",
+                    "members": c.members,
+                }
+                for c in self.clusters
+                if len(c.members) > 1
+            ],
+        }
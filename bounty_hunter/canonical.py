@@ -0,0 +1,98 @@
+"""Path-template canonicalisation.
+
+REST APIs expose the same handler under thousands of concrete URLs
+(``/users/1`` … ``/users/5000``, ``?page=1..N``).  :func:`template` maps a
+URL to its route template by replacing ID-like path segments and query
+values with typed placeholders and sorting query keys, and
+:class:`TemplateSampler` admits only a bounded number of samples per
+template for testing.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List
+from urllib.parse import parse_qsl, urlsplit
+
+__all__ = ["template", "endpoint_key", "canonical_segment", "TemplateSampler"]
+
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+_HASH_RE = re.compile(r"^(?=.*\d)[0-9a-f]{16,128}$", re.I)
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)?$")
+_INT_RE = re.compile(r"^-?\d+$")
+
+
+def canonical_segment(seg: str) -> str:
+    """Replace an ID-like path segment or query value with a placeholder."""
+    if not seg:
+        return seg
+    if _INT_RE.match(seg):
+        return "{int}"
+    if _UUID_RE.match(seg):
+        return "{uuid}"
+    if _DATE_RE.match(seg):
+        return "{date}"
+    if _HASH_RE.match(seg):
+        return "{hash}"
+    return seg
+
+
+def template(url: str) -> str:
+    """Route template of ``url``: typed placeholders, sorted query keys, no fragment."""
+    parts = urlsplit(url)
+    path = "/".join(canonical_segment(s) for s in parts.path.split("/"))
+    query = sorted(
+        (k, canonical_segment(v)) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+    )
+    out = f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}"
+    if query:
+        out += "?" + "&".join(f"{k}={v}" for k, v in query)
+    return out
+
+
+def endpoint_key(url: str) -> str:
+    """Like :func:`template` but keeping only query *keys*, so probe payloads fold too."""
+    parts = urlsplit(url)
+    path = "/".join(canonical_segment(s) for s in parts.path.split("/"))
+    keys = sorted({k for k, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    out = f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}"
+    if keys:
+        out += "?" + "&".join(keys)
+    return out
+
+
+class TemplateSampler:
+    """Groups URLs by template and admits ``max_samples`` per group.
+
+    ``max_samples <= 0`` admits everything (grouping is still recorded).
+    """
+
+    def __init__(self, max_samples: int = 3):
+        self.max_samples = int(max_samples)
+        self.groups: Dict[str, List[str]] = {}
+        self.counts: Dict[str, int] = {}
+
+    def admit(self, url: str) -> bool:
+        """Record ``url``; True if it should be tested."""
+        t = template(url)
+        n = self.counts.get(t, 0) + 1
+        self.counts[t] = n
+        if self.max_samples > 0 and n > self.max_samples:
+            return False
+        self.groups.setdefault(t, []).append(url)
+        return True
+
+    def summary(self) -> dict:
+        urls = sum(self.counts.values())
+        admitted = sum(len(v) for v in self.groups.values())
+        return {"urls": urls, "templates": len(self.counts), "skipped": urls - admitted}
+
+    def to_json(self) -> dict:
+        return {
+            **self.summary(),
+            "groups": [
+                {"template": t, "count": n, "samples": self.groups[t]}
+                for t, n in sorted(self.counts.items(), key=lambda kv: -kv[1])
+                if n > len(self.groups[t])
+            ],
+        }
@@ -1,29 +1,75 @@
 from __future__ import annotations
 
-from typing import Dict, Set, List
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# (source category keyword, destination category keyword, label)
+CHAIN_RULES: Tuple[Tuple[str, str, str], ...] = (
+    ("redirect", "ssrf", "redirect → SSRF"),
+)
+
+
+def link_keys(endpoint: str) -> Iterable[Tuple[str, str]]:
+    """Keys two findings must share to be chained: the path and each query parameter."""
+    parsed = urlparse(endpoint)
+    if parsed.path:
+        yield ("path", parsed.path)
+    for p in parse_qs(parsed.query).keys():
+        yield ("param", p)
 
 
 class ChainAnalyzer:
-    """Suggest exploit chains based on finding relationships."""
+    """Suggest exploit chains between findings that share a parameter or path.
+
+    Findings are bucketed in an inverted index keyed by link key and chain
+    role (the keyword a category matches in :data:`CHAIN_RULES`), so building
+    it is linear in the findings and only (source, destination) pairs of a
+    rule that share a key are ever enumerated — never the full clique of
+    findings behind a common parameter.  At most ``max_per_rule``
+    suggestions are produced per rule.
+    """
 
-    def __init__(self, graph: Dict[str, Set[str]], items: List[Dict[str, str]]):
-        self.graph = graph
+    def __init__(self, items: List[Dict[str, str]], max_per_rule: int = 50):
         self.items = items
-        self.categories = {i["name"]: i.get("category", "").lower() for i in items}
+        self.max_per_rule = max_per_rule
+        roles = {r for rule in CHAIN_RULES for r in rule[:2]}
+        # link key -> role -> finding names
+        self.index: Dict[Tuple[str, str], Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for item in items:
+            cat = item.get("category", "").lower()
+            matched = [r for r in roles if r in cat]
+            endpoint = item.get("endpoint", "")
+            if not matched or not endpoint:
+                continue
+            for key in link_keys(endpoint):
+                for role in matched:
+                    self.index[key][role].append(item["name"])
+        self.graph: Dict[str, Set[str]] = {}
 
     def suggest(self) -> List[str]:
-        """Return simple chain recommendations."""
-        suggestions: Set[str] = set()
-        for src, targets in self.graph.items():
-            src_cat = self.categories.get(src, "")
-            for dst in targets:
-                dst_cat = self.categories.get(dst, "")
-                if self._is_redirect_ssrf(src_cat, dst_cat):
-                    suggestions.add(f"{src} → {dst} (redirect → SSRF)")
-                elif self._is_redirect_ssrf(dst_cat, src_cat):
-                    suggestions.add(f"{dst} → {src} (redirect → SSRF)")
+        """Return chain recommendations; :attr:`graph` holds the chained edges."""
+        suggestions: List[str] = []
+        for src_role, dst_role, label in CHAIN_RULES:
+            for src, dst in self._pairs(src_role, dst_role, self.max_per_rule):
+                self.graph.setdefault(src, set()).add(dst)
+                suggestions.append(f"{src} → {dst} ({label})")
         return sorted(suggestions)
 
-    @staticmethod
-    def _is_redirect_ssrf(a: str, b: str) -> bool:
-        return "redirect" in a and "ssrf" in b
+    def _pairs(self, src_role: str, dst_role: str, limit: Optional[int]) -> List[Tuple[str, str]]:
+        seen: Set[Tuple[str, str]] = set()
+        out: List[Tuple[str, str]] = []
+        for key in sorted(self.index):
+            buckets = self.index[key]
+            dsts = buckets.get(dst_role)
+            if not dsts or src_role not in buckets:
+                continue
+            for src in buckets[src_role]:
+                for dst in dsts:
+                    if src == dst or (src, dst) in seen:
+                        continue
+                    seen.add((src, dst))
+                    out.append((src, dst))
+                    if limit is not None and 0 < limit <= len(out):
+                        return out
+        return out
@@ -6,6 +6,7 @@ import typer
 from rich.console import Console
 from .config import Settings
 from .engine import run_scan
+from .worker import run_worker
 
 app = typer.Typer(no_args_is_help=True)
 console = Console()
@@ -23,6 +24,7 @@ def scan(
     resume: bool = typer.Option(False, help="Resume from saved state"),
     modules: str = typer.Option("modules.json", help="Module configuration file"),
     attack_chain: str = typer.Option(None, help="Name of attack chain in scripts/attack_flows"),
+    distributed: bool = typer.Option(False, help="Only enqueue work; `worker` processes test it"),
 ):
     s = Settings()
     if max_concurrency:
@@ -38,7 +40,7 @@ def scan(
     console.rule("[bold cyan]AI Bug Bounty Hunter")
     console.print(f"Program: [bold]{program}[/] | LLM: [bold]{s.LLM_PROVIDER}[/] | OOB: [bold]{s.OOB_ENABLED}[/]")
     console.print(f"Concurrency: {s.MAX_CONCURRENCY} (per-host {s.PER_HOST})\n")
-    asyncio.run(run_scan(targets, outdir, program, s, template=template, resume=resume, modules=module_flags))
+    asyncio.run(run_scan(targets, outdir, program, s, template=template, resume=resume, modules=module_flags, distributed=distributed))
     if attack_chain:
         from .lotl import run_attack_chain
 
@@ -48,3 +50,21 @@ def scan(
                 console.print(res.stdout)
             if res.stderr:
                 console.print(res.stderr, style="red")
+
+@app.command()
+def worker(
+    llm: str = typer.Option("none"),
+    max_concurrency: int = typer.Option(None),
+    per_host: int = typer.Option(None),
+    forever: bool = typer.Option(False, help="Keep polling after the current scan is drained"),
+):
+    """Process chunks from BH_REDIS_QUEUE for a `scan --distributed` coordinator."""
+    s = Settings()
+    if max_concurrency:
+        s.MAX_CONCURRENCY = max_concurrency
+    if per_host:
+        s.PER_HOST = per_host
+    s.LLM_PROVIDER = llm.lower()
+    console.rule("[bold cyan]AI Bug Bounty Hunter — worker")
+    console.print(f"Queue: [bold]{s.REDIS_QUEUE}[/] @ {s.REDIS_URL} | Workers: {s.WORKERS}")
+    asyncio.run(run_worker(s, forever=forever))
@@ -10,6 +10,8 @@ class Settings(BaseSettings):
     PER_HOST: int = Field(default=5, env="BH_PER_HOST")
     ADAPTIVE_RATE: bool = Field(default=False, env="BH_ADAPTIVE_RATE")
     PROXY_URL: str | None = Field(default=None, env="BH_PROXY_URL")
+    HTTP_CACHE_ENTRIES: int = Field(default=4096, env="BH_HTTP_CACHE_ENTRIES")
+    HTTP_CACHE_MB: int = Field(default=64, env="BH_HTTP_CACHE_MB")
 
     # Credential sets for auth testing
     USER_ROLES: dict[str, dict] = Field(default_factory=dict, env="BH_USER_ROLES")
@@ -19,6 +21,11 @@ class Settings(BaseSettings):
     LLM_PROVIDER: str = "none"  # none|openai
     OPENAI_API_KEY: str | None = None
     OPENAI_MODEL: str = Field(default="gpt-4o-mini")
+    LLM_CONCURRENCY: int = Field(default=4, env="BH_LLM_CONCURRENCY")
+    LLM_TIMEOUT_S: float = Field(default=30.0, env="BH_LLM_TIMEOUT_S")
+    LLM_CACHE_ENABLED: bool = Field(default=True, env="BH_LLM_CACHE")
+    LLM_CACHE_TTL_S: int = Field(default=7 * 86400, env="BH_LLM_CACHE_TTL_S")
+    LLM_CACHE_MAX_ENTRIES: int = Field(default=50_000, env="BH_LLM_CACHE_MAX_ENTRIES")
 
     # OOB SSRF
     OOB_ENABLED: bool = False
@@ -41,6 +48,61 @@ class Settings(BaseSettings):
     REDIS_QUEUE: str = Field(default="bh:tasks", env="BH_REDIS_QUEUE")
     CHUNK_SIZE: int = Field(default=50, env="BH_CHUNK_SIZE")
     WORKERS: int = Field(default=4, env="BH_WORKERS")
+    PIPELINE_QUEUE_SIZE: int = Field(default=1000, env="BH_PIPELINE_QUEUE_SIZE")
+
+    # False-positive rate of the compact seen-sets used for URL dedup
+    SEEN_ERROR_RATE: float = Field(default=1e-4, env="BH_SEEN_ERROR_RATE")
+
+    # Crawler: link depth from each target root, and page budgets
+    CRAWL_MAX_DEPTH: int = Field(default=3, env="BH_CRAWL_MAX_DEPTH")
+    CRAWL_MAX_PAGES_PER_HOST: int = Field(default=200, env="BH_CRAWL_MAX_PAGES_PER_HOST")
+    CRAWL_MAX_PAGES: int = Field(default=5000, env="BH_CRAWL_MAX_PAGES")
+    # URLs taken from sitemaps per host (0 = do not read sitemaps)
+    SITEMAP_MAX_URLS_PER_HOST: int = Field(default=50000, env="BH_SITEMAP_MAX_URLS_PER_HOST")
+
+    # Bytes of each JS bundle / source map downloaded and scanned
+    JS_MAX_BYTES: int = Field(default=5 * 1024 * 1024, env="BH_JS_MAX_BYTES")
+
+    # Subdomain enumeration cache (per apex domain) and DNS liveness filter
+    SUBDOMAIN_CACHE_TTL_S: int = Field(default=86400, env="BH_SUBDOMAIN_CACHE_TTL_S")
+    DNS_RESOLVERS: str = Field(default="", env="BH_DNS_RESOLVERS")
+    DNS_CONCURRENCY: int = Field(default=200, env="BH_DNS_CONCURRENCY")
+    DNS_TIMEOUT_S: float = Field(default=2.0, env="BH_DNS_TIMEOUT_S")
+    DNS_CACHE_ENABLED: bool = Field(default=True, env="BH_DNS_CACHE")
+    DNS_NEGATIVE_TTL_S: int = Field(default=3600, env="BH_DNS_NEGATIVE_TTL_S")
+
+    # JS bundle / source-map extraction cache (persistent, keyed by content hash)
+    JS_CACHE_ENABLED: bool = Field(default=True, env="BH_JS_CACHE")
+    JS_CACHE_MAX_ENTRIES: int = Field(default=100_000, env="BH_JS_CACHE_MAX_ENTRIES")
+
+    # HTML/JS extraction process pool (0 = one process per core)
+    PARSER_PROCESSES: int = Field(default=0, env="BH_PARSER_PROCESSES")
+    PARSER_INLINE_BYTES: int = Field(default=65536, env="BH_PARSER_INLINE_BYTES")
+
+    # Findings queued for the background report writer before producers wait
+    FINDINGS_QUEUE_SIZE: int = Field(default=1000, env="BH_FINDINGS_QUEUE_SIZE")
+
+    # Exploit-chain suggestions listed in INDEX.md per chain type
+    CHAIN_MAX_SUGGESTIONS: int = Field(default=50, env="BH_CHAIN_MAX_SUGGESTIONS")
+
+    # Seconds without a new hit before an aggregated finding is summarised and written
+    FINDINGS_SETTLE_S: float = Field(default=5.0, env="BH_FINDINGS_SETTLE_S")
+
+    # Resume journal: fsync at most once per this many seconds
+    JOURNAL_FSYNC_S: float = Field(default=1.0, env="BH_JOURNAL_FSYNC_S")
+
+    # Seconds a claimed chunk may go without a heartbeat before it is requeued
+    VISIBILITY_TIMEOUT_S: float = Field(default=300.0, env="BH_VISIBILITY_TIMEOUT_S")
+
+    # Samples tested per path template (/users/{int}, ?page={int}); 0 = all
+    TEMPLATE_SAMPLES: int = Field(default=3, env="BH_TEMPLATE_SAMPLES")
+
+    # Baseline clustering (skip near-identical soft-404 / catch-all responses)
+    BASELINE_MAX_DISTANCE: int = Field(default=3, env="BH_BASELINE_MAX_DISTANCE")
+    BASELINE_BYTES: int = Field(default=65536, env="BH_BASELINE_BYTES")
+
+    # Fuzzing: pack one probe into every common key per request, bisect on hits
+    FUZZ_PACK_PARAMS: bool = Field(default=True, env="BH_FUZZ_PACK")
      # Findings
     CONFIDENCE_THRESHOLD: float = Field(default=0.5, env="BH_CONFIDENCE_THRESHOLD")
  
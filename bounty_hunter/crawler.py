@@ -0,0 +1,275 @@
+"""Frontier-based recursive crawler.
+
+Harvest used to fetch ``robots.txt`` and the root page of each target and
+then guess a fixed list of paths, so nothing deeper than one level was ever
+seen.  :class:`Crawler` keeps one priority frontier across every host:
+pages are fetched shallowest first, login/admin/API-looking paths ahead of
+their depth peers, and hosts are interleaved by how many of their pages are
+already scheduled.  A depth limit and per-host and global page budgets bound
+the crawl, and only in-scope hosts (the targets and their subdomains) are
+followed or reported.  Sitemaps (see :mod:`bounty_hunter.sitemap`) are
+ingested per target, and their entries are reported without being fetched.
+
+Pages are parsed through the shared :class:`~bounty_hunter.parsers.ParserPool`
+(off the event loop unless small) and the seen-set is a compact
+:class:`~bounty_hunter.utils.SeenURLs`.  Every new
+in-scope URL is handed to ``on_url`` as soon as it is found, and forms and
+page-to-page navigations accumulate for :class:`~bounty_hunter.workflow.WorkflowAnalyzer`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+import httpx
+from yarl import URL
+
+from .parsers import PageExtract, ParserPool, extract_page, extract_urls, join_url
+from .scheduler import HostScheduler
+from .sitemap import ingest_sitemaps, sitemap_roots
+from .streaming import charset, read_capped
+from .utils import SeenURLs
+from .workflow import Form, Navigation
+
+__all__ = ["Crawler", "COMMON_PATHS"]
+
+# Guessed on every target; fetched like any depth-1 link.
+COMMON_PATHS = (
+    "/login",
+    "/signin",
+    "/admin",
+    "/api/",
+    "/api/v1/",
+    "/.well-known/security.txt",
+    "/.well-known/change-password",
+)
+
+# Reported as endpoints but never fetched as pages.
+STATIC_EXTS = (
+    ".js", ".mjs", ".map", ".css", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico",
+    ".webp", ".woff", ".woff2", ".ttf", ".eot", ".otf", ".pdf", ".zip", ".gz",
+    ".mp3", ".mp4", ".webm", ".avi", ".mov", ".xml", ".json", ".txt",
+)
+
+# Path fragments crawled ahead of other pages at the same depth.
+PRIORITY_HINTS = ("login", "signin", "signup", "register", "account", "admin", "api", "auth", "settings")
+
+# Per-page byte budget; the tail of huge pages is not worth the bandwidth.
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+
+class Crawler:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        scheduler: HostScheduler,
+        *,
+        max_depth: int = 3,
+        max_pages_per_host: int = 200,
+        max_pages: int = 5000,
+        workers: int = 8,
+        on_url: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_scripts: Optional[Callable[[List[str]], None]] = None,
+        seen_error_rate: float = 1e-4,
+        sitemap_max_urls: int = 0,
+        parser: Optional[ParserPool] = None,
+    ):
+        self.client = client
+        self.scheduler = scheduler
+        self.max_depth = max_depth
+        self.max_pages_per_host = max_pages_per_host
+        self.max_pages = max_pages
+        self.workers = max(1, workers)
+        self.on_url = on_url
+        self.on_scripts = on_scripts
+        self.sitemap_max_urls = sitemap_max_urls
+        self.parser = parser or ParserPool.default()
+        self.scope: Set[str] = set()
+        self.forms: List[Form] = []
+        self.navigations: List[Navigation] = []
+        self._frontier: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._seen = SeenURLs(seen_error_rate)
+        self._host_pages: Dict[str, int] = {}
+        self._pages: Set[str] = set()  # scheduled for fetching (bounded by max_pages)
+        self._closed = asyncio.Event()
+        self.scheduled = 0
+        self.pages = 0
+        self.over_budget = 0
+        self.out_of_scope = 0
+        self.frontier_max = 0
+        self.sitemap_documents = 0
+        self.sitemap_urls = 0
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls, client: httpx.AsyncClient, s, scheduler: HostScheduler, **kw) -> "Crawler":
+        return cls(
+            client,
+            scheduler,
+            max_depth=s.CRAWL_MAX_DEPTH,
+            max_pages_per_host=s.CRAWL_MAX_PAGES_PER_HOST,
+            max_pages=s.CRAWL_MAX_PAGES,
+            seen_error_rate=s.SEEN_ERROR_RATE,
+            sitemap_max_urls=s.SITEMAP_MAX_URLS_PER_HOST,
+            **kw,
+        )
+
+    def in_scope(self, url: str) -> bool:
+        host = URL(url).host or ""
+        return host in self.scope or any(host.endswith("." + s) for s in self.scope)
+
+    async def add_target(self, target: str) -> None:
+        """Seed a target: its root at depth 0, robots.txt links and common paths at
+        depth 1, then every URL its sitemaps list (reported, not crawled)."""
+        base = URL(target)
+        if base.host:
+            self.scope.add(base.host)
+        await self._found(str(base), 0)
+        robots = ""
+        try:
+            async with self.scheduler.slot(str(base)):
+                r = await read_capped(self.client, str(base.with_path("/robots.txt")), MAX_PAGE_BYTES)
+            if r.status_code < 400:
+                robots = r.text
+                for u in extract_urls(r.content, r.encoding):
+                    await self._found(u, 1)
+        except Exception:
+            pass
+        for p in COMMON_PATHS:
+            await self._found(str(base.with_path(p)), 1)
+        if self.sitemap_max_urls > 0:
+            st = await ingest_sitemaps(
+                self.client,
+                self.scheduler,
+                sitemap_roots(robots, str(base)),
+                self._listed,
+                max_urls_per_host=self.sitemap_max_urls,
+                allow=self.in_scope,
+            )
+            self.sitemap_documents += st["documents"]
+            self.sitemap_urls += st["urls"]
+
+    async def _listed(self, url: str) -> None:
+        # Sitemap entries are the inventory itself: report them without fetching.
+        await self._found(url, self.max_depth + 1)
+
+    def fetches(self, url: str) -> bool:
+        """True if ``url`` is crawled, so its script sources are reported through ``on_url``."""
+        return url in self._pages
+
+    def close(self) -> None:
+        """No more targets; :meth:`run` returns once the frontier drains."""
+        self._closed.set()
+
+    async def run(self) -> None:
+        """Crawl until :meth:`close` has been called and the frontier is empty."""
+        tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        try:
+            await self._closed.wait()
+            await self._frontier.join()
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._finished = time.monotonic()
+
+    async def crawl(self, targets: Iterable[str]) -> None:
+        """Seed ``targets`` and crawl to completion."""
+        runner = asyncio.ensure_future(self.run())
+        try:
+            await asyncio.gather(*(self.add_target(t) for t in targets))
+        finally:
+            self.close()
+        await runner
+
+    async def _found(self, url: str, depth: int) -> None:
+        if not url.startswith(("http://", "https://")):
+            return
+        if not self.in_scope(url):
+            self.out_of_scope += 1
+            return
+        if not self._seen.add(url):
+            return
+        # Schedule first: consumers of on_url may ask whether the page is crawled.
+        if depth <= self.max_depth and not URL(url).path.lower().endswith(STATIC_EXTS):
+            self._schedule(url, depth)
+        if self.on_url is not None:
+            await self.on_url(url)
+
+    def _schedule(self, url: str, depth: int) -> None:
+        u = URL(url)
+        host = u.host or ""
+        n = self._host_pages.get(host, 0)
+        if n >= self.max_pages_per_host or self.scheduled >= self.max_pages:
+            self.over_budget += 1
+            return
+        self._host_pages[host] = n + 1
+        self._pages.add(url)
+        self.scheduled += 1
+        hinted = any(h in u.path.lower() for h in PRIORITY_HINTS)
+        self._frontier.put_nowait((depth, 0 if hinted else 1, n, next(self._seq), url))
+        self.frontier_max = max(self.frontier_max, self._frontier.qsize())
+
+    async def _work(self) -> None:
+        while True:
+            depth, _, _, _, url = await self._frontier.get()
+            try:
+                page = await self._fetch(url)
+                if page is not None:
+                    await self._visit(url, depth, page)
+            except Exception:
+                pass
+            finally:
+                self._frontier.task_done()
+
+    async def _fetch(self, url: str) -> Optional[PageExtract]:
+        if self._started is None:
+            self._started = time.monotonic()
+        async with self.scheduler.slot(url):
+            async with self.client.stream("GET", url) as r:
+                if 300 <= r.status_code < 400 and r.headers.get("location"):
+                    return PageExtract(urls=[join_url(url, r.headers["location"])])
+                ct = r.headers.get("content-type", "")
+                if r.status_code >= 400 or "html" not in ct:
+                    return None
+                base, encoding = str(r.url), charset(r.headers)
+                body = bytearray()
+                async for chunk in r.aiter_bytes():
+                    body += chunk[: MAX_PAGE_BYTES - len(body)]
+                    if len(body) >= MAX_PAGE_BYTES:
+                        break  # leaving the context closes the stream
+        self.pages += 1
+        return await self.parser.run(extract_page, bytes(body), encoding, base)
+
+    async def _visit(self, url: str, depth: int, page: PageExtract) -> None:
+        if self.on_scripts is not None and page.scripts:
+            self.on_scripts(page.scripts)
+        for u in page.urls:
+            await self._found(u, depth + 1)
+        self.navigations.extend(
+            Navigation(source=url, target=u, text=text) for u, text in page.navs if self.in_scope(u)
+        )
+        self.forms.extend(
+            Form(url=url, action=action, method=method, inputs=inputs)
+            for action, method, inputs in page.forms
+        )
+
+    def stats(self) -> dict:
+        elapsed = (self._finished or time.monotonic()) - (self._started or time.monotonic())
+        return {
+            "pages": self.pages,
+            "hosts": len(self._host_pages),
+            "urls": len(self._seen),
+            "over_budget": self.over_budget,
+            "out_of_scope": self.out_of_scope,
+            "frontier_max": self.frontier_max,
+            "sitemap_documents": self.sitemap_documents,
+            "sitemap_urls": self.sitemap_urls,
+            "elapsed_s": elapsed,
+            "pages_per_s": self.pages / elapsed if elapsed > 0 else 0.0,
+        }
@@ -1,30 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
 import json
+import time
 from pathlib import Path
 from typing import Dict, Optional
 
 import anyio
-import httpx
 import redis.asyncio as redis
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
+from yarl import URL
 
 from .config import Settings
-from .harvest import harvest_from_targets
-from .workflow import WorkflowAnalyzer
-from .fuzz import FuzzCoordinator
+from .crawler import Crawler
+from .workflow import Form, Navigation, WorkflowAnalyzer
 from .report import ReportWriter
 from .llm import LLM
-from .redirects import RedirectChecker
-from .authchecks import AuthChecker
+from .jscache import JSCache
 from .jsminer import JSMiner
-from .oob import OOBSSRF
-from .signedurls import SignedURLChecker
-from .jwtcheck import JWTChecker
-from .access_control import AccessControl
-from .fingerprinter import Fingerprinter
-from .subdomains import enumerate_subdomains
+from .httpcache import CachedClient
+from .scheduler import HostScheduler, stage_var
+from .baseline import BaselineClusterer, fingerprint_body
+from .canonical import TemplateSampler
+from .streaming import read_capped
+from .resolver import DNSLiveness
+from .subdomains import SubdomainCache, enumerate_subdomains
+from .parsers import ParserPool
+from .pipeline import EOS, stage
+from .utils import EndpointsWriter, SeenURLs, iter_endpoints
+from .journal import Journal
+from .worker import MODULE_NAMES, build_client, consume, replay, run_modules
+from .workqueue import Claim, WorkQueue
 from scripts.diff_scope import diff_scope
 
 console = Console()
@@ -38,19 +46,29 @@ async def run_scan(
     template: str = "index",
     resume: bool = False,
     modules: Optional[Dict[str, bool]] = None,
+    distributed: bool = False,
 ) -> None:
     """
-    Orchestrates a scan:
-      - (optional) subdomain enum
-      - harvest endpoints
-      - (optional) workflow analysis
-      - (optional) JS mining for more endpoints
-      - queue endpoints in Redis and process with enabled modules
-      - persist state for resume and record scope diff
+    Orchestrates a scan as a streaming pipeline of bounded queues:
+      - targets + (optional) subdomain enum feed hosts into harvest
+      - harvested URLs flow into dedupe + (optional) JS mining
+      - endpoints are grouped by path template (IDs, UUIDs, hashes, dates,
+        query key order) and only BH_TEMPLATE_SAMPLES per template go on
+      - (optional) baseline: each new endpoint is fetched once and clustered
+        by response fingerprint; only cluster representatives are tested
+      - new endpoints are batched into Redis chunks as they appear and
+        processed by the enabled modules while discovery continues; chunks
+        are claimed reliably and requeued if a worker stalls
+      - distributed=True: no in-process workers; `bounty_hunter worker`
+        processes drain the queue and findings are collected from Redis
+      - (optional) workflow analysis once harvest has finished
+      - every dispatch and (endpoint, module) completion is appended to
+        journal.jsonl; resume schedules exactly the pairs not yet completed
+      - record scope diff
 
     `modules` keys you can toggle (default True):
       subdomains, workflow, jsminer, fuzz, redirects, auth, signedurls,
-      jwt, access_control, fingerprint, oob
+      jwt, access_control, fingerprint, oob, baseline
     """
     modules = {
         "subdomains": True,
@@ -64,11 +82,10 @@ async def run_scan(
         "access_control": True,
         "fingerprint": True,
         "oob": settings.OOB_ENABLED,  # honor global default
+        "baseline": True,
         **(modules or {}),
     }
 
-    state_file = outdir / "state.json"
-
     # Read targets
     targets = [
         t.strip()
@@ -84,104 +101,371 @@ async def run_scan(
         outdir = outdir / f"{int(anyio.current_time())}"
         outdir.mkdir(parents=True, exist_ok=True)
     else:
-        if not outdir.exists() or not state_file.exists():
+        if not outdir.exists() or not (outdir / "state.json").exists():
             console.print("[bold red]State file not found for resume.")
             return
+    state_file = outdir / "state.json"
+    journal_file = outdir / "journal.jsonl"
 
-    limits = httpx.Limits(
-        max_connections=settings.MAX_CONCURRENCY,
-        max_keepalive_connections=settings.MAX_CONCURRENCY,
-    )
-    timeout = httpx.Timeout(settings.TIMEOUT_S)
-    transport = httpx.HTTPTransport(retries=settings.RETRIES)
-    proxies = settings.PROXY_URL or None
-
-    async with httpx.AsyncClient(
-        http2=True,
-        limits=limits,
-        timeout=timeout,
-        transport=transport,
-        follow_redirects=False,
-        proxies=proxies,
-    ) as client:
-        # Redis
+    async with build_client(settings) as client:
+        # Redis work queue (shared with any `bounty_hunter worker` processes)
         rc = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        queue = WorkQueue(rc, settings.REDIS_QUEUE, settings.VISIBILITY_TIMEOUT_S)
+
+        # One scheduler for every module: global + per-host limits, fair across hosts
+        scheduler = HostScheduler.from_settings(settings)
+        scheduler.install(client)  # AIMD per-host limits when BH_ADAPTIVE_RATE
+
+        # Coalescing GET cache for modules that probe the same well-known paths.
+        # Fuzz/redirect/signed-URL/OOB requests are unique and go straight out.
+        probe_client = CachedClient.from_settings(client, settings)
+
+        # HTML/JS extraction runs in a process pool so parsing never blocks I/O.
+        parser = ParserPool.from_settings(settings)
+
+        # Create LLM + reporter (LLM cache is shared by all scans under the output root)
+        llm = LLM.from_settings(settings, cache_dir=outdir.parent)
+        reporter = ReportWriter(
+            base=outdir, program=program, template=template,
+            queue_size=settings.FINDINGS_QUEUE_SIZE,
+            settle_s=settings.FINDINGS_SETTLE_S,
+            max_chains=settings.CHAIN_MAX_SUGGESTIONS,
+        )
 
-        # Create LLM + reporter
-        llm = LLM.from_settings(settings)
-        reporter = ReportWriter(base=outdir, program=program, template=template)
-
-        # Two entry paths: resume (load state) vs fresh (discover endpoints)
+        # Streaming pipeline:
+        #   hosts → harvest → JS mining/dedupe → baseline clustering → Redis chunks → workers.
+        # Every hop is a bounded queue, so discovery and testing overlap.
+        qsize = settings.PIPELINE_QUEUE_SIZE
+        hosts_q: asyncio.Queue = asyncio.Queue(maxsize=qsize)
+        urls_q: asyncio.Queue = asyncio.Queue(maxsize=qsize)
+        baseline_q: asyncio.Queue = asyncio.Queue(maxsize=qsize)
+        endpoints_q: asyncio.Queue = asyncio.Queue(maxsize=qsize)
+        stage_workers = max(1, settings.MAX_CONCURRENCY // 2)
+
+        dispatched = 0  # endpoints sent for testing
+        seen = SeenURLs(settings.SEEN_ERROR_RATE)  # compact: million-URL scopes stay small
+        forms: list[Form] = []
+        navigations: list[Navigation] = []
+        started = time.monotonic()
+        first_dispatch: Optional[float] = None
+
+        test_modules = [m for m in MODULE_NAMES if modules.get(m)]
+
+        # Two entry paths: resume (replay the journal) vs fresh (discover endpoints)
+        journal = Journal(journal_file, fsync_s=settings.JOURNAL_FSYNC_S)
         if resume:
             state = json.loads(state_file.read_text())
-            endpoints = state.get("endpoints", [])
-            progress = int(state.get("progress", 0))
-            if not isinstance(endpoints, list):
-                console.print("[bold red]Corrupt state: endpoints not a list.")
-                return
+            if "journal" not in state:
+                # state.json from before the journal: endpoints + a progress index
+                saved = state.get("endpoints", [])
+                if not isinstance(saved, list):
+                    console.print("[bold red]Corrupt state: endpoints not a list.")
+                    journal.close()
+                    return
+                progress = int(state.get("progress", 0))
+                journal.queued(saved)
+                for m in test_modules:
+                    journal.done(saved[:progress], m)
+            journal.compact()
+            dispatched = len(journal.endpoints)
+            pending = sum(len(us) for _, us in journal.remaining(test_modules))
             console.print(
-                f"[yellow]Resuming:[/] {len(endpoints)} endpoints, progress={progress}"
+                f"[yellow]Resuming:[/] {dispatched} endpoints, {pending} with modules left"
             )
-        else:
-            # (optional) Subdomain enumeration
-            subs: list[str] = []
+        # Every distinct endpoint, streamed to endpoints.json as it is found
+        ep_file = outdir / "endpoints.json"
+        discovered = EndpointsWriter(ep_file)
+        if resume:
+            prior = iter_endpoints(ep_file) if ep_file.exists() else ()
+            for u in itertools.chain(prior, journal.endpoints):
+                if seen.add(u):
+                    discovered.write(u)
+        state = {"version": 2, "journal": journal_file.name, "modules": modules}
+        state_file.write_text(json.dumps(state, indent=2))
+
+        async def discover_hosts() -> None:
+            stage_var.set("discovery")
+            seen_hosts: set[str] = set()
+            for t in targets:
+                seen_hosts.add(t)
+                await hosts_q.put(t)
+            # (optional) Subdomain enumeration; discovered hosts stream into harvest
             if modules["subdomains"]:
-                subs = await enumerate_subdomains(client, targets)
+                sub_cache = (
+                    SubdomainCache(outdir.parent / "subdomain_cache.sqlite3", settings.SUBDOMAIN_CACHE_TTL_S)
+                    if settings.SUBDOMAIN_CACHE_TTL_S > 0
+                    else None
+                )
+                liveness = DNSLiveness.from_settings(settings, cache_dir=outdir.parent)
+                try:
+                    subs = await enumerate_subdomains(client, targets, cache=sub_cache)
+                    # Most historical names no longer resolve; drop them before any request.
+                    live = set(await liveness.filter(URL(s).host for s in subs))
+                finally:
+                    liveness.close()
+                    if sub_cache is not None:
+                        sub_cache.close()
                 if subs:
+                    st = liveness.stats()
                     console.print(
                         f"[cyan]＋[/] Subdomain enumerator discovered "
-                        f"[bold]{len(subs)}[/] hosts"
+                        f"[bold]{len(subs)}[/] hosts, [bold]{len(live)}[/] resolve "
+                        f"({st['cached']} DNS answers cached, {st['errors']} lookups failed)"
                     )
-                # Extend scan targets with discovered subs
-                all_targets = targets + subs
+                subs = [s for s in subs if URL(s).host in live]
+                for s in subs:
+                    if s not in seen_hosts:
+                        seen_hosts.add(s)
+                        await urls_q.put(s)
+                        await hosts_q.put(s)
+            await hosts_q.put(EOS)
+
+        js_cache = (
+            JSCache(outdir.parent / "js_cache.sqlite3", max_entries=settings.JS_CACHE_MAX_ENTRIES)
+            if settings.JS_CACHE_ENABLED
+            else None
+        )
+        miner = JSMiner(probe_client, settings, scheduler, parser, cache=js_cache)
+        mined_count = 0
+
+        # One priority frontier across every host; new URLs stream out as found, and
+        # the script sources of crawled pages go straight to the JS miner.
+        crawler = Crawler.from_settings(
+            probe_client, settings, scheduler, workers=stage_workers, on_url=urls_q.put, parser=parser,
+            on_scripts=miner.add_scripts if modules["jsminer"] else None,
+        )
+        miner.crawled = crawler.fetches
+
+        async def crawl() -> None:
+            stage_var.set("harvest")
+            async with anyio.create_task_group() as cg:
+                cg.start_soon(crawler.run)
+                await stage(hosts_q, None, crawler.add_target, stage_workers, "harvest")
+                crawler.close()
+            forms.extend(crawler.forms)
+            navigations.extend(crawler.navigations)
+            if modules["jsminer"]:
+                # Scripts of the last pages crawled, not yet picked up by a mine_url call.
+                for m in await miner.mine([]):
+                    await urls_q.put(m)
+            await urls_q.put(EOS)
+
+        sampler = TemplateSampler(settings.TEMPLATE_SAMPLES)
+
+        def sampled(url: str) -> bool:
+            # Non-HTTP pseudo-endpoints (e.g. secret://) are never grouped.
+            return not url.startswith(("http://", "https://")) or sampler.admit(url)
+
+        async def dedupe_and_mine(url: str) -> list[str]:
+            nonlocal mined_count
+            if not seen.add(url):
+                return []
+            discovered.write(url)
+            if not sampled(url):
+                return []
+            out = [url]
+            # (optional) JS miner: mined endpoints are deduped but not mined again
+            if modules["jsminer"]:
+                for m in await miner.mine_url(url):
+                    if seen.add(m):
+                        discovered.write(m)
+                        mined_count += 1
+                        if sampled(m):
+                            out.append(m)
+            return out
+
+        clusterer = BaselineClusterer(settings.BASELINE_MAX_DISTANCE)
+
+        async def baseline(url: str) -> list[str]:
+            """Forward ``url`` only if its response starts a new cluster."""
+            stage_var.set("baseline")
+            if not url.startswith(("http://", "https://")):
+                return [url]
+            try:
+                async with scheduler.slot(url):
+                    r = await read_capped(probe_client, url, settings.BASELINE_BYTES)
+            except Exception:
+                return [url]
+            fp = await parser.run(
+                fingerprint_body, r.content, r.encoding, r.status_code, r.headers.get("location", "")
+            )
+            _, is_new = clusterer.add(url, fp)
+            return [url] if is_new else []
+
+        async def analyze_workflows() -> None:
+            analyzer = WorkflowAnalyzer(forms, navigations, llm)
+            for wf, issues, llm_notes in await analyzer.analyze():
+                if issues or llm_notes:
+                    console.print("[yellow]Workflow issues detected:[/]")
+                    for issue in issues:
+                        console.print(f" - {issue}")
+                    if llm_notes:
+                        console.print(f" [LLM] {llm_notes}")
+
+        async def discovery() -> None:
+            stage_var.set("discovery")
+            async with anyio.create_task_group() as dg:
+                dg.start_soon(discover_hosts)
+                dg.start_soon(crawl)
+            st = crawler.stats()
+            console.print(
+                f"[green]\u2714[/] Crawl finished: {st['pages']} pages from {st['hosts']} hosts "
+                f"in {st['elapsed_s']:.1f}s ({st['pages_per_s']:.1f} pages/s), "
+                f"{st['urls']} URLs ({st['sitemap_urls']} from {st['sitemap_documents']} sitemaps), "
+                f"{len(forms)} forms, {len(navigations)} navigations; "
+                f"{st['over_budget']} over budget, {st['out_of_scope']} out of scope"
+            )
+            # (optional) Workflow analyzer needs every form, so it runs after harvest
+            if modules["workflow"]:
+                await analyze_workflows()
+
+        async def enqueue() -> None:
+            """Batch new endpoints into Redis chunks, with backpressure on queue length."""
+            nonlocal first_dispatch, dispatched
+            batch: list[str] = []
+
+            async def push(chunk: list[str], only: Optional[list[str]] = None) -> None:
+                nonlocal first_dispatch
+                while await queue.backlog() >= settings.WORKERS * 2:
+                    await asyncio.sleep(0.2)
+                await queue.push(chunk, only)
+                if first_dispatch is None:
+                    first_dispatch = time.monotonic() - started
+
+            # Resume: dispatch only the (endpoint, module) pairs the journal lacks
+            for missing, urls in journal.remaining(test_modules):
+                only = None if list(missing) == test_modules else list(missing)
+                for i in range(0, len(urls), settings.CHUNK_SIZE):
+                    await push(urls[i : i + settings.CHUNK_SIZE], only)
+            while True:
+                item = await endpoints_q.get()
+                if item is EOS:
+                    break
+                dispatched += 1
+                batch.append(item)
+                if len(batch) >= settings.CHUNK_SIZE:
+                    journal.queued(batch)
+                    await push(batch)
+                    batch = []
+            if batch:
+                journal.queued(batch)
+                await push(batch)
+            await queue.close()
+
+        async def handle(claim: Claim) -> None:
+            async def done(module: str) -> None:
+                journal.done(claim.endpoints, module)
+
+            await run_modules(
+                claim.endpoints,
+                modules,
+                client=client,
+                probe_client=probe_client,
+                llm=llm,
+                reporter=reporter,
+                settings=settings,
+                scheduler=scheduler,
+                only=claim.modules,
+                on_done=done,
+            )
+
+        async def worker() -> None:
+            await consume(queue, handle)
+
+        async def record(rec: dict) -> None:
+            if rec.get("kind") == "done":
+                journal.done(rec["endpoints"], rec["module"])
             else:
-                all_targets = targets
+                await replay(rec, reporter, llm)
 
-            # Harvest endpoints (forms, navigations, URLs)
-            with Progress(
-                SpinnerColumn(), TextColumn("[progress.description]{task.description}")
-            ) as p:
-                p.add_task(description="Harvesting endpoints…", total=None)
-                harvest_res = await harvest_from_targets(client, all_targets, settings)
+        async def collect() -> None:
+            """Distributed mode: write findings and completions published by workers."""
+            last_reap = 0.0
+            while True:
+                rec = await queue.collect(timeout=1)
+                if rec is not None:
+                    await record(rec)
+                    continue
+                if time.monotonic() - last_reap >= queue.visibility_s / 4:
+                    last_reap = time.monotonic()
+                    await queue.requeue_stalled()
+                if await queue.drained():
+                    while (rec := await queue.collect_nowait()) is not None:
+                        await record(rec)
+                    return
+
+        # Reset the queue for this run and publish module toggles for workers
+        await queue.reset({"modules": modules})
+
+        # Run discovery, dedupe/mining, dispatch and workers concurrently
+        async with anyio.create_task_group() as tg:
+            if resume:
+                await endpoints_q.put(EOS)
+            else:
+                tg.start_soon(discovery)
+                if modules["baseline"]:
+                    tg.start_soon(
+                        stage, urls_q, baseline_q, dedupe_and_mine, stage_workers, "jsminer"
+                    )
+                    tg.start_soon(
+                        stage, baseline_q, endpoints_q, baseline, stage_workers, "baseline"
+                    )
+                else:
+                    tg.start_soon(
+                        stage, urls_q, endpoints_q, dedupe_and_mine, stage_workers, "jsminer"
+                    )
+            tg.start_soon(enqueue)
+            if distributed:
+                console.print("[cyan]Distributed:[/] waiting for `bounty_hunter worker` processes")
+                tg.start_soon(collect)
+            else:
+                for _ in range(settings.WORKERS):
+                    tg.start_soon(worker)
 
-            endpoints = sorted(set(harvest_res.endpoints + subs))
+        await rc.aclose()
+        parser.shutdown()
 
+        console.print(
+            f"[green]\u2714[/] Tested [bold]{dispatched}[/] endpoints"
+            + (f" ({mined_count} from JS miner)" if mined_count else "")
+        )
+        if first_dispatch is not None:
             console.print(
-                f"[green]\u2714[/] Harvested [bold]{len(endpoints)}[/] candidate endpoints"
+                f"[cyan]Pipeline:[/] first chunk dispatched after {first_dispatch:.1f}s, "
+                f"total {time.monotonic() - started:.1f}s"
             )
 
-            # (optional) Workflow analyzer
-            if modules["workflow"]:
-                analyzer = WorkflowAnalyzer(
-                    harvest_res.forms, harvest_res.navigations, llm
-                )
-                for wf, issues, llm_notes in await analyzer.analyze():
-                    if issues or llm_notes:
-                        console.print("[yellow]Workflow issues detected:[/]")
-                        for issue in issues:
-                            console.print(f" - {issue}")
-                        if llm_notes:
-                            console.print(f" [LLM] {llm_notes}")
-
-            # (optional) JS miner
-            if modules["jsminer"]:
-                mined = await JSMiner(client, settings).mine(endpoints)
-                if mined:
-                    console.print(
-                        f"[cyan]＋[/] JS miner discovered [bold]{len(mined)}[/] extra candidates"
-                    )
-                    endpoints.extend(mined)
-
-            endpoints = sorted(set(endpoints))
+        templates = sampler.summary()
+        if templates["skipped"]:
+            (outdir / "templates.json").write_text(json.dumps(sampler.to_json(), indent=2))
+            console.print(
+                f"[cyan]Templates:[/] {templates['urls']} URLs in {templates['templates']} "
+                f"path templates; skipped {templates['skipped']} beyond "
+                f"{settings.TEMPLATE_SAMPLES} samples each"
+            )
 
-            # Persist initial state
-            state = {"endpoints": endpoints, "progress": 0}
-            state_file.write_text(json.dumps(state, indent=2))
-            progress = 0
+        if clusterer.clusters:
+            summary = clusterer.summary()
+            tested = max(1, summary["clusters"])
+            per_endpoint = scheduler.requests["modules"] / tested
+            report = {
+                **clusterer.to_json(),
+                "baseline_requests": scheduler.requests["baseline"],
+                "module_requests": scheduler.requests["modules"],
+                "estimated_requests_saved": int(summary["skipped"] * per_endpoint),
+            }
+            (outdir / "baseline.json").write_text(json.dumps(report, indent=2))
+            console.print(
+                f"[cyan]Baseline:[/] {summary['endpoints']} endpoints in "
+                f"{summary['clusters']} clusters; skipped {summary['skipped']} near-duplicates "
+                f"(≈{report['estimated_requests_saved']} module requests saved for "
+                f"{report['baseline_requests']} baseline requests)"
+            )
 
-        # Persist endpoints.json and compute scope diff versus previous scan dir
-        ep_file = outdir / "endpoints.json"
-        ep_file.write_text(json.dumps(endpoints, indent=2))
+        # Compact the journal, write endpoints.json and compute scope diff versus previous scan dir
+        journal.compact()
+        journal.close()
+        discovered.close()
         scope_note = ""
         parent = outdir.parent
         prev_dirs = sorted(
@@ -199,83 +483,60 @@ async def run_scan(
                 if added or removed:
                     scope_note = f"+{len(added)}/-{len(removed)} endpoints since last scan"
 
-        # Reset queue for this run
-        await rc.delete(settings.REDIS_QUEUE)
+        throttled = {
+            h: n for h, n in scheduler.limits().items() if n < scheduler.per_host
+        }
+        if throttled:
+            console.print(
+                f"[yellow]Adaptive rate:[/] {len(throttled)} hosts throttled below "
+                f"per-host limit {scheduler.per_host}"
+            )
 
-        # Chunk endpoints into Redis list
-        for i in range(progress, len(endpoints), settings.CHUNK_SIZE):
-            chunk = endpoints[i : i + settings.CHUNK_SIZE]
-            await rc.rpush(settings.REDIS_QUEUE, json.dumps(chunk))
+        if parser.offloaded:
+            console.print(
+                f"[cyan]Parser pool:[/] {parser.offloaded} documents parsed in "
+                f"{parser.processes} processes, {parser.inline} inline"
+            )
 
-        progress_lock = anyio.Lock()
+        st = probe_client.stats()
+        console.print(
+            f"[cyan]HTTP cache:[/] {st['hits']} hits, {st['coalesced']} coalesced, "
+            f"{st['misses']} fetched"
+        )
 
-        async def worker() -> None:
-            nonlocal progress
-            # Module runners (respect toggles)
-            while True:
-                item = await rc.blpop(settings.REDIS_QUEUE, timeout=1)
-                if not item:
-                    break
-                _, payload = item
-                chunk = json.loads(payload)
-
-                # Fuzzing
-                if modules["fuzz"]:
-                    await FuzzCoordinator(
-                        client=client, llm=llm, reporter=reporter, settings=settings
-                    ).run(chunk)
-
-                # Redirects
-                if modules["redirects"]:
-                    await RedirectChecker(client, reporter, settings).run(chunk)
-
-                # Auth checks
-                if modules["auth"]:
-                    await AuthChecker(client, reporter, settings).run(chunk)
-
-                # Signed URLs
-                if modules["signedurls"]:
-                    await SignedURLChecker(client, reporter, settings).run(chunk)
-
-                # JWT checks
-                if modules["jwt"]:
-                    await JWTChecker(client, reporter, settings).run(chunk)
-
-                # Access control
-                if modules["access_control"]:
-                    await AccessControl(client, reporter, settings).run(chunk)
-
-                # Fingerprinter
-                if modules["fingerprint"]:
-                    for fp in await Fingerprinter(client, settings).run(chunk):
-                        await reporter.generic_finding(
-                            category=f"Fingerprint: {fp.product}",
-                            endpoint=fp.endpoint,
-                            evidence=(
-                                f"mmh3={fp.hash} headers="
-                                f"{dict(list(fp.headers.items())[:10])}\n{fp.notes}"
-                            ),
-                            curl=f"curl -i '{fp.endpoint}'",
-                        )
-
-                # OOB SSRF
-                if modules["oob"]:
-                    await OOBSSRF(client, reporter, settings).run(chunk)
-
-                # Progress/state update
-                async with progress_lock:
-                    progress += len(chunk)
-                    state["progress"] = progress
-                    state_file.write_text(json.dumps(state, indent=2))
-
-        # Fan out workers
-        async with anyio.create_task_group() as tg:
-            for _ in range(settings.WORKERS):
-                tg.start_soon(worker)
+        if js_cache is not None:
+            st = js_cache.stats()
+            console.print(
+                f"[cyan]JS cache:[/] {st['hits']} hits ({st['revalidated']} revalidated), "
+                f"{st['misses']} parsed"
+            )
+            js_cache.close()
 
-        await rc.aclose()
+        await reporter.flush()
+        st = reporter.stats()
+        console.print(
+            f"[cyan]Findings:[/] {st['hits']} hits aggregated into {st['issues']} issues "
+            f"({st['llm_summaries']} LLM summaries)"
+        )
+        console.print(
+            f"[cyan]Findings writer:[/] {st['written']} written, {st['coalesced']} coalesced, "
+            f"max queue depth {st['max_depth']}, flush {st['flush_avg_ms']:.1f} ms avg / "
+            f"{st['flush_max_ms']:.1f} ms max"
+        )
 
-        # Finish index markdown and print final location
+        # Finish index markdown (rendered from the findings store) and print final location
         (outdir / "INDEX.md").write_text(reporter.finish_index(scope_note))
+        await reporter.aclose()
+
+        # Reported and closed last: flushing the reporter may still ask the LLM for summaries.
+        if llm.enabled:
+            st = llm.stats()
+            console.print(
+                f"[cyan]LLM:[/] {st['calls']} calls, {st['cached']} cache hits, "
+                f"{st['coalesced']} coalesced"
+            )
+        if llm.cache is not None:
+            llm.cache.close()
+
         console.rule("[bold green]Done")
         console.print(f"Reports: [bold]{outdir}[/]")
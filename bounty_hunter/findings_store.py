@@ -0,0 +1,108 @@
+"""Structured store for report findings.
+
+Every finding the :class:`~bounty_hunter.report.ReportWriter` emits is
+also written as a row to ``findings.sqlite3`` in the scan directory, keyed
+by its slug (the Markdown file stem), so the index, chain graph and report
+templates are rendered from indexed rows instead of re-reading and
+scraping every Markdown file.  The Markdown files remain as derived output.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+__all__ = ["FindingsStore", "FIELDS"]
+
+# Columns besides the slug, in table order.
+FIELDS = (
+    "category",
+    "endpoint",
+    "method",
+    "confidence",
+    "severity",
+    "score",
+    "vector",
+    "curl",
+    "headers",
+    "body",
+    "evidence",
+    "impact",
+)
+
+_DEFAULTS: Dict[str, Any] = {"confidence": None, "score": 0.0}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    slug TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    method TEXT NOT NULL DEFAULT '',
+    confidence REAL,
+    severity TEXT NOT NULL DEFAULT '',
+    score REAL NOT NULL DEFAULT 0,
+    vector TEXT NOT NULL DEFAULT '',
+    curl TEXT NOT NULL DEFAULT '',
+    headers TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL DEFAULT '',
+    evidence TEXT NOT NULL DEFAULT '',
+    impact TEXT NOT NULL DEFAULT '',
+    updated REAL NOT NULL
+)
+"""
+
+
+class FindingsStore:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.created = not self.path.exists()
+        # The report writer flushes from a worker thread; use is never concurrent.
+        self._db = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.execute("CREATE INDEX IF NOT EXISTS findings_category ON findings(category)")
+
+    def put(self, slug: str, **fields: Any) -> None:
+        """Insert or replace the finding ``slug`` (same slug, same file: last wins)."""
+        row = [fields.get(f, _DEFAULTS.get(f, "")) for f in FIELDS]
+        self._db.execute(
+            f"INSERT OR REPLACE INTO findings (slug, {', '.join(FIELDS)}, updated) "
+            f"VALUES ({', '.join('?' * (len(FIELDS) + 2))})",
+            (slug, *row, time.time()),
+        )
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """:meth:`put` for a batch, in one transaction."""
+        now = time.time()
+        rows = [
+            (slug, *[fields.get(f, _DEFAULTS.get(f, "")) for f in FIELDS], now)
+            for slug, fields in items
+        ]
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO findings (slug, {', '.join(FIELDS)}, updated) "
+                f"VALUES ({', '.join('?' * (len(FIELDS) + 2))})",
+                rows,
+            )
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Every finding, ordered by slug (the order of the Markdown files)."""
+        cur = self._db.execute(f"SELECT slug, {', '.join(FIELDS)} FROM findings ORDER BY slug")
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, r)) for r in cur]
+
+    def __len__(self) -> int:
+        (n,) = self._db.execute("SELECT COUNT(*) FROM findings").fetchone()
+        return n
+
+    def close(self) -> None:
+        self._db.close()
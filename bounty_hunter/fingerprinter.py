@@ -2,12 +2,15 @@ from __future__ import annotations
 import json, httpx, mmh3
 from dataclasses import dataclass
 from yarl import URL
+from .scheduler import HostScheduler
+from .streaming import PROBE_BYTES, read_capped
 FAVICON_DB_BUILTIN={"116323821":{"product":"Jenkins","notes":"Default favicon"},"-203227154":{"product":"Apache Tomcat","notes":"Default favicon"},"-1581907337":{"product":"SonarQube","notes":"Default favicon"}}
+FAVICON_MAX_BYTES=256*1024
 @dataclass
 class FingerprintFinding: endpoint: str; product: str; hash: str; headers: dict; notes: str
 class Fingerprinter:
-    def __init__(self, client: httpx.AsyncClient, settings):
-        self.client=client; self.settings=settings
+    def __init__(self, client: httpx.AsyncClient, settings, scheduler: HostScheduler|None=None):
+        self.client=client; self.settings=settings; self.scheduler=scheduler or HostScheduler.from_settings(settings)
     async def run(self,endpoints:list[str])->list[FingerprintFinding]:
         roots=sorted({str(URL(u).with_path("/")) for u in endpoints if URL(u).scheme in ("http","https")}); out=[]
         db=dict(FAVICON_DB_BUILTIN)
@@ -17,12 +20,13 @@ class Fingerprinter:
             except Exception: pass
         for root in roots:
             try:
-                r=await self.client.get(root); headers={k.lower():v for k,v in r.headers.items()}
+                async with self.scheduler.slot(root): r=await read_capped(self.client,root,PROBE_BYTES)
+                headers={k.lower():v for k,v in r.headers.items()}
             except Exception:
                 headers={}
             fav=str(URL(root).with_path("/favicon.ico"))
             try:
-                fr=await self.client.get(fav)
+                async with self.scheduler.slot(fav): fr=await read_capped(self.client,fav,FAVICON_MAX_BYTES)
                 if fr.status_code<400 and fr.content:
                     h=mmh3.hash(fr.content); entry=db.get(str(h))
                     if entry:
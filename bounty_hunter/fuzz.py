@@ -3,7 +3,6 @@ from __future__ import annotations
 import asyncio
 from dataclasses import dataclass
 from typing import Optional, Sequence, Iterable, Mapping
-from collections import deque
 
 import httpx
 from yarl import URL
@@ -17,17 +16,14 @@ from .payloads import (
     HEADERS_MUTATIONS,
 )
 from . import mutate  # needed by both branches
+from .canonical import template
 from .report import ReportWriter
 from .llm import LLM
+from .scheduler import HostScheduler
+from .streaming import read_capped, stream_capped
 
-# --- signatures import (backward-compat across branches) ----------------------
-try:
-    from .signatures import XSS_PATTERNS, SQLI_ERRORS, SSTI_PATTERNS
-except Exception:
-    # Older/main branch names
-    from .signatures import XSS_REFLECTION as XSS_PATTERNS  # type: ignore
-    from .signatures import SQLI_ERRORS  # type: ignore
-    from .signatures import SSTI_REFLECTION as SSTI_PATTERNS  # type: ignore
+# --- signatures import ---------------------------------------------------------
+from .signatures import MATCHER
 
 try:
     from .signatures import RESPONSE_TIME_THRESHOLD as DEFAULT_RTT_THRESHOLD  # type: ignore
@@ -35,6 +31,28 @@ except Exception:
     DEFAULT_RTT_THRESHOLD = 2.5  # seconds (sane default)
 
 
+# Bytes of each response body inspected for indicators.
+BODY_BYTES = 8000
+
+# Status codes that suggest a WAF blocked the probe.
+BLOCK_CODES = {403, 406}
+
+
+def _categories_for(category: str) -> tuple[str, ...]:
+    """Signature categories checked for a probe category (LLM variants: all)."""
+    if category == "LLM-variant":
+        return ("xss", "sqli", "ssti", "ssrf")
+    for prefix, name in (("XSS", "xss"), ("SQLi", "sqli"), ("SSTI", "ssti"), ("SSRF", "ssrf")):
+        if category.startswith(prefix):
+            return (name,)
+    return ()
+
+
+def _marker(i: int) -> str:
+    """Per-key marker appended to packed values so reflections identify the key."""
+    return f"bhk{i:02d}"
+
+
 @dataclass
 class Finding:
     url: str
@@ -43,20 +61,26 @@ class Finding:
     evidence: str
     curl: str
     confidence: float
+    param: str = ""  # fuzzed query key, when known
 
 
 class FuzzCoordinator:
-    def __init__(self, client: httpx.AsyncClient, llm: LLM, reporter: ReportWriter, settings):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        llm: LLM,
+        reporter: ReportWriter,
+        settings,
+        scheduler: Optional[HostScheduler] = None,
+    ):
         self.client = client
         self.llm = llm
         self.reporter = reporter
         self.settings = settings
-        self._max_concurrency = getattr(settings, "MAX_CONCURRENCY", 10)
-        self._current_concurrency = self._max_concurrency
-        self.sem = asyncio.Semaphore(self._current_concurrency)
-        self._error_window = deque(maxlen=20)
+        self.scheduler = scheduler or HostScheduler.from_settings(settings)
         self._rtt_threshold = float(getattr(settings, "RESPONSE_TIME_THRESHOLD", DEFAULT_RTT_THRESHOLD))
         self._confidence_threshold = float(getattr(settings, "CONFIDENCE_THRESHOLD", 0.0))
+        self._pack = bool(getattr(settings, "FUZZ_PACK_PARAMS", False))
 
     async def run(self, endpoints: Sequence[str]) -> None:
         await asyncio.gather(*(self.scan_endpoint(u) for u in endpoints))
@@ -70,23 +94,16 @@ class FuzzCoordinator:
         if base.scheme not in ("http", "https"):
             return
 
+        # Ask the LLM up front so its latency overlaps the deterministic passes.
+        # The prompt names the route template, not the concrete URL, so every
+        # sample of one endpoint hits the same LLM cache entry.
+        ctx = f"URL: {template(url)}\nHeaders: minimal\nObservations: n/a"
+        llm_task = asyncio.ensure_future(self.llm.advise_payloads(ctx))
+
         async def try_payloads(category: str, probes: Sequence[str]) -> None:
-            block_codes = {403, 406}
-            status_counts: dict[int, int] = {}
-            for key in COMMON_KEYS:
-                for p in probes:
-                    for variant in mutate.generate_variants(p):
-                        q = dict(base.query)
-                        q[key] = variant
-                        u = str(base.with_query(q))
-                        status = await self._request_and_check(u, "GET", category, None)
-                        if status is not None:
-                            status_counts[status] = status_counts.get(status, 0) + 1
-                        if status in block_codes:  # WAF? try alternates
-                            for alt in mutate.alternate_encodings(variant):
-                                q[key] = alt
-                                u2 = str(base.with_query(q))
-                                await self._request_and_check(u2, "GET", category, None)
+            for p in probes:
+                for variant in mutate.generate_variants(p):
+                    await self._try_variant(base, category, variant)
 
         # Deterministic probe passes
         await try_payloads("XSS", XSS_PROBES)
@@ -95,25 +112,88 @@ class FuzzCoordinator:
         await try_payloads("SSRF", SSRF_PROBES)
 
         # LLM-guided pass
-        ctx = f"URL: {url}\nHeaders: minimal\nObservations: n/a"
         try:
-            llm_payloads = await self.llm.advise_payloads(ctx)
+            llm_payloads = await llm_task
         except Exception:
             llm_payloads = []
 
-        block_codes = {403, 406}
-        for p in llm_payloads:
-            for key in COMMON_KEYS:
-                for variant in mutate.generate_variants(p):
-                    q = dict(base.query)
-                    q[key] = variant
-                    u = str(base.with_query(q))
-                    status = await self._request_and_check(u, "GET", "LLM-variant", None)
-                    if status in block_codes:
-                        for alt in mutate.alternate_encodings(variant):
-                            q[key] = alt
-                            u2 = str(base.with_query(q))
-                            await self._request_and_check(u2, "GET", "LLM-variant", None)
+        await try_payloads("LLM-variant", llm_payloads)
+
+    async def _try_variant(self, base: URL, category: str, variant: str) -> None:
+        if self._pack:
+            await self._packed(base, list(COMMON_KEYS), category, variant)
+            return
+        for key in COMMON_KEYS:
+            await self._single(base, key, category, variant)
+
+    async def _single(self, base: URL, key: str, category: str, variant: str) -> None:
+        """One request per key; records findings via :meth:`_request_and_check`."""
+        q = dict(base.query)
+        q[key] = variant
+        status = await self._request_and_check(str(base.with_query(q)), "GET", category, None, key)
+        if status in BLOCK_CODES:  # WAF? try alternates
+            for alt in mutate.alternate_encodings(variant):
+                q[key] = alt
+                await self._request_and_check(str(base.with_query(q)), "GET", category, None, key)
+
+    async def _packed(self, base: URL, keys: list[str], category: str, variant: str) -> None:
+        """Send ``variant`` in every key at once, each tagged with a distinct marker.
+
+        Nothing is recorded from the packed response itself: on an indicator
+        the responsible key is isolated by bisection and re-tested on its own,
+        so findings and evidence are identical to the one-key-per-request mode.
+        For XSS/SSTI hits the bisection starts from the keys whose markers are
+        reflected, once a packed request with only those keys still hits;
+        SQLi and SSRF hits need not echo the causing key and bisect every key.
+        """
+        status = await self._packed_once(base, keys, category, variant)
+        if status in BLOCK_CODES:  # WAF? try alternates
+            for alt in mutate.alternate_encodings(variant):
+                await self._packed_once(base, keys, category, alt)
+
+    async def _packed_once(self, base: URL, keys: list[str], category: str, value: str) -> Optional[int]:
+        res = await self._send_packed(base, keys, category, value)
+        if res is None:
+            return None
+        status, text, hits = res
+        if any(hits):
+            xss, sqli_err, sqli_delay, ssti, ssrf = hits
+            suspects = keys
+            if (xss or ssti) and not (sqli_err or sqli_delay or ssrf):
+                reflected = [k for i, k in enumerate(keys) if _marker(i) in text]
+                if 0 < len(reflected) < len(keys):
+                    narrowed = await self._send_packed(base, reflected, category, value)
+                    if narrowed is not None and any(narrowed[2]):
+                        suspects = reflected
+            await self._bisect(base, suspects, category, value)
+        return status
+
+    async def _bisect(self, base: URL, keys: list[str], category: str, value: str) -> None:
+        if len(keys) == 1:
+            await self._single(base, keys[0], category, value)
+            return
+        mid = len(keys) // 2
+        for half in (keys[:mid], keys[mid:]):
+            res = await self._send_packed(base, half, category, value)
+            if res is not None and any(res[2]):
+                await self._bisect(base, half, category, value)
+
+    async def _send_packed(
+        self, base: URL, keys: list[str], category: str, value: str
+    ) -> Optional[tuple[int, str, tuple[bool, bool, bool, bool, bool]]]:
+        q = dict(base.query)
+        for i, key in enumerate(keys):
+            q[key] = value + _marker(i)
+        url = str(base.with_query(q))
+        try:
+            async with self.scheduler.slot(url):
+                start = asyncio.get_event_loop().time()
+                r = await stream_capped(self.client, "GET", url, BODY_BYTES)
+                elapsed = asyncio.get_event_loop().time() - start
+                text = r.text
+        except Exception:
+            return None
+        return r.status_code, text, self._indicators(category, text, elapsed)
 
     async def _mutate_headers(self, url: str) -> None:
         # Support either a single mapping or a sequence of header mutations.
@@ -132,58 +212,42 @@ class FuzzCoordinator:
 
         for headers in mutations:
             try:
-                async with self.sem:
-                    r = await self.client.get(url, headers=headers)
-                    body = (r.text or "")[:4000]
+                async with self.scheduler.slot(url):
+                    r = await read_capped(self.client, url, 4000, headers=headers)
+                    body = r.text
             except Exception:
                 continue
 
             # Header reflection checks
-            if any(sig.search(body) for sig in XSS_PATTERNS) or any(sig.search(body) for sig in SSTI_PATTERNS):
+            if MATCHER.match(body, ("xss", "ssti")):
                 await self._record(url, "GET", "Header-reflection", body[:800], 0.9)
 
-    async def _request_and_check(self, url: str, method: str, category: str, body: Optional[str]) -> Optional[int]:
+    async def _request_and_check(
+        self, url: str, method: str, category: str, body: Optional[str], param: str = ""
+    ) -> Optional[int]:
         status: Optional[int] = None
         try:
-            async with self.sem:
+            async with self.scheduler.slot(url):
                 start = asyncio.get_event_loop().time()
-                r = await self.client.request(method, url, content=body)
+                r = await stream_capped(self.client, method, url, BODY_BYTES, content=body)
                 elapsed = asyncio.get_event_loop().time() - start
-                text = (r.text or "")[:8000]
+                text = r.text
                 status = r.status_code
         except Exception:
-            await self._update_rate(True)
             return None
 
         async def confirm() -> tuple[str, float]:
             """Issue a second request to verify initial indicators."""
             try:
-                async with self.sem:
+                async with self.scheduler.slot(url):
                     s = asyncio.get_event_loop().time()
-                    r2 = await self.client.request(method, url, content=body)
-                    return (r2.text or "")[:8000], asyncio.get_event_loop().time() - s
+                    r2 = await stream_capped(self.client, method, url, BODY_BYTES, content=body)
+                    return r2.text, asyncio.get_event_loop().time() - s
             except Exception:
                 return "", 0.0
 
         # Collect indicator hits from the initial response.
-        xss_hit = False
-        sqli_err = False
-        sqli_delay = False
-        ssti_hit = False
-        ssrf_hit = False
-
-        if category.startswith("XSS") or category == "LLM-variant":
-            xss_hit = any(sig.search(text) for sig in XSS_PATTERNS)
-
-        if category.startswith("SQLi") or category == "LLM-variant":
-            sqli_err = any(sig.search(text) for sig in SQLI_ERRORS)
-            sqli_delay = elapsed > self._rtt_threshold
-
-        if category.startswith("SSTI") or category == "LLM-variant":
-            ssti_hit = any(sig.search(text) for sig in SSTI_PATTERNS)
-
-        if category.startswith("SSRF") or category == "LLM-variant":
-            ssrf_hit = ("169.254.169.254" in text) or ("127.0.0.1" in text) or ("localhost" in text)
+        xss_hit, sqli_err, sqli_delay, ssti_hit, ssrf_hit = self._indicators(category, text, elapsed)
 
         # Only perform a confirmation request when any indicator is present.
         ctext = ""
@@ -191,30 +255,41 @@ class FuzzCoordinator:
         if xss_hit or sqli_err or sqli_delay or ssti_hit or ssrf_hit:
             ctext, celapsed = await confirm()
 
+        # One scan of the confirmation body covers every category.
+        chits = MATCHER.match(ctext, _categories_for(category)) if ctext else set()
+
         if xss_hit:
-            conf = 0.9 if any(sig.search(ctext) for sig in XSS_PATTERNS) else 0.4
-            await self._record(url, method, "Reflected XSS (indicator)", text, conf)
+            conf = 0.9 if "xss" in chits else 0.4
+            await self._record(url, method, "Reflected XSS (indicator)", text, conf, param)
 
         if sqli_err or sqli_delay:
-            confirm_hit = any(sig.search(ctext) for sig in SQLI_ERRORS)
+            confirm_hit = "sqli" in chits
             confirm_delay = celapsed > self._rtt_threshold
             conf = 0.9 if (sqli_err and confirm_hit) or (sqli_delay and confirm_delay) else 0.4
             label = "Potential SQLi (error-based)" if sqli_err else "Potential SQLi (time-based)"
-            await self._record(url, method, label, text, conf)
+            await self._record(url, method, label, text, conf, param)
 
         if ssti_hit:
-            conf = 0.9 if any(sig.search(ctext) for sig in SSTI_PATTERNS) else 0.4
-            await self._record(url, method, "Template Injection indicator", text, conf)
+            conf = 0.9 if "ssti" in chits else 0.4
+            await self._record(url, method, "Template Injection indicator", text, conf, param)
 
         if ssrf_hit:
-            confirm_hit = ("169.254.169.254" in ctext) or ("127.0.0.1" in ctext) or ("localhost" in ctext)
+            confirm_hit = "ssrf" in chits
             conf = 0.9 if confirm_hit else 0.4
-            await self._record(url, method, "SSRF indicator reflected", text, conf)
+            await self._record(url, method, "SSRF indicator reflected", text, conf, param)
 
-        await self._update_rate(status is None or status >= 500)
         return status
 
-    async def _record(self, url: str, method: str, label: str, evidence_body: str, confidence: float) -> None:
+    def _indicators(self, category: str, text: str, elapsed: float) -> tuple[bool, bool, bool, bool, bool]:
+        """Return (xss, sqli_error, sqli_delay, ssti, ssrf) indicator hits for ``category``."""
+        cats = _categories_for(category)
+        hits = MATCHER.match(text, cats)
+        sqli_delay = "sqli" in cats and elapsed > self._rtt_threshold
+        return "xss" in hits, "sqli" in hits, sqli_delay, "ssti" in hits, "ssrf" in hits
+
+    async def _record(
+        self, url: str, method: str, label: str, evidence_body: str, confidence: float, param: str = ""
+    ) -> None:
         msg = f"[{confidence:.2f}] {label} at {url}"
         if confidence >= self._confidence_threshold:
             print(msg)
@@ -226,24 +301,9 @@ class FuzzCoordinator:
                 evidence=evidence_body[:2000],
                 curl=curl,
                 confidence=confidence,
+                param=param,
             )
             await self.reporter.write_finding(f, self.llm)
         else:
             # Low-confidence telemetry; keep noisy findings out of the formal report
             print(f"[{confidence:.2f}] {label} at {url}")
-
-    async def _update_rate(self, errored: bool) -> None:
-        if not getattr(self.settings, "ADAPTIVE_RATE", False):
-            return
-        self._error_window.append(1 if errored else 0)
-        if len(self._error_window) < self._error_window.maxlen:
-            return
-        error_rate = sum(self._error_window) / len(self._error_window)
-        if error_rate > 0.5 and self._current_concurrency > 1:
-            self._current_concurrency = max(1, self._current_concurrency // 2)
-            self.sem = asyncio.Semaphore(self._current_concurrency)
-            await asyncio.sleep(1)
-        elif error_rate < 0.2 and self._current_concurrency < self._max_concurrency:
-            self._current_concurrency += 1
-            self.sem = asyncio.Semaphore(self._current_concurrency)
-            print(msg)
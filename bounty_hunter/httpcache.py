@@ -0,0 +1,192 @@
+"""Per-scan response cache and request coalescing.
+
+Several modules probe the same well-known paths (``/``, ``/admin``,
+``/dashboard`` …) on every root with identical or anonymous headers.
+:class:`CachedClient` wraps the shared ``httpx.AsyncClient`` so that a
+plain ``GET`` is keyed on (method, URL, per-call headers, cookies):
+concurrent identical requests are merged into one in-flight fetch and the
+response is kept in a size-bounded LRU for the rest of the scan.
+
+Byte-capped reads (:meth:`CachedClient.read_capped`, used through
+:func:`bounty_hunter.streaming.read_capped`) share the same cache: an entry
+serves any later read whose cap it covers.
+
+Anything that is not a plain GET (``request``, ``stream``, ``post`` …) is
+delegated to the wrapped client untouched, so callers that need a fresh
+response — e.g. the fuzzer's confirmation requests — are unaffected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import httpx
+
+from .streaming import CappedResponse, stream_capped
+
+__all__ = ["CachedClient"]
+
+CacheKey = Tuple[str, str, Tuple[Tuple[str, str], ...], Tuple[Tuple[str, str], ...]]
+
+
+def _items(value: Optional[Mapping[str, Any]], lower: bool) -> Tuple[Tuple[str, str], ...]:
+    if not value:
+        return ()
+    return tuple(
+        sorted(((k.lower() if lower else k), str(v)) for k, v in dict(value).items())
+    )
+
+
+class CachedClient:
+    """Coalescing, LRU-caching facade over an ``httpx.AsyncClient``."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        max_entries: int = 4096,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self._client = client
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._lru: "OrderedDict[CacheKey, httpx.Response | CappedResponse]" = OrderedDict()
+        self._sizes: Dict[CacheKey, int] = {}
+        self._bytes = 0
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._inflight_cap: Dict[CacheKey, int] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, client: httpx.AsyncClient, settings) -> "CachedClient":
+        return cls(
+            client,
+            max_entries=getattr(settings, "HTTP_CACHE_ENTRIES", 4096),
+            max_bytes=int(getattr(settings, "HTTP_CACHE_MB", 64)) * 1024 * 1024,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    async def get(
+        self,
+        url: Any,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        cookies: Optional[Mapping[str, str]] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        if kwargs:
+            # params/timeout/etc. change the request; don't guess, just pass through.
+            return await self._client.get(url, headers=headers, cookies=cookies, **kwargs)
+        key: CacheKey = ("GET", str(url), _items(headers, True), _items(cookies, False))
+
+        resp = self._lru.get(key)
+        if resp is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return resp
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.coalesced += 1
+            return await asyncio.shield(fut)
+
+        self.misses += 1
+        fut = asyncio.ensure_future(self._fetch(key, url, headers, cookies))
+        # Mark the exception retrieved even if every waiter was cancelled.
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = fut
+        return await asyncio.shield(fut)
+
+    async def read_capped(
+        self,
+        url: Any,
+        max_bytes: int,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        cookies: Optional[Mapping[str, str]] = None,
+    ) -> CappedResponse:
+        """Cached, coalesced capped GET; see :func:`streaming.read_capped`."""
+        key: CacheKey = ("CAPPED", str(url), _items(headers, True), _items(cookies, False))
+
+        def covers(resp: CappedResponse) -> bool:
+            return not resp.truncated or len(resp.content) >= max_bytes
+
+        resp = self._lru.get(key)
+        if resp is not None and covers(resp):  # type: ignore[arg-type]
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return resp  # type: ignore[return-value]
+
+        fut = self._inflight.get(key)
+        if fut is not None and self._inflight_cap.get(key, 0) >= max_bytes:
+            self.coalesced += 1
+            return await asyncio.shield(fut)
+
+        self.misses += 1
+
+        async def fetch() -> CappedResponse:
+            try:
+                r = await stream_capped(
+                    self._client, "GET", url, max_bytes, headers=headers, cookies=cookies
+                )
+                self._put(key, r, len(r.content))
+                return r
+            finally:
+                if self._inflight.get(key) is fut:
+                    self._inflight.pop(key, None)
+                    self._inflight_cap.pop(key, None)
+
+        fut = asyncio.ensure_future(fetch())
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = fut
+        self._inflight_cap[key] = max_bytes
+        return await asyncio.shield(fut)
+
+    async def _fetch(
+        self,
+        key: CacheKey,
+        url: Any,
+        headers: Optional[Mapping[str, str]],
+        cookies: Optional[Mapping[str, str]],
+    ) -> httpx.Response:
+        try:
+            resp = await self._client.get(url, headers=headers, cookies=cookies)
+            self._store(key, resp)
+            return resp
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: CacheKey, resp: httpx.Response) -> None:
+        try:
+            size = len(resp.content)
+        except httpx.ResponseNotRead:
+            return
+        self._put(key, resp, size)
+
+    def _put(self, key: CacheKey, resp: Any, size: int) -> None:
+        if self.max_bytes and size > self.max_bytes // 4:
+            return  # a single huge body shouldn't flush the whole cache
+        self._bytes -= self._sizes.pop(key, 0)
+        self._lru[key] = resp
+        self._lru.move_to_end(key)
+        self._sizes[key] = size
+        self._bytes += size
+        while len(self._lru) > self.max_entries or (
+            self.max_bytes and self._bytes > self.max_bytes
+        ):
+            old, _ = self._lru.popitem(last=False)
+            self._bytes -= self._sizes.pop(old, 0)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "entries": len(self._lru),
+            "bytes": self._bytes,
+        }
@@ -0,0 +1,116 @@
+"""Append-only scan journal for ``--resume``.
+
+Instead of rewriting ``state.json`` after every chunk, the engine appends
+one JSON line per event to ``journal.jsonl``::
+
+    {"q": [url, ...]}                  endpoints dispatched for testing
+    {"d": "fuzz", "e": [url, ...]}     ``fuzz`` finished for these endpoints
+
+Lines are flushed to the OS as they are written, while ``fsync`` is batched
+to at most one per ``fsync_s`` seconds.  Chunks finish out of order across
+workers, so resume replays the journal and schedules exactly the
+(endpoint, module) pairs that have no completion record.  :meth:`compact`
+rewrites the file as one ``q`` line plus one ``d`` line per module; a torn
+last line from a crash is ignored on replay.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+__all__ = ["Journal"]
+
+
+class Journal:
+    def __init__(self, path: Path, fsync_s: float = 1.0):
+        self.path = Path(path)
+        self.fsync_s = float(fsync_s)
+        self.endpoints: List[str] = []
+        self.completed: Dict[str, Set[str]] = {}
+        self.records = 0
+        if self.path.exists():
+            self._replay()
+        self._fh = self.path.open("a", encoding="utf-8")
+        self._last_sync = time.monotonic()
+        self._dirty = False
+
+    def _replay(self) -> None:
+        seen: Set[str] = set()
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn write at the tail
+                self.records += 1
+                if "q" in rec:
+                    for u in rec["q"]:
+                        if u not in seen:
+                            seen.add(u)
+                            self.endpoints.append(u)
+                elif "d" in rec:
+                    for u in rec["e"]:
+                        self.completed.setdefault(u, set()).add(rec["d"])
+
+    def _append(self, rec: dict) -> None:
+        self._fh.write(json.dumps(rec, separators=(",", ":")) + "\n")
+        self._fh.flush()
+        self.records += 1
+        self._dirty = True
+        if time.monotonic() - self._last_sync >= self.fsync_s:
+            self.sync()
+
+    def queued(self, endpoints: Iterable[str]) -> None:
+        batch = list(endpoints)
+        self.endpoints.extend(batch)
+        self._append({"q": batch})
+
+    def done(self, endpoints: Iterable[str], module: str) -> None:
+        batch = list(endpoints)
+        for u in batch:
+            self.completed.setdefault(u, set()).add(module)
+        self._append({"d": module, "e": batch})
+
+    def remaining(self, modules: Iterable[str]) -> List[Tuple[Tuple[str, ...], List[str]]]:
+        """Outstanding work as ``(modules, endpoints)`` groups, in dispatch order."""
+        wanted = tuple(modules)
+        groups: Dict[Tuple[str, ...], List[str]] = {}
+        for u in self.endpoints:
+            done = self.completed.get(u, ())
+            missing = tuple(m for m in wanted if m not in done)
+            if missing:
+                groups.setdefault(missing, []).append(u)
+        return list(groups.items())
+
+    def sync(self) -> None:
+        if self._dirty:
+            os.fsync(self._fh.fileno())
+            self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def compact(self) -> None:
+        """Rewrite the journal as its minimal equivalent (atomic replace)."""
+        by_module: Dict[str, List[str]] = {}
+        for u in self.endpoints:
+            for m in sorted(self.completed.get(u, ())):
+                by_module.setdefault(m, []).append(u)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            lines = [{"q": self.endpoints}] + [{"d": m, "e": us} for m, us in by_module.items()]
+            for rec in lines:
+                fh.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._fh.close()
+        os.replace(tmp, self.path)
+        self._fh = self.path.open("a", encoding="utf-8")
+        self.records = len(lines)
+        self._dirty = False
+
+    def close(self) -> None:
+        self.sync()
+        self._fh.close()
@@ -0,0 +1,145 @@
+"""Persistent, content-addressed cache for JavaScript bundles and source maps.
+
+The same vendor bundle is served by dozens of subdomains and barely changes
+between scans, yet every copy used to be downloaded and swept again.
+Extraction results (endpoints, likely secrets and the ``sourceMappingURL``
+as written) are stored under the SHA-256 of the body, so identical content
+is parsed once however many URLs serve it.  Each URL also remembers its
+``ETag`` / ``Last-Modified`` and the hash it last served, which lets the JS
+miner revalidate with a conditional request and skip the download on a 304.
+
+Entries live in a SQLite database under the report root, next to the LLM
+cache; the least recently used content rows are evicted once the table
+grows past ``max_entries``.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .parsers import JSExtract
+
+__all__ = ["JSCache"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS js_content (
+    kind TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    endpoints TEXT NOT NULL,
+    secrets TEXT NOT NULL,
+    sourcemap TEXT,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (kind, sha256)
+);
+CREATE TABLE IF NOT EXISTS js_urls (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    sha256 TEXT NOT NULL,
+    checked REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS js_content_accessed ON js_content(accessed);
+"""
+
+
+class JSCache:
+    def __init__(self, path: str | Path, max_entries: int = 100_000):
+        self.path = Path(path)
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def get(self, kind: str, sha256: str) -> Optional[JSExtract]:
+        """Extraction result for content ``sha256``; the source map is left unresolved."""
+        row = self._db.execute(
+            "SELECT endpoints, secrets, sourcemap FROM js_content WHERE kind=? AND sha256=?",
+            (kind, sha256),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self._db.execute(
+            "UPDATE js_content SET accessed=? WHERE kind=? AND sha256=?", (time.time(), kind, sha256)
+        )
+        self.hits += 1
+        return JSExtract(endpoints=json.loads(row[0]), secrets=json.loads(row[1]), sourcemap_ref=row[2])
+
+    def put(self, kind: str, sha256: str, ex: JSExtract) -> None:
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO js_content VALUES (?,?,?,?,?,?,?)",
+            (kind, sha256, json.dumps(ex.endpoints), json.dumps(ex.secrets), ex.sourcemap_ref, now, now),
+        )
+        self.stores += 1
+        # Amortise eviction: only check the table size every 64 stores.
+        if self.stores % 64 == 0:
+            self.evict()
+
+    def validators(self, kind: str, url: str) -> Tuple[Dict[str, str], Optional[str]]:
+        """Conditional-request headers for ``url`` and the hash it last served.
+
+        Empty when the URL is unknown or its content has since been evicted.
+        """
+        row = self._db.execute(
+            "SELECT u.etag, u.last_modified, u.sha256 FROM js_urls u JOIN js_content c "
+            "ON c.kind = u.kind AND c.sha256 = u.sha256 WHERE u.url=? AND u.kind=?",
+            (url, kind),
+        ).fetchone()
+        if row is None or not (row[0] or row[1]):
+            return {}, None
+        etag, last_modified, sha256 = row
+        headers = {"If-None-Match": etag} if etag else {}
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers, sha256
+
+    def remember(self, kind: str, url: str, etag: Optional[str], last_modified: Optional[str], sha256: str) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO js_urls VALUES (?,?,?,?,?,?)",
+            (url, kind, etag, last_modified, sha256, time.time()),
+        )
+
+    def evict(self) -> int:
+        """Drop the least recently used content above the cap, then URLs pointing nowhere."""
+        removed = 0
+        (count,) = self._db.execute("SELECT COUNT(*) FROM js_content").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            cur = self._db.execute(
+                "DELETE FROM js_content WHERE rowid IN "
+                "(SELECT rowid FROM js_content ORDER BY accessed ASC LIMIT ?)",
+                (excess,),
+            )
+            removed += cur.rowcount
+            self._db.execute(
+                "DELETE FROM js_urls WHERE NOT EXISTS (SELECT 1 FROM js_content c "
+                "WHERE c.kind = js_urls.kind AND c.sha256 = js_urls.sha256)"
+            )
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "stores": self.stores,
+        }
+
+    def close(self) -> None:
+        try:
+            self.evict()
+        finally:
+            self._db.close()
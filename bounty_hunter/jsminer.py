@@ -1,50 +1,77 @@
 from __future__ import annotations
-import asyncio, re, httpx
-from bs4 import BeautifulSoup
-from yarl import URL
-from sourcemap import load as sm_load
-ENDPOINT_RE=re.compile(r"https?://[\w.-]+(?:\:[0-9]+)?(?:/[\w\-./%?#=&+]*)?", re.I)
-API_KEY_RE=re.compile(r"(?i)(api[_-]?key|token|secret)[\s:=\"]{0,3}([A-Za-z0-9_\-]{16,})")
+import asyncio, hashlib, httpx, tempfile
+from typing import Callable
+from .jscache import JSCache
+from .parsers import API_KEY_RE, JSExtract, ParserPool, extract_js_file, extract_page, extract_sourcemap_file, join_url
+from .scheduler import HostScheduler
+from .streaming import charset, read_capped
+from .utils import SeenURLs, URL_RE as ENDPOINT_RE
+HTML_MAX_BYTES=2*1024*1024
 class JSMiner:
-    def __init__(self, client: httpx.AsyncClient, settings):
-        self.client=client; self.settings=settings; self.sem=asyncio.Semaphore(settings.MAX_CONCURRENCY)
+    def __init__(self, client: httpx.AsyncClient, settings, scheduler: HostScheduler|None=None, parser: ParserPool|None=None, cache: JSCache|None=None, crawled: Callable[[str],bool]|None=None):
+        self.client=client; self.settings=settings; self.scheduler=scheduler or HostScheduler.from_settings(settings)
+        self.parser=parser or ParserPool.from_settings(settings); self.cache=cache
+        # Pages the crawler fetches hand their <script> sources to add_scripts; do not fetch them again.
+        self.crawled=crawled or (lambda u: False); self._scripts: list[str]=[]
+        self.max_bytes=settings.JS_MAX_BYTES; self._seen_js=SeenURLs(settings.SEEN_ERROR_RATE)
+    @staticmethod
+    def is_candidate(url: str)->bool:
+        u=url.lower(); return u.endswith('.js') or any(u.endswith(x) for x in ("/",".html",".htm"))
     async def mine(self, endpoints: list[str])->list[str]:
-        js=[u for u in endpoints if u.lower().endswith('.js')]
-        html=[u for u in endpoints if any(u.lower().endswith(x) for x in ("/",".html",".htm"))]
+        js=[u for u in endpoints if u.lower().endswith('.js')]+self._scripts; self._scripts=[]
+        html=[u for u in endpoints if any(u.lower().endswith(x) for x in ("/",".html",".htm")) and not self.crawled(u)]
         extra = await asyncio.gather(*[self._from_html(u) for u in html])
         for ex in extra: js.extend(ex)
-        js=sorted(set(js)); out=[]
+        js=[u for u in sorted(set(js)) if self._seen_js.add(u)]; out=[]
         for res in await asyncio.gather(*[self._scan_js(u) for u in js]): out.extend(res)
         return sorted(set(out))
+    def add_scripts(self, urls: list[str])->None:
+        """Script sources of a crawled page (any host); scanned by the next :meth:`mine` call."""
+        self._scripts.extend(urls)
+    async def mine_url(self, url: str)->list[str]:
+        """Streaming entry point: mine one harvested URL, skipping bundles already scanned."""
+        return await self.mine([url] if self.is_candidate(url) else [])
     async def _from_html(self,url:str)->list[str]:
         try:
-            async with self.sem: r=await self.client.get(url)
+            async with self.scheduler.slot(url): r=await read_capped(self.client,url,HTML_MAX_BYTES)
             if r.status_code>=400: return []
-            soup=BeautifulSoup(r.text,"lxml"); out=[]
-            for s in soup.find_all("script"):
-                src=s.get("src");
-                if src: out.append(str(URL(url)/src))
-            return out
+            page=await self.parser.run(extract_page, r.content, r.encoding, url)
+            return page.scripts
         except Exception: return []
+    async def _spool(self, url: str, headers: dict, fh)->tuple[httpx.Response, str, int]:
+        """Stream up to ``max_bytes`` of ``url`` into ``fh``, hashing as it goes; never holds the body in memory."""
+        h=hashlib.sha256(); size=0; fh.seek(0); fh.truncate()
+        async with self.scheduler.slot(url):
+            async with self.client.stream("GET",url,headers=headers or None) as r:
+                if r.status_code!=304:
+                    async for chunk in r.aiter_bytes():
+                        chunk=chunk[:self.max_bytes-size]; h.update(chunk); fh.write(chunk); size+=len(chunk)
+                        if size>=self.max_bytes: break  # leaving the context closes the stream
+        fh.flush(); return r, h.hexdigest(), size
+    async def _extract(self, kind: str, url: str, fn, *args)->JSExtract|None:
+        """Fetch and extract ``url``; with a cache, revalidate it conditionally and parse each distinct body once."""
+        cache=self.cache; cond,known=cache.validators(kind,url) if cache else ({},None)
+        with tempfile.NamedTemporaryFile(prefix="bh-js-") as fh:
+            r,digest,size=await self._spool(url,cond,fh)
+            if r.status_code==304 and known:
+                ex=cache.get(kind,known)
+                if ex is not None: cache.revalidated+=1; return ex
+                r,digest,size=await self._spool(url,{},fh)
+            if not 200<=r.status_code<300: return None  # error pages are neither mined nor cached
+            ex=cache.get(kind,digest) if cache else None
+            if ex is None:
+                ex=await self.parser.run_file(fn, fh.name, size, charset(r.headers), *args)
+                if cache: cache.put(kind,digest,ex)
+        if cache: cache.remember(kind,url,r.headers.get("etag"),r.headers.get("last-modified"),digest)
+        return ex
     async def _scan_js(self,url:str)->list[str]:
-        disc=[]
-        try:
-            async with self.sem: r=await self.client.get(url)
-            body=r.text or ""
+        try: ex=await self._extract("js", url, extract_js_file, url)
         except Exception: return []
-        disc+=ENDPOINT_RE.findall(body)
-        for m in API_KEY_RE.findall(body):
-            token=m[1]
-            if len(token)>=20: disc.append(f"secret://{token}")
-        sm_url=None
-        for line in body.splitlines()[-5:]:
-            if "sourceMappingURL=" in line:
-                part=line.split("sourceMappingURL=")[-1].strip().strip('*/# '); sm_url=str(URL(url)/part)
-        if sm_url:
+        if ex is None: return []
+        disc=list(ex.endpoints)+[f"secret://{token}" for token in ex.secrets]
+        if ex.sourcemap_ref:
             try:
-                async with self.sem: r2=await self.client.get(sm_url)
-                if r2.status_code<400:
-                    sm=sm_load(r2.text)
-                    disc+=ENDPOINT_RE.findall(r2.text)
+                sm=await self._extract("map", join_url(url, ex.sourcemap_ref), extract_sourcemap_file)
+                if sm is not None: disc+=sm.endpoints+[f"secret://{token}" for token in sm.secrets]
             except Exception: pass
         return disc
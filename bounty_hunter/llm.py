@@ -1,37 +1,93 @@
 from __future__ import annotations
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
 from .config import Settings
+from .llm_cache import LLMCache
 
 @dataclass
 class LLM:
     provider: str = "none"
     openai_client: object | None = None
     model: str | None = None
+    concurrency: int = 4
+    timeout: float = 30.0
+    cache: LLMCache | None = None
+    # Completions actually requested, answered from the cache, and joined to an identical one in flight
+    calls: int = field(default=0, init=False)
+    cached: int = field(default=0, init=False)
+    coalesced: int = field(default=0, init=False)
+    _sem: asyncio.Semaphore | None = field(default=None, init=False, repr=False)
+    _inflight: dict[str, asyncio.Future] = field(default_factory=dict, init=False, repr=False)
     @classmethod
-    def from_settings(cls, s: Settings) -> "LLM":
+    def from_settings(cls, s: Settings, cache_dir: Path | None = None) -> "LLM":
         if s.LLM_PROVIDER=="openai" and s.OPENAI_API_KEY:
             try:
                 import openai
-                client=openai.OpenAI(api_key=s.OPENAI_API_KEY)
-                return cls(provider="openai", openai_client=client, model=s.OPENAI_MODEL)
+                # Async client: requests overlap with HTTP work instead of blocking the loop.
+                client=openai.AsyncOpenAI(api_key=s.OPENAI_API_KEY, timeout=s.LLM_TIMEOUT_S, max_retries=1)
+                cache=None
+                if cache_dir is not None and s.LLM_CACHE_ENABLED:
+                    cache=LLMCache(cache_dir / "llm_cache.sqlite3", ttl_s=s.LLM_CACHE_TTL_S, max_entries=s.LLM_CACHE_MAX_ENTRIES)
+                return cls(provider="openai", openai_client=client, model=s.OPENAI_MODEL, concurrency=s.LLM_CONCURRENCY, timeout=s.LLM_TIMEOUT_S, cache=cache)
             except Exception:
                 return cls(provider="none")
         return cls(provider="none")
+    @property
+    def enabled(self) -> bool:
+        return self.provider=="openai" and self.openai_client is not None
+    def stats(self) -> dict[str, int]:
+        return {"calls": self.calls, "cached": self.cached, "coalesced": self.coalesced}
+    async def _chat(self, prompt: str, temperature: float) -> str:
+        """Run one chat completion under the LLM's own concurrency limit and timeout.
+
+        Answers come from the cache when possible, and concurrent identical
+        prompts share a single request.
+        """
+        model=self.model or "gpt-4o-mini"
+        key=LLMCache.key(self.provider, model, prompt, temperature)
+        fut=self._inflight.get(key)
+        if fut is not None:
+            self.coalesced+=1
+            return await asyncio.shield(fut)
+        if self.cache is not None:
+            cached=self.cache.get(self.provider, model, prompt, temperature)
+            if cached is not None:
+                self.cached+=1
+                return cached
+        fut=asyncio.ensure_future(self._complete(key, model, prompt, temperature))
+        # Mark the exception retrieved even if every waiter was cancelled.
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key]=fut
+        return await asyncio.shield(fut)
+    async def _complete(self, key: str, model: str, prompt: str, temperature: float) -> str:
+        try:
+            if self._sem is None: self._sem=asyncio.Semaphore(max(1,self.concurrency))
+            async with self._sem:
+                self.calls+=1
+                resp=await asyncio.wait_for(
+                    self.openai_client.chat.completions.create(model=model,messages=[{"role":"user","content":prompt}],temperature=temperature),
+                    timeout=self.timeout,
+                )
+            content=resp.choices[0].message.content.strip()
+            if self.cache is not None: self.cache.put(self.provider, model, prompt, temperature, content)
+            return content
+        finally:
+            self._inflight.pop(key, None)
     async def advise_payloads(self, context: str) -> list[str]:
         if self.provider!="openai" or not self.openai_client: return []
         prompt=(
             "Suggest 5 safe, non-destructive payload mutations for XSS/SQLi/SSTI/SSRF based on context. Return JSON list only.\n"+context
         )
         try:
-            resp=self.openai_client.chat.completions.create(model=self.model or "gpt-4o-mini",messages=[{"role":"user","content":prompt}],temperature=0.3)
-            import json; arr=json.loads(resp.choices[0].message.content.strip()); return [str(x) for x in arr if isinstance(x,str)]
+            content=await self._chat(prompt, 0.3)
+            import json; arr=json.loads(content); return [str(x) for x in arr if isinstance(x,str)]
         except Exception: return []
     async def summarize_risk(self, evidence: str) -> str:
         if self.provider!="openai" or not self.openai_client: return ""
         prompt=("Draft a concise, accurate impact summary (3-5 sentences).\nEvidence:\n"+evidence)
         try:
-            resp=self.openai_client.chat.completions.create(model=self.model or "gpt-4o-mini",messages=[{"role":"user","content":prompt}],temperature=0.2)
-            return resp.choices[0].message.content.strip()
+            return await self._chat(prompt, 0.2)
         except Exception: return ""
 
     async def analyze_workflows(self, description: str) -> str:
@@ -41,7 +97,6 @@ class LLM:
             " Respond concisely.\n"+description
         )
         try:
-            resp=self.openai_client.chat.completions.create(model=self.model or "gpt-4o-mini",messages=[{"role":"user","content":prompt}],temperature=0.2)
-            return resp.choices[0].message.content.strip()
+            return await self._chat(prompt, 0.2)
         except Exception:
             return ""
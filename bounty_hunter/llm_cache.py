@@ -0,0 +1,111 @@
+"""Persistent, content-addressed cache for LLM completions.
+
+Entries live in a small SQLite database under the report root so repeat
+and resumed scans of the same program reuse earlier answers.  Keys are a
+SHA-256 over (provider, model, temperature, prompt); entries expire after a
+TTL and the least recently used rows are evicted once the table grows past
+``max_entries``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+__all__ = ["LLMCache"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    temperature REAL NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+class LLMCache:
+    def __init__(self, path: str | Path, ttl_s: float = 7 * 86400, max_entries: int = 50_000):
+        self.path = Path(path)
+        self.ttl_s = float(ttl_s)
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed)")
+
+    @staticmethod
+    def key(provider: str, model: str, prompt: str, temperature: float) -> str:
+        h = hashlib.sha256()
+        for part in (provider, model, f"{temperature:.3f}", prompt):
+            h.update(part.encode("utf-8", "surrogatepass"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def get(self, provider: str, model: str, prompt: str, temperature: float) -> str | None:
+        k = self.key(provider, model, prompt, temperature)
+        now = time.time()
+        row = self._db.execute(
+            "SELECT response, created FROM llm_cache WHERE key=?", (k,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        response, created = row
+        if self.ttl_s > 0 and now - created > self.ttl_s:
+            self._db.execute("DELETE FROM llm_cache WHERE key=?", (k,))
+            self.misses += 1
+            return None
+        self._db.execute("UPDATE llm_cache SET accessed=? WHERE key=?", (now, k))
+        self.hits += 1
+        return response
+
+    def put(self, provider: str, model: str, prompt: str, temperature: float, response: str) -> None:
+        k = self.key(provider, model, prompt, temperature)
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO llm_cache VALUES (?,?,?,?,?,?,?)",
+            (k, provider, model, float(temperature), response, now, now),
+        )
+        self.stores += 1
+        # Amortise eviction: only check the table size every 64 stores.
+        if self.stores % 64 == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired rows, then the least recently used ones above the cap."""
+        removed = 0
+        if self.ttl_s > 0:
+            cur = self._db.execute(
+                "DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl_s,)
+            )
+            removed += cur.rowcount
+        (count,) = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            cur = self._db.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed ASC LIMIT ?)",
+                (excess,),
+            )
+            removed += cur.rowcount
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores}
+
+    def close(self) -> None:
+        try:
+            self.evict()
+        finally:
+            self._db.close()
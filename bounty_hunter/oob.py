@@ -1,10 +1,12 @@
 from __future__ import annotations
 import asyncio, secrets, httpx
 from yarl import URL
+from .scheduler import HostScheduler
+from .streaming import PROBE_BYTES, read_capped
 SSRF_KEYS=["url","dest","domain","host","image","feed","callback","target","path"]
 class OOBSSRF:
-    def __init__(self, client: httpx.AsyncClient, reporter, settings):
-        self.client=client; self.reporter=reporter; self.settings=settings; self.sem=asyncio.Semaphore(settings.MAX_CONCURRENCY)
+    def __init__(self, client: httpx.AsyncClient, reporter, settings, scheduler: HostScheduler|None=None):
+        self.client=client; self.reporter=reporter; self.settings=settings; self.scheduler=scheduler or HostScheduler.from_settings(settings)
         self.domain=(settings.CANARY_DOMAIN or "").strip()
     async def run(self, endpoints: list[str]):
         if not self.domain: return
@@ -15,7 +17,7 @@ class OOBSSRF:
         for k in SSRF_KEYS:
             q=dict(base.query); q[k]=canary_url; test=str(base.with_query(q))
             try:
-                async with self.sem: r=await self.client.get(test)
+                async with self.scheduler.slot(test): r=await read_capped(self.client,test,PROBE_BYTES)
                 curl=f"curl -i '{test}'"; note=f"Injected `{canary_url}` via `{k}`. Watch canary for hits."
                 await self.reporter.generic_finding("SSRF (OOB probe queued)", test, note, curl)
             except Exception: continue
@@ -0,0 +1,347 @@
+"""CPU-bound extraction off the event loop.
+
+BeautifulSoup over a large page or a regex sweep over a minified bundle
+holds the loop for tens of milliseconds, stalling every in-flight request.
+The extractors here are plain functions over raw bytes that return compact,
+picklable results, and :class:`ParserPool` runs them in a process pool
+sized to the cores.  Bodies below ``inline_bytes`` are parsed in-process,
+where pickling would cost more than the parse.
+
+HTML goes through :class:`_LinkTarget`, an lxml parser *target*: the
+parser emits start/end/data events straight to it in one pass and no DOM
+is ever built, so memory stays flat however large the page is.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin
+
+from lxml import etree
+from yarl import URL
+
+from .utils import URL_RE
+
+__all__ = [
+    "JSExtract",
+    "JSScan",
+    "PageExtract",
+    "ParserPool",
+    "extract_js",
+    "extract_js_file",
+    "extract_page",
+    "extract_sourcemap_file",
+    "extract_urls",
+    "join_url",
+]
+
+API_KEY_RE = re.compile(r"(?i)(api[_-]?key|token|secret)[\s:=\"]{0,3}([A-Za-z0-9_\-]{16,})")
+
+
+@dataclass
+class PageExtract:
+    """Links, forms and script sources of one HTML page."""
+
+    urls: List[str] = field(default_factory=list)
+    # (target, anchor text)
+    navs: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+    # (action URL, method, input names)
+    forms: List[Tuple[str, str, List[str]]] = field(default_factory=list)
+    scripts: List[str] = field(default_factory=list)
+
+
+@dataclass
+class JSExtract:
+    endpoints: List[str] = field(default_factory=list)
+    secrets: List[str] = field(default_factory=list)
+    sourcemap: Optional[str] = None
+    # The sourceMappingURL as written, for resolving against another base.
+    sourcemap_ref: Optional[str] = None
+
+
+def join_url(base: str, v: str) -> str:
+    """Resolve ``v`` against ``base`` like a browser; non-HTTP links raise ``ValueError``."""
+    u = urldefrag(urljoin(base, v.strip())).url
+    if not u.startswith(("http://", "https://")):
+        raise ValueError(f"not an HTTP link: {v!r}")
+    return str(URL(u))
+
+
+def extract_urls(content: bytes, encoding: str) -> List[str]:
+    """Absolute URLs appearing anywhere in the body."""
+    return URL_RE.findall(content.decode(encoding, errors="replace"))
+
+
+class _LinkTarget:
+    """lxml parser target collecting links, resources, forms and inputs."""
+
+    def __init__(self, base: str):
+        self.base = base
+        self.anchors: List[Tuple[str, List[str]]] = []
+        self.resources: List[Tuple[str, str]] = []
+        self.forms: List[Tuple[str, str, List[str]]] = []
+        self._text: Optional[List[str]] = None  # text of the open <a>
+        self._a_depth = 0
+        self._inputs: Optional[List[str]] = None  # inputs of the open <form>
+
+    def start(self, tag: str, attrib: dict) -> None:
+        if tag == "a":
+            self._a_depth += 1
+            href = attrib.get("href")
+            if self._a_depth == 1:
+                self._text = []
+            if href:
+                self.anchors.append((href, self._text if self._a_depth == 1 else []))
+        elif tag in ("script", "link", "img"):
+            for attr in ("href", "src"):
+                v = attrib.get(attr)
+                if v:
+                    self.resources.append((tag, v))
+        elif tag == "form":
+            self._inputs = []
+            self.forms.append((attrib.get("action") or "", (attrib.get("method") or "get").lower(), self._inputs))
+        elif tag in ("input", "textarea", "select") and self._inputs is not None:
+            name = attrib.get("name")
+            if name:
+                self._inputs.append(name)
+
+    def end(self, tag: str) -> None:
+        if tag == "a" and self._a_depth:
+            self._a_depth -= 1
+            if not self._a_depth:
+                self._text = None
+        elif tag == "form":
+            self._inputs = None
+
+    def data(self, text: str) -> None:
+        if self._text is not None:
+            self._text.append(text)
+
+    def close(self) -> "_LinkTarget":
+        return self
+
+
+def _parse_links(html: str, base: str) -> _LinkTarget:
+    parser = etree.HTMLParser(target=_LinkTarget(base), recover=True)
+    parser.feed(html or "<html></html>")
+    return parser.close()
+
+
+def extract_page(content: bytes, encoding: str, base: str) -> PageExtract:
+    """Links, navigations, forms and script sources of an HTML page, in one pass."""
+    html = content.decode(encoding, errors="replace")
+    return _page(_parse_links(html, base), URL_RE.findall(html), base)
+
+
+def _page(t: _LinkTarget, urls: List[str], base: str) -> PageExtract:
+    out = PageExtract(urls=urls)
+    # navigation links
+    for v, text in t.anchors:
+        try:
+            u = join_url(base, v)
+        except Exception:
+            continue
+        out.urls.append(u)
+        label = "".join(s.strip() for s in text)
+        out.navs.append((u, label or None))
+    # other resources
+    for tag, v in t.resources:
+        try:
+            u = join_url(base, v)
+        except Exception:
+            continue
+        out.urls.append(u)
+        if tag == "script":
+            out.scripts.append(u)
+    # forms
+    for action, method, inputs in t.forms:
+        action = action or base
+        try:
+            action_url = join_url(base, action)
+        except Exception:
+            action_url = action
+        out.urls.append(action_url)
+        out.forms.append((action_url, method, inputs))
+    return out
+
+
+# Bytes per scan window, and the overlap carried between windows: a match
+# still growing at a window's end is re-scanned with the next one, and one
+# longer than the overlap is dropped.
+SCAN_WINDOW = 256 * 1024
+SCAN_OVERLAP = 4096
+# The sourceMappingURL comment is looked for only in this much of the tail.
+TRAILER_BYTES = 4096
+
+_URL_B = re.compile(URL_RE.pattern.encode(), re.I)
+_KEY_B = re.compile(API_KEY_RE.pattern.encode())
+# Inside source-map JSON the quote before a value is escaped (``token=\"...``).
+_MAP_KEY_B = re.compile(rb"(?i)(api[_-]?key|token|secret)(?:\\?[\s:=\"]){0,3}([A-Za-z0-9_\-]{16,})")
+
+
+class JSScan:
+    """Endpoints and likely secrets of a body fed in chunks, matched on the raw bytes.
+
+    Only the current chunk plus :data:`SCAN_OVERLAP` bytes are held, so memory
+    does not grow with the file, and nothing but the matches and the last
+    :data:`TRAILER_BYTES` is ever decoded.  Matching is ASCII-only, which covers
+    UTF-8 and single-byte charsets but not UTF-16.
+    """
+
+    def __init__(self, base: Optional[str], encoding: str, *, key_re: re.Pattern = _KEY_B):
+        self.base = base
+        self.encoding = encoding
+        self.key_re = key_re
+        self.size = 0
+        self._endpoints: dict = {}
+        self._secrets: dict = {}
+        self._buf = b""
+        self._tail = b""
+        self._pos = [0, 0]
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self._tail = (self._tail + chunk[-TRAILER_BYTES:])[-TRAILER_BYTES:]
+        self._scan(self._buf + chunk, final=False)
+
+    def _scan(self, buf: bytes, final: bool) -> None:
+        limit = len(buf) if final else len(buf) - SCAN_OVERLAP
+        keep = max(limit, 0)
+        for i, (rx, sink) in enumerate(((_URL_B, self._endpoints), (self.key_re, self._secrets))):
+            pos = self._pos[i]
+            for m in rx.finditer(buf, pos):
+                if m.end() > limit:
+                    keep = min(keep, m.start())  # may still grow: carry it over
+                    break
+                value = m.group(0) if rx is _URL_B else m.group(2)
+                if rx is _URL_B or len(value) >= 20:
+                    sink[value.decode("ascii")] = None
+                pos = m.end()
+            self._pos[i] = pos
+        if len(buf) - keep > 2 * SCAN_OVERLAP:
+            keep = len(buf) - SCAN_OVERLAP
+        self._buf = buf[keep:]
+        self._pos = [max(p - keep, 0) for p in self._pos]
+
+    def close(self) -> JSExtract:
+        self._scan(self._buf, final=True)
+        out = JSExtract(endpoints=list(self._endpoints), secrets=list(self._secrets))
+        if self.base is None:
+            return out
+        for line in self._tail.decode(self.encoding, errors="replace").splitlines()[-5:]:
+            if "sourceMappingURL=" in line:
+                part = line.split("sourceMappingURL=")[-1].strip().strip("*/# ")
+                try:
+                    out.sourcemap = join_url(self.base, part)
+                    out.sourcemap_ref = part
+                except ValueError:
+                    pass  # inline data: source map
+        return out
+
+
+def _scan_file(path: str, scan: JSScan, check: Optional[Callable[[bytes], None]] = None) -> JSExtract:
+    with open(path, "rb") as fh:
+        while True:
+            window = fh.read(SCAN_WINDOW)
+            if not window:
+                break
+            if check is not None and not scan.size:
+                check(window)
+            scan.feed(window)
+    return scan.close()
+
+
+def extract_js(content: bytes, encoding: str, base: str) -> JSExtract:
+    """Endpoints, likely secrets and the source-map URL of a JS bundle."""
+    scan = JSScan(base, encoding)
+    view = memoryview(content)
+    for i in range(0, len(content), SCAN_WINDOW):
+        scan.feed(bytes(view[i : i + SCAN_WINDOW]))
+    return scan.close()
+
+
+def extract_js_file(path: str, encoding: str, base: str) -> JSExtract:
+    """:func:`extract_js` over a body spooled to disk, read one window at a time."""
+    return _scan_file(path, JSScan(base, encoding))
+
+
+def _check_sourcemap(head: bytes) -> None:
+    # A source map is a JSON object, optionally behind the )]}' XSSI guard.
+    if not head.lstrip().startswith((b"{", b")]}")):
+        raise ValueError("not a source map")
+
+
+def extract_sourcemap_file(path: str, encoding: str) -> JSExtract:
+    """Endpoints of a spooled source map, and likely secrets in its embedded sources.
+
+    The JSON is scanned as raw bytes like a bundle, never parsed, so a
+    50 MB map costs no more memory than a small one.  A body that does not
+    look like a source map raises ``ValueError``.
+    """
+    return _scan_file(path, JSScan(None, encoding, key_re=_MAP_KEY_B), _check_sourcemap)
+
+
+class ParserPool:
+    """Runs extractors in worker processes; small bodies stay in-process."""
+
+    _default: Optional["ParserPool"] = None
+
+    def __init__(self, processes: int = 0, inline_bytes: int = 64 * 1024):
+        self.processes = processes if processes > 0 else (os.cpu_count() or 1)
+        self.inline_bytes = inline_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.offloaded = 0
+        self.inline = 0
+
+    @classmethod
+    def from_settings(cls, s) -> "ParserPool":
+        return cls(processes=s.PARSER_PROCESSES, inline_bytes=s.PARSER_INLINE_BYTES)
+
+    @classmethod
+    def default(cls) -> "ParserPool":
+        """Process-wide pool for callers that were not handed one."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # forkserver/spawn: forking a process that runs threads is unsafe.
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=ctx)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], content: bytes, *args: Any) -> Any:
+        """``fn(content, *args)``, in a worker process when the body is large."""
+        return await self._call(len(content), fn, content, *args)
+
+    async def run_file(self, fn: Callable[..., Any], path: str, size: int, *args: Any) -> Any:
+        """``fn(path, *args)`` for a body spooled to disk; only the path is pickled."""
+        return await self._call(size, fn, path, *args)
+
+    async def _call(self, size: int, fn: Callable[..., Any], *args: Any) -> Any:
+        if size < self.inline_bytes:
+            self.inline += 1
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._pool(), fn, *args)
+        except BrokenProcessPool:
+            self._executor = None
+            self.inline += 1
+            return fn(*args)
+        self.offloaded += 1
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,63 @@
+"""Bounded producer/consumer stages for the streaming scan pipeline.
+
+Discovery and testing run concurrently: hosts flow into harvest, harvested
+URLs into JS mining and deduplication, and new endpoints into the module
+workers.  Every hop is an ``asyncio.Queue`` with a ``maxsize`` so a fast
+stage blocks instead of buffering without bound, and the :data:`EOS`
+marker propagates end-of-stream from one stage to the next.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from rich.console import Console
+
+__all__ = ["EOS", "stage", "feed"]
+
+console = Console()
+
+# End-of-stream marker passed through every queue.
+EOS: Any = object()
+
+
+async def feed(outbox: asyncio.Queue, items: Iterable[Any], close: bool = True) -> None:
+    """Put ``items`` on ``outbox`` (respecting backpressure), then EOS."""
+    for item in items:
+        await outbox.put(item)
+    if close:
+        await outbox.put(EOS)
+
+
+async def stage(
+    inbox: asyncio.Queue,
+    outbox: Optional[asyncio.Queue],
+    fn: Callable[[Any], Awaitable[Optional[Iterable[Any]]]],
+    workers: int,
+    name: str = "stage",
+) -> None:
+    """Run ``fn`` over items from ``inbox`` with ``workers`` consumers.
+
+    Whatever ``fn`` returns is forwarded to ``outbox``.  When EOS arrives,
+    every consumer drains and exits, and a single EOS is sent downstream.
+    """
+
+    async def consume() -> None:
+        while True:
+            item = await inbox.get()
+            if item is EOS:
+                await inbox.put(EOS)  # let sibling consumers see it too
+                return
+            try:
+                out = await fn(item)
+            except Exception as e:  # one bad item must not stall the pipeline
+                console.print(f"[red]{name}:[/] {item!r}: {e}")
+                continue
+            if outbox is not None and out:
+                for o in out:
+                    await outbox.put(o)
+
+    await asyncio.gather(*(consume() for _ in range(max(1, workers))))
+    if outbox is not None:
+        await outbox.put(EOS)
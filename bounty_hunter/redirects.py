@@ -2,12 +2,14 @@ from __future__ import annotations
 import asyncio, httpx
 from dataclasses import dataclass
 from yarl import URL
+from .scheduler import HostScheduler
+from .streaming import PROBE_BYTES, read_capped
 
 @dataclass
 class RedirectFinding: url: str; location: str; curl: str
 class RedirectChecker:
-    def __init__(self, client: httpx.AsyncClient, reporter, settings):
-        self.client=client; self.reporter=reporter; self.settings=settings; self.sem=asyncio.Semaphore(settings.MAX_CONCURRENCY)
+    def __init__(self, client: httpx.AsyncClient, reporter, settings, scheduler: HostScheduler|None=None):
+        self.client=client; self.reporter=reporter; self.settings=settings; self.scheduler=scheduler or HostScheduler.from_settings(settings)
         self.keys=["next","url","redirect","return","r","dest","to"]
     async def run(self, endpoints: list[str]): await asyncio.gather(*(self.check(u) for u in endpoints))
     async def check(self, url: str):
@@ -19,7 +21,7 @@ class RedirectChecker:
             for p in payloads:
                 q[k]=p; test=str(base.with_query(q))
                 try:
-                    async with self.sem: r=await self.client.get(test)
+                    async with self.scheduler.slot(test): r=await read_capped(self.client,test,PROBE_BYTES)
                 except Exception: continue
                 loc=r.headers.get("Location","")
                 if loc.startswith("http") and ("evil.example" in loc or loc.startswith("//evil.example")):
@@ -1,12 +1,13 @@
 from __future__ import annotations
+import asyncio
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple, Dict, Any, List, Set
-from collections import defaultdict
-from urllib.parse import urlparse, parse_qs
+from typing import Tuple, Dict, Any, List, Optional, Set
 
 from slugify import slugify
 from jinja2 import Environment, DictLoader, select_autoescape
+from rich.console import Console
 
 try:
     from cvss import CVSS3  # pip install cvss
@@ -15,6 +16,10 @@ except Exception:  # soft-dep fallback
 
 from .llm import LLM
 from .chain_analyzer import ChainAnalyzer
+from .findings_store import FindingsStore
+from .aggregate import Aggregate, FindingAggregator
+
+console = Console()
 
 
 def calculate_cvss(vector: str) -> Tuple[float, str]:
@@ -73,16 +78,90 @@ TEMPLATES: Dict[str, str] = {
     ),
 }
 
+# Findings written per background flush (same-slug rewrites coalesce within one).
+WRITE_BATCH = 256
+
+ARTIFACT_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".txt", ".log")
+
 # Markdown, not HTML — default autoescape only triggers for html/xml names.
 env = Environment(loader=DictLoader(TEMPLATES), autoescape=select_autoescape())
 
 
+def render_markdown(rec: Dict[str, Any], program: str, artifact: str = "") -> str:
+    """
+    Render one finding record as Markdown.  Records with a ``method`` come
+    from ``write_finding`` and get the confidence, impact and remediation
+    sections; raw ``generic_finding`` records do not.
+    """
+    fence = "```"
+    detailed = bool(rec.get("method"))
+    parts = [f"# {rec['category']}\n\n", f"**Program:** {program}\n", f"**Endpoint:** `{rec['endpoint']}`\n"]
+    if detailed:
+        parts.append(f"**Method:** `{rec['method']}`\n")
+        parts.append(f"**Confidence:** {float(rec.get('confidence') or 0.0):.2f}\n")
+    if rec.get("severity"):
+        parts.append(
+            f"**Severity:** {rec['severity']}\n**CVSS Score:** {rec['score']:.1f}\n"
+            f"**CVSS Vector:** `{rec['vector']}`\n"
+        )
+    parts.append(f"## Proof of Concept\n{fence}bash\n{rec.get('curl', '')}\n{fence}\n")
+    if rec.get("headers"):
+        parts.append(f"## Request Headers\n{fence}http\n{rec['headers']}\n{fence}\n")
+    if rec.get("body"):
+        parts.append(f"## Request Body\n{fence}http\n{rec['body']}\n{fence}\n")
+    parts.append(f"## Evidence (Truncated)\n{fence}text\n{rec.get('evidence', '')}\n{fence}\n")
+    if artifact:
+        parts.append(artifact + "\n")
+    if detailed:
+        parts.append(f"## Impact (Concise)\n{rec.get('impact') or 'Pending triage.'}\n\n")
+        parts.append(
+            "## Remediation Hints\n"
+            "- Sanitize inputs, parameterize queries, encode output.\n"
+            "- Harden SSRF with allowlists and metadata protections.\n"
+        )
+    return "".join(parts)
+
+
 @dataclass
 class ReportWriter:
+    """
+    Writes one Markdown file per finding and records the same fields in a
+    :class:`FindingsStore`; the index is rendered from the store.
+
+    Findings from ``write_finding`` are aggregated first (see
+    :mod:`bounty_hunter.aggregate`).  Disk writes happen off the event loop: findings go onto a bounded queue
+    drained by a background task, which coalesces rewrites of the same slug
+    and flushes each batch in a worker thread.  Call :meth:`flush` before
+    reading the store and :meth:`aclose` when done.
+    """
+
     base: Path
     program: str
     template: str = "index"
     graph: Dict[str, Set[str]] = field(default_factory=dict)
+    queue_size: int = 1000
+    settle_s: float = 5.0
+    max_chains: int = 50
+    store: FindingsStore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.store = FindingsStore(self._dir() / "findings.sqlite3")
+        if self.store.created:
+            self._backfill()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._artifact_index: Optional[Dict[str, Path]] = None
+        self.written = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flush_s = 0.0
+        self.flush_max_s = 0.0
+        self.max_depth = 0
+        self.aggregator = FindingAggregator()
+        self._llm: Optional[LLM] = None
+        self._settler: Optional[asyncio.Task] = None
+        self._settle_lock: Optional[asyncio.Lock] = None
+        self.llm_summaries = 0
 
     def _dir(self) -> Path:
         d = self.base
@@ -91,60 +170,73 @@ class ReportWriter:
 
     async def write_finding(self, f: Any, llm: LLM) -> None:
         """
-        Emit a single finding markdown file based on a 'Finding'-ish object.
+        Record a finding based on a 'Finding'-ish object.
         Expected attributes on f: url, method, category, evidence, curl,
-        headers?, body?, confidence?, cvss?
+        headers?, body?, confidence?, cvss?, param?
+
+        Hits on the same (category, canonical endpoint, parameter) are merged
+        into one aggregate, which is summarised by the LLM and written once
+        no new hit has arrived for ``settle_s`` seconds (and on :meth:`flush`).
         """
+        self._llm = llm
+        self.aggregator.add(f)
+        if self.settle_s <= 0:
+            await self._settle(0)
+        elif self._settler is None:
+            self._settler = asyncio.create_task(self._settle_loop())
+
+    async def _settle_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settle_s / 2)
+            await self._settle(self.settle_s)
+
+    async def _settle(self, quiet_s: float) -> None:
+        """Summarise and emit every aggregate that has been quiet for ``quiet_s``."""
+        if self._settle_lock is None:
+            self._settle_lock = asyncio.Lock()
+        async with self._settle_lock:
+            ready = self.aggregator.settled(quiet_s)
+            for agg in ready:
+                agg.dirty = False  # a hit during the await below marks it again
+            await asyncio.gather(*(self._finalize(agg) for agg in ready))
+
+    async def _finalize(self, agg: Aggregate) -> None:
+        f = agg.best
         # Stable, filesystem-safe name
-        stem = slugify(f"{getattr(f, 'category', 'finding')} {getattr(f, 'url', '')}")[:120] or "finding"
-        path = self._dir() / f"{stem}.md"
+        stem = slugify(agg.slug_source)[:120] or "finding"
 
-        # LLM risk summary (best-effort)
-        try:
-            prompt = (
-                f"URL: {getattr(f,'url','')}\n"
-                f"Method: {getattr(f,'method','')}\n"
-                f"Evidence:\n{getattr(f,'evidence','')[:1000]}"
-            )
-            impact = await llm.summarize_risk(prompt) if llm else ""
-        except Exception:
+        # LLM risk summary (best-effort), once per representative finding
+        if agg.impact is None:
             impact = ""
+            if self._llm is not None and self._llm.enabled:
+                try:
+                    impact = await self._llm.summarize_risk(agg.prompt())
+                except Exception:
+                    pass
+                self.llm_summaries += 1
+            # A better variant merged meanwhile resets the summary; it is redone next settle.
+            if agg.best is f:
+                agg.impact = impact
 
         # CVSS
         vector = getattr(f, "cvss", "") or ""
         score, severity = calculate_cvss(vector) if vector else (0.0, "")
 
-        # Optional fields
-        headers = self._scrub_headers(getattr(f, "headers", "") or "")
-        body = getattr(f, "body", "") or ""
-        confidence = float(getattr(f, "confidence", 0.0))
-
-        artifact = self._artifact_snippet(stem)
-
-        cvss_block = (
-            f"**Severity:** {severity}\n**CVSS Score:** {score:.1f}\n**CVSS Vector:** `{vector}`\n"
-            if severity
-            else ""
-        )
-
-        md = (
-            f"# {getattr(f,'category','Finding')}\n\n"
-            f"**Program:** {self.program}\n"
-            f"**Endpoint:** `{getattr(f,'url','')}`\n"
-            f"**Method:** `{getattr(f,'method','')}`\n"
-            f"**Confidence:** {confidence:.2f}\n"
-            f"{cvss_block}"
-            f"## Proof of Concept\n```bash\n{getattr(f,'curl','')}\n```\n"
-            f"{f'## Request Headers\n```http\n{headers}\n```\n' if headers else ''}"
-            f"{f'## Request Body\n```http\n{body}\n```\n' if body else ''}"
-            f"## Evidence (Truncated)\n```text\n{getattr(f,'evidence','')}\n```\n"
-            f"{(artifact + '\n') if artifact else ''}"
-            f"## Impact (Concise)\n{impact or 'Pending triage.'}\n\n"
-            f"## Remediation Hints\n"
-            f"- Sanitize inputs, parameterize queries, encode output.\n"
-            f"- Harden SSRF with allowlists and metadata protections.\n"
-        )
-        path.write_text(md, encoding="utf-8")
+        rec = {
+            "category": agg.key[0],
+            "endpoint": getattr(f, "url", ""),
+            "method": getattr(f, "method", ""),
+            "confidence": agg.confidence,
+            "severity": severity,
+            "score": score,
+            "vector": vector,
+            "curl": getattr(f, "curl", ""),
+            "headers": self._scrub_headers(getattr(f, "headers", "") or ""),
+            "body": getattr(f, "body", "") or "",
+            "evidence": agg.evidence(),
+            "impact": agg.impact,
+        }
+        await self._emit(stem, rec)
 
     async def generic_finding(
         self,
@@ -157,79 +249,117 @@ class ReportWriter:
         cvss_vector: str = "",
     ) -> None:
         """
-        Create a finding file from raw fields (no LLM involvement).
+        Create a finding from raw fields (no LLM involvement).
         """
         stem = slugify(f"{category} {endpoint}")[:120] or "finding"
-        path = self._dir() / f"{stem}.md"
         score, severity = calculate_cvss(cvss_vector) if cvss_vector else (0.0, "")
-        artifact = self._artifact_snippet(stem)
-        cvss_block = (
-            f"**Severity:** {severity}\n**CVSS Score:** {score:.1f}\n**CVSS Vector:** `{cvss_vector}`\n"
-            if severity
-            else ""
-        )
-
-        scrubbed_headers = self._scrub_headers(headers)
-        md = (
-            f"# {category}\n\n"
-            f"**Program:** {self.program}\n"
-            f"**Endpoint:** `{endpoint}`\n"
-            f"{cvss_block}"
-            f"## Proof of Concept\n```bash\n{curl}\n```\n"
-            f"{f'## Request Headers\n```http\n{scrubbed_headers}\n```\n' if scrubbed_headers else ''}"
-            f"{f'## Request Body\n```http\n{body}\n```\n' if body else ''}"
-            f"## Evidence (Truncated)\n```text\n{evidence}\n```\n"
-            f"{(artifact + '\n') if artifact else ''}"
-        )
-        path.write_text(md, encoding="utf-8")
+        rec = {
+            "category": category,
+            "endpoint": endpoint,
+            "severity": severity,
+            "score": score,
+            "vector": cvss_vector,
+            "curl": curl,
+            "headers": self._scrub_headers(headers),
+            "body": body,
+            "evidence": evidence,
+        }
+        await self._emit(stem, rec)
+
+    async def _emit(self, stem: str, rec: Dict[str, Any]) -> None:
+        """Queue the finding for the background writer (blocks while the queue is full)."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=max(1, self.queue_size))
+            self._writer = asyncio.create_task(self._write_loop())
+        await self._queue.put((stem, rec))
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    async def _write_loop(self) -> None:
+        q = self._queue
+        while True:
+            batch: Dict[str, Dict[str, Any]] = {}
+            items = [await q.get()]
+            while len(items) < WRITE_BATCH and not q.empty():
+                items.append(q.get_nowait())
+            for stem, rec in items:
+                batch[stem] = rec  # a later write of the same slug wins
+            self.coalesced += len(items) - len(batch)
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._flush_batch, batch)
+            except Exception as e:  # keep draining; one bad batch must not wedge the scan
+                console.print(f"[red]report:[/] failed to write {len(batch)} findings: {e}")
+            elapsed = time.perf_counter() - start
+            self.flushes += 1
+            self.flush_s += elapsed
+            self.flush_max_s = max(self.flush_max_s, elapsed)
+            for _ in items:
+                q.task_done()
+
+    def _flush_batch(self, batch: Dict[str, Dict[str, Any]]) -> None:
+        """Record findings in the store, then write their Markdown (worker thread)."""
+        self.store.put_many((stem, rec) for stem, rec in batch.items())
+        d = self._dir()
+        for stem, rec in batch.items():
+            md = render_markdown(rec, self.program, self._artifact_snippet(stem))
+            (d / f"{stem}.md").write_text(md, encoding="utf-8")
+            self.written += 1
+
+    async def flush(self) -> None:
+        """Emit pending aggregates and wait until every queued finding is on disk."""
+        await self._settle(0)
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        await self.flush()
+        if self._settler is not None:
+            self._settler.cancel()
+            self._settler = None
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        self.close()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            **self.aggregator.summary(),
+            "llm_summaries": self.llm_summaries,
+            "written": self.written,
+            "coalesced": self.coalesced,
+            "max_depth": self.max_depth,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "flush_avg_ms": 1000 * self.flush_s / self.flushes if self.flushes else 0.0,
+            "flush_max_ms": 1000 * self.flush_max_s,
+        }
 
     def finish_index(self, scope_note: str = "") -> str:
         """
-        Render an index for all findings in the directory (excluding INDEX.md).
+        Render an index for all findings in the store.
         Returns the markdown string (caller may choose to write it).
         """
-        files = sorted([f for f in self._dir().glob("*.md") if f.name != "INDEX.md"])
         items: List[Dict[str, str]] = []
-        for fpath in files:
-            txt = fpath.read_text(errors="ignore", encoding="utf-8")
-            first = txt.splitlines()[0].lstrip("# ").strip() if txt else fpath.stem
+        for row in self.store.all():
             items.append(
                 {
-                    "name": fpath.stem,
-                    "filename": fpath.name,
-                    "category": first,
-                    "endpoint": self._extract_field(txt, "Endpoint:"),
-                    "curl": self._extract_block(txt, "Proof of Concept"),
-                    "headers": self._scrub_headers(self._extract_block(txt, "Request Headers")),
-                    "body": self._extract_block(txt, "Request Body"),
-                    "evidence": self._extract_block(txt, "Evidence"),
-                    "impact": self._extract_section(txt, "Impact"),
-                    "severity": self._extract_field(txt, "Severity:"),
-                    "score": self._extract_field(txt, "CVSS Score:"),
-                    "artifact": self._artifact_snippet(fpath.stem),
+                    "name": row["slug"],
+                    "filename": f"{row['slug']}.md",
+                    "category": row["category"],
+                    "endpoint": row["endpoint"],
+                    "curl": row["curl"].strip()[:600],
+                    "headers": row["headers"].strip()[:600],
+                    "body": row["body"].strip()[:600],
+                    "evidence": row["evidence"].strip()[:600],
+                    "impact": row["impact"],
+                    "severity": row["severity"],
+                    "score": f"{row['score']:.1f}" if row["severity"] else "",
+                    "artifact": self._artifact_snippet(row["slug"]),
                 }
             )
-        # Build a graph linking findings with shared parameters or endpoints
-        param_map: Dict[str, Set[str]] = defaultdict(set)
-        path_map: Dict[str, Set[str]] = defaultdict(set)
-        for item in items:
-            endpoint = item.get("endpoint", "")
-            if not endpoint:
-                continue
-            parsed = urlparse(endpoint)
-            if parsed.path:
-                path_map[parsed.path].add(item["name"])
-            for p in parse_qs(parsed.query).keys():
-                param_map[p].add(item["name"])
-
-        graph: Dict[str, Set[str]] = {item["name"]: set() for item in items}
-        for names in list(param_map.values()) + list(path_map.values()):
-            for src in names:
-                graph[src].update(names - {src})
-        self.graph = graph
-
-        # Analyze potential exploit chains
-        chains = ChainAnalyzer(graph, items).suggest()
+        # Analyze potential exploit chains between findings sharing a parameter or path
+        analyzer = ChainAnalyzer(items, max_per_rule=self.max_chains)
+        chains = analyzer.suggest()
+        self.graph = analyzer.graph
 
         tpl = env.get_template(self.template if self.template in TEMPLATES else "index")
         return tpl.render(
@@ -239,6 +369,33 @@ class ReportWriter:
             chains=chains,
         )
 
+    def _backfill(self) -> None:
+        """Load findings from Markdown files written before the store existed."""
+        for fpath in sorted(self._dir().glob("*.md")):
+            if fpath.name == "INDEX.md":
+                continue
+            txt = fpath.read_text(errors="ignore", encoding="utf-8")
+            score = self._extract_field(txt, "CVSS Score:")
+            confidence = self._extract_field(txt, "Confidence:")
+            impact = self._extract_section(txt, "Impact (Concise)")
+            self.store.put(
+                fpath.stem,
+                category=txt.splitlines()[0].lstrip("# ").strip() if txt else fpath.stem,
+                endpoint=self._extract_field(txt, "Endpoint:"),
+                method=self._extract_field(txt, "Method:"),
+                confidence=float(confidence) if confidence else None,
+                severity=self._extract_field(txt, "Severity:"),
+                score=float(score) if score else 0.0,
+                vector=self._extract_field(txt, "CVSS Vector:"),
+                curl=self._extract_block(txt, "Proof of Concept"),
+                headers=self._extract_block(txt, "Request Headers"),
+                body=self._extract_block(txt, "Request Body"),
+                evidence=self._extract_block(txt, "Evidence"),
+                impact="" if impact == "Pending triage." else impact,
+            )
+
+    def close(self) -> None:
+        self.store.close()
 
     # Optional convenience: write the index file to disk.
     def write_index(self, scope_note: str = "") -> Path:
@@ -251,29 +408,33 @@ class ReportWriter:
 
     @staticmethod
     def _extract_field(txt: str, key: str) -> str:
+        """Value of a ``**Key:** value`` line (backticks stripped)."""
+        prefix = f"**{key}**"
         for line in txt.splitlines():
-            if line.strip().startswith(key):
-                return line.split(key, 1)[-1].strip().strip("`").strip()
+            if line.startswith(prefix):
+                return line[len(prefix) :].strip().strip("`")
         return ""
 
     @staticmethod
     def _extract_block(txt: str, header: str) -> str:
-        """
-        Naive code-fence grab: returns the first fenced block after the header label.
-        """
-        loc = txt.lower().find(header.lower())
+        """Body of the first fenced block after ``## header`` (language tag dropped)."""
+        loc = txt.find(f"## {header}")
         if loc == -1:
             return ""
-        segment = txt[loc:]
-        parts = segment.split("```")
-        if len(parts) >= 3:
-            return parts[1].strip()[:600]
-        return ""
+        parts = txt[loc:].split("```")
+        if len(parts) < 3:
+            return ""
+        return parts[1].split("\n", 1)[-1].rstrip("\n")
 
     @staticmethod
     def _extract_section(txt: str, header: str) -> str:
-        i = txt.lower().find(header.lower())
-        return "" if i == -1 else txt[i : i + 400]
+        """Plain text between ``## header`` and the next ``## `` heading."""
+        i = txt.find(f"## {header}")
+        if i == -1:
+            return ""
+        rest = txt[i:].split("\n", 1)[-1]
+        j = rest.find("\n## ")
+        return (rest if j == -1 else rest[:j]).strip()
 
     @staticmethod
     def _scrub_headers(headers: str) -> str:
@@ -297,22 +458,31 @@ class ReportWriter:
                 cleaned.append(line)
         return "\n".join(cleaned)
 
-    @staticmethod
-    def _artifact_snippet(slug: str) -> str:
+    def _artifacts(self) -> Dict[str, Path]:
+        """slug -> artifact path, from one listing of ``artifacts/`` (first extension wins)."""
+        if self._artifact_index is None:
+            index: Dict[str, Path] = {}
+            d = Path("artifacts")
+            if d.is_dir():
+                rank = {ext: i for i, ext in enumerate(ARTIFACT_EXTS)}
+                for p in sorted(d.iterdir(), key=lambda p: rank.get(p.suffix, len(rank))):
+                    if p.suffix in rank:
+                        index.setdefault(p.stem, p)
+            self._artifact_index = index
+        return self._artifact_index
+
+    def _artifact_snippet(self, slug: str) -> str:
         """
         If artifacts/<slug>.(png|jpg|jpeg|gif|txt|log) exists, inline a snippet.
         """
-        d = Path("artifacts")
-        if not d.exists():
+        p = self._artifacts().get(slug)
+        if p is None:
             return ""
-        for ext in (".png", ".jpg", ".jpeg", ".gif", ".txt", ".log"):
-            p = d / f"{slug}{ext}"
-            if p.exists():
-                if ext in (".png", ".jpg", ".jpeg", ".gif"):
-                    return f"![]({p.as_posix()})"
-                try:
-                    txt = p.read_text(errors="ignore", encoding="utf-8")[:600]
-                except Exception:
-                    txt = p.read_bytes()[:600].decode("utf-8", errors="ignore")
-                return f"```{ext.lstrip('.')}\n{txt}\n```"
-        return ""
+        ext = p.suffix
+        if ext in (".png", ".jpg", ".jpeg", ".gif"):
+            return f"![]({p.as_posix()})"
+        try:
+            txt = p.read_text(errors="ignore", encoding="utf-8")[:600]
+        except Exception:
+            txt = p.read_bytes()[:600].decode("utf-8", errors="ignore")
+        return f"```{ext.lstrip('.')}\n{txt}\n```"
@@ -0,0 +1,288 @@
+"""Bulk asynchronous DNS liveness checks.
+
+Subdomain enumeration returns every name a certificate log or passive DNS
+feed has ever seen, and most of them no longer resolve; each dead name then
+costs a full connect timeout in every module.  :class:`DNSLiveness` resolves
+candidate hosts with its own concurrency limit before anything is sent to
+them, and passes on only the names that have an A or AAAA record.
+
+:class:`Resolver` is a minimal stub resolver speaking DNS over UDP to the
+configured nameservers (``/etc/resolv.conf`` by default), so a test can point
+it at a local stub server; without any nameserver it falls back to the
+system's ``getaddrinfo``.  Answers are cached in SQLite under the report root
+for their TTL, and NXDOMAIN/no-data answers for a fixed negative TTL, so
+repeat scans only re-resolve what has expired.  Timeouts and server failures
+are never cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import socket
+import sqlite3
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+__all__ = ["Answer", "DNSCache", "DNSLiveness", "Resolver", "parse_nameservers"]
+
+# Cap on how long a positive answer is trusted, whatever its TTL.
+MAX_TTL_S = 86400
+# TTL assumed for getaddrinfo answers, which carry none.
+SYSTEM_TTL_S = 300
+
+_A, _AAAA = 1, 28
+_NOERROR, _NXDOMAIN = 0, 3
+
+
+@dataclass
+class Answer:
+    # "ok", "nxdomain", "nodata" or "error" (timeout, SERVFAIL, malformed reply)
+    status: str
+    addrs: List[str] = field(default_factory=list)
+    ttl: int = 0
+
+
+def parse_nameservers(spec: str) -> List[Tuple[str, int]]:
+    """``"10.0.0.1, 127.0.0.1:5353"`` -> ``[("10.0.0.1", 53), ("127.0.0.1", 5353)]``."""
+    out = []
+    for part in spec.replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        host, port = part, 53
+        if part.startswith("["):  # [v6]:port
+            host, _, rest = part[1:].partition("]")
+            port = int(rest[1:]) if rest.startswith(":") else 53
+        elif part.count(":") == 1:
+            host, _, p = part.partition(":")
+            port = int(p)
+        out.append((host, port))
+    return out
+
+
+def _system_nameservers(path: str = "/etc/resolv.conf") -> List[Tuple[str, int]]:
+    try:
+        lines = Path(path).read_text().splitlines()
+    except OSError:
+        return []
+    return [(ln.split()[1], 53) for ln in lines if ln.startswith("nameserver") and len(ln.split()) > 1]
+
+
+def _query(qid: int, host: str, qtype: int) -> bytes:
+    labels = host.rstrip(".").encode("idna").split(b".")
+    qname = b"".join(bytes([len(lb)]) + lb for lb in labels) + b"\0"
+    return struct.pack(">HHHHHH", qid, 0x0100, 1, 0, 0, 0) + qname + struct.pack(">HH", qtype, 1)
+
+
+def _skip_name(buf: bytes, off: int) -> int:
+    while True:
+        n = buf[off]
+        if n == 0:
+            return off + 1
+        if n & 0xC0 == 0xC0:  # compression pointer ends the name
+            return off + 2
+        off += n + 1
+
+
+def _parse(buf: bytes, qtype: int) -> Answer:
+    _, flags, qd, an, _, _ = struct.unpack_from(">HHHHHH", buf)
+    rcode = flags & 0xF
+    if rcode == _NXDOMAIN:
+        return Answer("nxdomain")
+    if rcode != _NOERROR:
+        return Answer("error")
+    off = 12
+    for _ in range(qd):
+        off = _skip_name(buf, off) + 4
+    addrs, ttls = [], []
+    family = socket.AF_INET if qtype == _A else socket.AF_INET6
+    for _ in range(an):
+        off = _skip_name(buf, off)
+        rtype, _, ttl, rdlen = struct.unpack_from(">HHIH", buf, off)
+        off += 10
+        if rtype == qtype:
+            addrs.append(socket.inet_ntop(family, buf[off : off + rdlen]))
+            ttls.append(ttl)
+        off += rdlen
+    return Answer("ok", addrs, min(ttls)) if addrs else Answer("nodata")
+
+
+class _Exchange(asyncio.DatagramProtocol):
+    def __init__(self, qid: int):
+        self.qid = qid
+        self.reply: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if len(data) >= 12 and int.from_bytes(data[:2], "big") == self.qid and not self.reply.done():
+            self.reply.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        if not self.reply.done():
+            self.reply.set_exception(exc)
+
+
+class Resolver:
+    def __init__(
+        self,
+        nameservers: Optional[List[Tuple[str, int]]] = None,
+        timeout: float = 2.0,
+        retries: int = 1,
+    ):
+        self.nameservers = _system_nameservers() if nameservers is None else list(nameservers)
+        self.timeout = timeout
+        self.retries = retries
+
+    @classmethod
+    def from_settings(cls, s) -> "Resolver":
+        ns = parse_nameservers(s.DNS_RESOLVERS) if s.DNS_RESOLVERS else None
+        return cls(ns, timeout=s.DNS_TIMEOUT_S)
+
+    async def _exchange(self, host: str, qtype: int) -> Answer:
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            server = self.nameservers[attempt % len(self.nameservers)]
+            qid = random.getrandbits(16)
+            transport, proto = await loop.create_datagram_endpoint(
+                lambda: _Exchange(qid), remote_addr=server
+            )
+            try:
+                transport.sendto(_query(qid, host, qtype))
+                reply = await asyncio.wait_for(proto.reply, self.timeout)
+                return _parse(reply, qtype)
+            except (asyncio.TimeoutError, OSError):
+                continue
+            finally:
+                transport.close()
+        return Answer("error")
+
+    async def resolve(self, host: str) -> Answer:
+        """A records, else AAAA records, of ``host``."""
+        try:
+            if not self.nameservers:
+                return await self._system(host)
+            ans = await self._exchange(host, _A)
+            if ans.status == "nodata":
+                ans = await self._exchange(host, _AAAA)
+            return ans
+        except (UnicodeError, ValueError, struct.error, IndexError):
+            return Answer("error")
+
+    async def _system(self, host: str) -> Answer:
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(loop.getaddrinfo(host, None, type=socket.SOCK_STREAM), self.timeout)
+        except socket.gaierror as e:
+            return Answer("nxdomain" if e.errno == socket.EAI_NONAME else "error")
+        except asyncio.TimeoutError:
+            return Answer("error")
+        return Answer("ok", sorted({i[4][0] for i in infos}), SYSTEM_TTL_S)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dns_cache (
+    host TEXT PRIMARY KEY,
+    addrs TEXT NOT NULL,
+    expires REAL NOT NULL
+)
+"""
+
+
+class DNSCache:
+    """Resolved addresses per host until they expire; an empty list is a cached negative."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+
+    def get(self, host: str) -> Optional[List[str]]:
+        row = self._db.execute("SELECT addrs, expires FROM dns_cache WHERE host=?", (host,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def put(self, host: str, addrs: List[str], ttl_s: float) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO dns_cache VALUES (?,?,?)", (host, json.dumps(addrs), time.time() + ttl_s)
+        )
+
+    def close(self) -> None:
+        try:
+            self._db.execute("DELETE FROM dns_cache WHERE expires < ?", (time.time(),))
+        finally:
+            self._db.close()
+
+
+class DNSLiveness:
+    def __init__(
+        self,
+        resolver: Resolver,
+        cache: Optional[DNSCache] = None,
+        *,
+        concurrency: int = 200,
+        negative_ttl_s: float = 3600,
+    ):
+        self.resolver = resolver
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.negative_ttl_s = negative_ttl_s
+        self.live = 0
+        self.dead = 0
+        self.errors = 0
+        self.cached = 0
+
+    @classmethod
+    def from_settings(cls, s, cache_dir: Path | None = None) -> "DNSLiveness":
+        cache = DNSCache(cache_dir / "dns_cache.sqlite3") if cache_dir is not None and s.DNS_CACHE_ENABLED else None
+        return cls(
+            Resolver.from_settings(s),
+            cache,
+            concurrency=s.DNS_CONCURRENCY,
+            negative_ttl_s=s.DNS_NEGATIVE_TTL_S,
+        )
+
+    async def _resolves(self, host: str) -> bool:
+        addrs = self.cache.get(host) if self.cache is not None else None
+        if addrs is not None:
+            self.cached += 1
+        else:
+            ans = await self.resolver.resolve(host)
+            if ans.status == "error":
+                self.errors += 1
+                return False
+            addrs = ans.addrs
+            if self.cache is not None:
+                ttl = min(ans.ttl, MAX_TTL_S) if addrs else self.negative_ttl_s
+                self.cache.put(host, addrs, ttl)
+        if addrs:
+            self.live += 1
+        else:
+            self.dead += 1
+        return bool(addrs)
+
+    async def filter(self, hosts: Iterable[str]) -> List[str]:
+        """The distinct ``hosts`` that resolve, in their original order."""
+        sem = asyncio.Semaphore(self.concurrency)
+        todo = list(dict.fromkeys(h.lower().rstrip(".") for h in hosts if h))
+
+        async def check(host: str) -> bool:
+            async with sem:
+                return await self._resolves(host)
+
+        ok = await asyncio.gather(*(check(h) for h in todo))
+        return [h for h, alive in zip(todo, ok) if alive]
+
+    def stats(self) -> dict[str, int]:
+        return {"live": self.live, "dead": self.dead, "errors": self.errors, "cached": self.cached}
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.close()
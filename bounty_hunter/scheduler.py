@@ -0,0 +1,270 @@
+"""Host-aware request scheduling.
+
+A single :class:`HostScheduler` is shared by every module of a scan.  It
+enforces the global ``MAX_CONCURRENCY`` limit as well as the ``PER_HOST``
+limit, keeping a FIFO queue of waiters per host and handing free slots to
+hosts in round-robin order.  A chunk dominated by one origin therefore
+cannot starve the others or flood that origin with in-flight requests.
+
+With ``adaptive=True`` each host's limit is driven by an AIMD controller:
+every window of observed responses the limit grows by one while the origin
+is healthy and halves when the 5xx/429/transport-error rate or the p90
+latency spikes.  The limit is resized in place, so queued waiters see the
+change immediately, and the state outlives individual chunks and modules.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+__all__ = ["HostScheduler", "host_key", "stage_var"]
+
+# Pipeline stage the current task belongs to; requests are counted per stage.
+stage_var: ContextVar[str] = ContextVar("bh_stage", default="other")
+
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def host_key(url: str) -> str:
+    """Return the scheduling key (``host[:port]``) for ``url``.
+
+    Credentials and the scheme's default port are dropped and IDNs are
+    punycoded, so ``https://u@h:443/`` and ``https://h/`` share one key, as
+    they do on the wire and in the response hook.
+    """
+    try:
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port
+        if host and not host.isascii():
+            host = host.encode("idna").decode("ascii")
+    except (ValueError, UnicodeError):
+        return url
+    if not host:
+        return url
+    if ":" in host:  # IPv6 literal
+        host = f"[{host}]"
+    if port is None or _DEFAULT_PORTS.get(parts.scheme.lower()) == port:
+        return host
+    return f"{host}:{port}"
+
+
+# Status codes that signal an overloaded or rate-limiting origin.
+BACKOFF_STATUSES = frozenset({429, 502, 503, 504})
+
+
+@dataclass
+class _HostRate:
+    """AIMD congestion state for one host."""
+
+    limit: float
+    count: int = 0
+    errors: int = 0
+    samples: List[float] = field(default_factory=list)
+    base_p50: Optional[float] = None
+
+
+class HostScheduler:
+    """Fair scheduler enforcing global and per-host concurrency limits."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        per_host: int,
+        adaptive: bool = False,
+        window: int = 20,
+        error_rate: float = 0.2,
+        latency_factor: float = 3.0,
+    ):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host = max(1, int(per_host))
+        self.adaptive = adaptive
+        self.window = max(1, int(window))
+        self.error_rate = error_rate
+        self.latency_factor = latency_factor
+        self._active = 0
+        self._host_active: Dict[str, int] = {}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._ring: Deque[str] = deque()
+        self._rates: Dict[str, _HostRate] = {}
+        self.requests: Counter[str] = Counter()
+
+    @classmethod
+    def from_settings(cls, settings) -> "HostScheduler":
+        return cls(
+            getattr(settings, "MAX_CONCURRENCY", 40),
+            getattr(settings, "PER_HOST", 5),
+            adaptive=bool(getattr(settings, "ADAPTIVE_RATE", False)),
+        )
+
+    # ----------------- public API -----------------
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one request slot for the host of ``url``."""
+        host = host_key(url)
+        await self.acquire(host)
+        self.requests[stage_var.get()] += 1
+        try:
+            yield
+        except httpx.TransportError:
+            # Timeouts/resets never reach the response hook; count them here.
+            self.observe(host, None, None)
+            raise
+        finally:
+            self.release(host)
+
+    async def acquire(self, host: str) -> None:
+        if self._can_start(host) and not self._waiters.get(host):
+            self._start(host)
+            return
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        queue = self._waiters.setdefault(host, deque())
+        queue.append(fut)
+        if len(queue) == 1:
+            self._ring.append(host)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was granted just before cancellation; hand it back.
+                self.release(host)
+            else:
+                self._drop_waiter(host, fut)
+            raise
+
+    def release(self, host: str) -> None:
+        self._active -= 1
+        left = self._host_active.get(host, 1) - 1
+        if left > 0:
+            self._host_active[host] = left
+        else:
+            self._host_active.pop(host, None)
+        self._dispatch()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active": self._active,
+            "hosts_active": len(self._host_active),
+            "waiting": sum(len(q) for q in self._waiters.values()),
+        }
+
+    def limits(self) -> dict[str, int]:
+        """Current adaptive per-host limits (empty when not adaptive)."""
+        return {h: int(r.limit) for h, r in self._rates.items()}
+
+    # ----------------- congestion control -----------------
+
+    def install(self, client: httpx.AsyncClient) -> None:
+        """Register response hooks on ``client`` that feed :meth:`observe`."""
+        if not self.adaptive:
+            return
+        client.event_hooks["request"].append(self._on_request)
+        client.event_hooks["response"].append(self._on_response)
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        request.extensions["bh_t0"] = asyncio.get_running_loop().time()
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        t0 = response.request.extensions.get("bh_t0")
+        latency = asyncio.get_running_loop().time() - t0 if t0 is not None else None
+        self.observe(host_key(str(response.request.url)), response.status_code, latency)
+
+    def observe(self, host: str, status: Optional[int], latency: Optional[float]) -> None:
+        """Record one outcome for ``host``; ``status=None`` means a transport error."""
+        if not self.adaptive:
+            return
+        rate = self._rates.get(host)
+        if rate is None:
+            rate = self._rates[host] = _HostRate(limit=float(self.per_host))
+        rate.count += 1
+        if status is None or status in BACKOFF_STATUSES or status >= 500:
+            rate.errors += 1
+        if latency is not None:
+            rate.samples.append(latency)
+        if rate.count >= self.window:
+            self._adjust(rate)
+
+    def _adjust(self, rate: _HostRate) -> None:
+        err = rate.errors / rate.count
+        slow = False
+        if rate.samples:
+            ordered = sorted(rate.samples)
+            p50 = ordered[len(ordered) // 2]
+            p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+            if rate.base_p50 is None or p50 < rate.base_p50:
+                rate.base_p50 = p50
+            slow = p90 > self.latency_factor * max(rate.base_p50, 0.05)
+        rate.count = rate.errors = 0
+        rate.samples.clear()
+        if err > self.error_rate or slow:
+            rate.limit = max(1.0, rate.limit / 2)  # multiplicative decrease
+        elif rate.limit < self.per_host:
+            rate.limit = min(float(self.per_host), rate.limit + 1)  # additive increase
+            self._dispatch()
+
+    # ----------------- internals -----------------
+
+    def _limit(self, host: str) -> int:
+        rate = self._rates.get(host)
+        return self.per_host if rate is None else int(rate.limit)
+
+    def _can_start(self, host: str) -> bool:
+        return (
+            self._active < self.max_concurrency
+            and self._host_active.get(host, 0) < self._limit(host)
+        )
+
+    def _start(self, host: str) -> None:
+        self._active += 1
+        self._host_active[host] = self._host_active.get(host, 0) + 1
+
+    def _drop_waiter(self, host: str, fut: asyncio.Future) -> None:
+        queue = self._waiters.get(host)
+        if not queue:
+            return
+        try:
+            queue.remove(fut)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiters[host]
+            try:
+                self._ring.remove(host)
+            except ValueError:
+                pass
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting hosts, one per host per pass."""
+        idle_passes = 0
+        while self._ring and self._active < self.max_concurrency:
+            host = self._ring.popleft()
+            queue = self._waiters.get(host)
+            if not queue:
+                self._waiters.pop(host, None)
+                continue
+            granted = False
+            if self._host_active.get(host, 0) < self._limit(host):
+                fut = queue.popleft()
+                if not fut.done():
+                    self._start(host)
+                    fut.set_result(None)
+                    granted = True
+            if queue:
+                self._ring.append(host)
+            else:
+                del self._waiters[host]
+            if granted:
+                idle_passes = 0
+            else:
+                idle_passes += 1
+                if idle_passes > len(self._ring):
+                    break
@@ -4,9 +4,19 @@ Each category contains a list of compiled regular expressions so that new
 patterns can be appended over time as they are discovered.  Keeping the
 patterns centralised here allows other modules to share the same indicators and
 remain backward compatible across branches.
+
+:data:`MATCHER` compiles every category into one combined expression that
+scans a response body once and reports all categories that matched.  A
+literal prefilter (sentinels such as ``BHXSS``/``BHSTI`` and error keywords)
+runs first, so bodies without any candidate skip the regexes entirely.
+Categories the combined pass did not report are re-checked with their own
+patterns, because one category's match can overlap and hide another's.
 """
 
+from __future__ import annotations
+
 import re
+from typing import Iterable, Mapping, Sequence
 
 # --- XSS -------------------------------------------------------------------
 # The XSS list includes multiple representations of the sentinel value used by
@@ -35,7 +45,134 @@ SSTI_PATTERNS = [
     re.compile(r"{{\s*7\s*\*\s*7\s*}}", re.I),
 ]
 
+# --- SSRF ------------------------------------------------------------------
+# Internal addresses echoed back when a server fetched an injected URL.
+SSRF_PATTERNS = [
+    re.compile(r"169\.254\.169\.254"),
+    re.compile(r"127\.0\.0\.1"),
+    re.compile(r"localhost"),
+]
+
 # Responses taking longer than this threshold (in seconds) are flagged as
 # potential time-based vulnerabilities (e.g. time-based SQLi).
 RESPONSE_TIME_THRESHOLD = 5.0
 
+
+
+# Literal triggers per category.  A body can only match a category if it
+# contains (case-insensitively) at least one of these entries; a tuple entry
+# triggers only when all of its strings occur.
+PREFILTER_LITERALS = {
+    "xss": ("bhxss",),
+    "sqli": ("sql", "pdo", "ora-", "union"),
+    "ssti": ("bhsti", ("7", "*")),
+    "ssrf": ("169.254.169.254", "127.0.0.1", "localhost"),
+}
+
+
+def _lower_source(src: str) -> str:
+    """Lower-case a pattern's literal characters, leaving escapes intact.
+
+    Lets case-insensitive patterns run case-sensitively over a lowered body,
+    which is several times faster than ``re.I`` in CPython.
+    """
+    out: list[str] = []
+    i = 0
+    while i < len(src):
+        ch = src[i]
+        if ch == "\\" and i + 1 < len(src):
+            out.append(src[i : i + 2])
+            i += 2
+            continue
+        out.append(ch.lower())
+        i += 1
+    return "".join(out)
+
+
+class SignatureMatcher:
+    """Single-pass, multi-category signature matcher."""
+
+    def __init__(
+        self,
+        categories: Mapping[str, Sequence[re.Pattern]],
+        literals: Mapping[str, Sequence[str | Sequence[str]]],
+    ):
+        self.categories = tuple(categories)
+        # re.I patterns are folded into one combined expression over the
+        # lowered body; case-sensitive ones are searched on the original.
+        self._folded = {
+            name: [_lower_source(p.pattern) for p in pats if p.flags & re.I]
+            for name, pats in categories.items()
+        }
+        self._exact = {
+            name: [p for p in pats if not p.flags & re.I]
+            for name, pats in categories.items()
+        }
+        self._literals = {
+            name: tuple(
+                (lit.lower(),) if isinstance(lit, str) else tuple(part.lower() for part in lit)
+                for lit in literals.get(name, ())
+            )
+            for name in self.categories
+        }
+        self._combined: dict[frozenset[str], re.Pattern | None] = {}
+        self._single = {
+            name: re.compile("|".join(f"(?:{s})" for s in folded)) if folded else None
+            for name, folded in self._folded.items()
+        }
+
+    def _combined_for(self, names: frozenset[str]) -> re.Pattern | None:
+        if names not in self._combined:
+            groups = [
+                f"(?P<{name}>{'|'.join(f'(?:{s})' for s in self._folded[name])})"
+                for name in self.categories
+                if name in names and self._folded[name]
+            ]
+            self._combined[names] = re.compile("|".join(groups)) if groups else None
+        return self._combined[names]
+
+    def candidates(self, lowered: str, wanted: Iterable[str]) -> set[str]:
+        """Categories in ``wanted`` whose literal triggers occur in ``lowered``."""
+        return {
+            name
+            for name in wanted
+            if any(all(part in lowered for part in lit) for lit in self._literals.get(name, ()))
+            or not self._literals.get(name)
+        }
+
+    def match(self, text: str, categories: Iterable[str] | None = None) -> set[str]:
+        """Return every category (optionally restricted) that matches ``text``."""
+        if not text:
+            return set()
+        wanted = self.categories if categories is None else tuple(categories)
+        lowered = text.lower()
+        cands = self.candidates(lowered, wanted)
+        if not cands:
+            return set()
+        found: set[str] = set()
+        combined = self._combined_for(frozenset(cands))
+        if combined is not None:
+            for m in combined.finditer(lowered):
+                found.add(m.lastgroup)
+                if len(found) == len(cands):
+                    return found
+        # finditer only yields non-overlapping matches, so a category can be
+        # hidden inside another's match; check the rest on their own.
+        for name in cands - found:
+            single = self._single[name]
+            if (single is not None and single.search(lowered)) or any(
+                p.search(text) for p in self._exact[name]
+            ):
+                found.add(name)
+        return found
+
+
+MATCHER = SignatureMatcher(
+    {
+        "xss": XSS_PATTERNS,
+        "sqli": SQLI_ERRORS,
+        "ssti": SSTI_PATTERNS,
+        "ssrf": SSRF_PATTERNS,
+    },
+    PREFILTER_LITERALS,
+)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 import re, httpx
 from yarl import URL
+from .scheduler import HostScheduler
+from .streaming import PROBE_BYTES, read_capped
 PRESIGN_PATTERNS=[re.compile(r"X-Amz-Signature=",re.I),re.compile(r"X-Goog-Signature=",re.I),re.compile(r"se=\d{10,}",re.I),re.compile(r"sig=",re.I)]
 class SignedURLChecker:
-    def __init__(self, client: httpx.AsyncClient, reporter, settings):
-        self.client=client; self.reporter=reporter; self.settings=settings
+    def __init__(self, client: httpx.AsyncClient, reporter, settings, scheduler: HostScheduler|None=None):
+        self.client=client; self.reporter=reporter; self.settings=settings; self.scheduler=scheduler or HostScheduler.from_settings(settings)
     async def run(self,endpoints:list[str]):
         for url in [u for u in endpoints if any(p.search(u) for p in PRESIGN_PATTERNS)]:
             await self._check(url)
@@ -13,14 +15,15 @@ class SignedURLChecker:
         stripped={k:v for k,v in q.items() if k.lower() not in {"x-amz-signature","x-goog-signature","sig"}}
         naked=str(u.with_query(stripped))
         try:
-            r=await self.client.get(naked)
+            async with self.scheduler.slot(naked): r=await read_capped(self.client,naked,PROBE_BYTES)
             if r.status_code==200:
                 await self.reporter.generic_finding("Signed URL Misuse — Signature Not Enforced", naked, f"Removing signature still returns 200. Original: {url}", f"curl -i '{naked}'")
         except Exception: pass
         if "se" in q:
             try:
                 ex=dict(q); ex["se"]=str(int(q["se"]) + 864000)
-                test=str(u.with_query(ex)); r2=await self.client.get(test)
+                test=str(u.with_query(ex))
+                async with self.scheduler.slot(test): r2=await read_capped(self.client,test,PROBE_BYTES)
                 if r2.status_code==200 and test!=url:
                     await self.reporter.generic_finding("Signed URL Misuse — Expiry Tampering", test, f"Increasing `se` maintained access. Original: {url}", f"curl -i '{test}'")
             except Exception: pass
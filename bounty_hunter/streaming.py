@@ -0,0 +1,133 @@
+"""Byte-capped streaming reads.
+
+Modules only ever look at the first few KB of a response, but ``r.text``
+pulls the whole body over the wire and decodes all of it.  :func:`read_capped`
+streams the body, keeps the first ``max_bytes`` and decodes only those, using
+the declared charset or UTF-8.
+
+Closing an HTTP/1.1 stream before its end makes httpx drop the pooled
+connection, so the next request pays a new TCP+TLS handshake.  When the rest
+of the body is small (a ``Content-Length`` within :data:`DRAIN_MAX_BYTES`, or
+a redirect) it is read and discarded instead, which returns the connection
+to the pool; larger bodies are still cut off.
+"""
+
+from __future__ import annotations
+
+import codecs
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+import httpx
+
+__all__ = ["CappedResponse", "DRAIN_MAX_BYTES", "PROBE_BYTES", "charset", "read_capped", "stream_capped"]
+
+# Unread body bytes worth draining to keep the connection reusable.
+DRAIN_MAX_BYTES = 64 * 1024
+# Body budget for probes that only look at the status line and headers.
+PROBE_BYTES = 1024
+
+
+def charset(headers: Mapping[str, str]) -> str:
+    """Declared charset of a response (normalised codec name), else UTF-8."""
+    ct = headers.get("content-type", "")
+    for part in ct.split(";")[1:]:
+        k, _, v = part.strip().partition("=")
+        if k.lower() == "charset" and v:
+            name = v.strip("\"' ")
+            try:
+                return codecs.lookup(name).name
+            except LookupError:
+                break
+    return "utf-8"
+
+
+@dataclass
+class CappedResponse:
+    """The parts of an ``httpx.Response`` the modules use, with a capped body."""
+
+    status_code: int
+    headers: httpx.Headers
+    url: httpx.URL
+    content: bytes
+    truncated: bool
+
+    @property
+    def encoding(self) -> str:
+        return charset(self.headers)
+
+    @property
+    def text(self) -> str:
+        # A multi-byte sequence cut by the cap decodes to U+FFFD, never an error.
+        return self.content.decode(self.encoding, errors="replace")
+
+
+async def stream_capped(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    max_bytes: int,
+    *,
+    headers: Optional[Mapping[str, str]] = None,
+    cookies: Optional[Mapping[str, str]] = None,
+    content: Optional[str | bytes] = None,
+) -> CappedResponse:
+    """Send a request and read at most ``max_bytes`` of the decoded body."""
+    buf = bytearray()
+    truncated = False
+    async with client.stream(
+        method, url, headers=headers, cookies=cookies, content=content
+    ) as r:
+        drain_until = None  # raw byte count at which draining gives up
+        async for chunk in r.aiter_bytes():
+            if drain_until is None:
+                room = max_bytes - len(buf)
+                if len(chunk) <= room:
+                    buf += chunk
+                    continue
+                buf += chunk[:room]
+                truncated = True
+                drain_until = _drain_limit(r)
+            if r.num_bytes_downloaded > drain_until:
+                break
+        # Leaving the context closes the stream; a fully read one goes back to the pool.
+        return CappedResponse(
+            status_code=r.status_code,
+            headers=r.headers,
+            url=r.url,
+            content=bytes(buf),
+            truncated=truncated,
+        )
+
+
+def _drain_limit(r: httpx.Response) -> int:
+    """Raw byte count up to which the rest of ``r`` is read just to keep the connection."""
+    done = r.num_bytes_downloaded
+    try:
+        length = int(r.headers.get("content-length", ""))
+    except ValueError:
+        length = None
+    if length is not None:
+        return length if length - done <= DRAIN_MAX_BYTES else -1
+    if 300 <= r.status_code < 400:
+        return done + DRAIN_MAX_BYTES  # redirect bodies are tiny but often chunked
+    return -1
+
+
+async def read_capped(
+    client: Any,
+    url: str,
+    max_bytes: int,
+    *,
+    method: str = "GET",
+    headers: Optional[Mapping[str, str]] = None,
+    cookies: Optional[Mapping[str, str]] = None,
+    content: Optional[str | bytes] = None,
+) -> CappedResponse:
+    """Capped read through ``client``; a caching client may serve it from cache."""
+    cached = getattr(client, "read_capped", None)
+    if cached is not None and method == "GET" and content is None:
+        return await cached(url, max_bytes, headers=headers, cookies=cookies)
+    return await stream_capped(
+        client, method, url, max_bytes, headers=headers, cookies=cookies, content=content
+    )
@@ -1,12 +1,70 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import sqlite3
+import time
+from pathlib import Path
+
 import httpx
 from yarl import URL
 
-__all__ = ["enumerate_subdomains"]
+__all__ = ["SubdomainCache", "enumerate_subdomains"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subdomain_sources (
+    apex TEXT NOT NULL,
+    source TEXT NOT NULL,
+    names TEXT NOT NULL,
+    fetched REAL NOT NULL,
+    PRIMARY KEY (apex, source)
+)
+"""
+
+
+class SubdomainCache:
+    """Enumeration results per apex domain and source, kept in SQLite under the report root.
+
+    Entries younger than the TTL are used instead of querying that source;
+    older ones are still returned when the source is unreachable, so a scan
+    without network access to it works from its last results.  Sources are
+    stored separately, so one failing source never makes a partial answer
+    look complete.
+    """
+
+    def __init__(self, path: str | Path, ttl_s: float = 86400):
+        self.path = Path(path)
+        self.ttl_s = float(ttl_s)
+        self.hits = 0
+        self.stale = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+
+    def get(self, apex: str, source: str, fresh: bool = True) -> list[str] | None:
+        row = self._db.execute(
+            "SELECT names, fetched FROM subdomain_sources WHERE apex=? AND source=?", (apex, source)
+        ).fetchone()
+        if row is None or (fresh and time.time() - row[1] > self.ttl_s):
+            return None
+        return json.loads(row[0])
 
-async def enumerate_subdomains(client: httpx.AsyncClient, targets: list[str]) -> list[str]:
+    def put(self, apex: str, source: str, names: set[str]) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO subdomain_sources VALUES (?,?,?,?)",
+            (apex, source, json.dumps(sorted(names)), time.time()),
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+async def enumerate_subdomains(
+    client: httpx.AsyncClient,
+    targets: list[str],
+    cache: SubdomainCache | None = None,
+) -> list[str]:
     """Enumerate subdomains for the supplied ``targets``.
 
     The routine performs lightweight lookups against two open data sources:
@@ -14,42 +72,70 @@ async def enumerate_subdomains(client: httpx.AsyncClient, targets: list[str]) ->
     * ``crt.sh`` – certificate transparency logs
     * ``dns.bufferover.run`` – the dataset used by Amass
 
+    With a ``cache``, each source is asked about a target domain at most once
+    per TTL.
     Results are returned as ``https`` base URLs for any discovered hosts.
     """
     sem = asyncio.Semaphore(20)
-    found: set[str] = set()
 
-    async def crt(domain: str) -> None:
+    async def crt(domain: str) -> set[str] | None:
         url = "https://crt.sh/"
         params = {"q": f"%.{domain}", "output": "json"}
         try:
             async with sem:
                 r = await client.get(url, params=params, timeout=10)
-                if r.status_code == 200:
-                    data = r.json()
-                    for entry in data:
-                        for name in entry.get("name_value", "").split("\n"):
-                            n = name.strip().lower()
-                            if n and "*" not in n and n.endswith(domain):
-                                found.add(n)
+                if r.status_code != 200:
+                    return None
+                found = set()
+                for entry in r.json():
+                    for name in entry.get("name_value", "").split("\n"):
+                        n = name.strip().lower()
+                        if n and "*" not in n and n.endswith(domain):
+                            found.add(n)
+                return found
         except Exception:
-            pass
+            return None
 
-    async def bufferover(domain: str) -> None:
+    async def bufferover(domain: str) -> set[str] | None:
         url = "https://dns.bufferover.run/dns"
         params = {"q": domain}
         try:
             async with sem:
                 r = await client.get(url, params=params, timeout=10)
-                if r.status_code == 200:
-                    data = r.json()
-                    for rec in data.get("FDNS_A", []) + data.get("RDNS", []):
-                        host = rec.split(",")[-1].strip().lower()
-                        if host and host.endswith(domain):
-                            found.add(host)
+                if r.status_code != 200:
+                    return None
+                data = r.json()
+                found = set()
+                for rec in data.get("FDNS_A", []) + data.get("RDNS", []):
+                    host = rec.split(",")[-1].strip().lower()
+                    if host and host.endswith(domain):
+                        found.add(host)
+                return found
         except Exception:
-            pass
+            return None
+
+    sources = {"crt.sh": crt, "bufferover": bufferover}
+
+    async def lookup(domain: str, source: str) -> list[str] | set[str]:
+        if cache is not None:
+            names = cache.get(domain, source)
+            if names is not None:
+                cache.hits += 1
+                return names
+        found = await sources[source](domain)
+        if cache is None:
+            return found or set()
+        if found is None:
+            # The source failed: fall back to whatever it answered before.
+            names = cache.get(domain, source, fresh=False)
+            if names is not None:
+                cache.stale += 1
+            return names or []
+        cache.put(domain, source, found)
+        return found
 
     domains = {URL(t).host for t in targets if URL(t).host}
-    await asyncio.gather(*(crt(d) for d in domains), *(bufferover(d) for d in domains))
+    found: set[str] = set()
+    for names in await asyncio.gather(*(lookup(d, src) for d in domains for src in sources)):
+        found.update(names)
     return [str(URL.build(scheme="https", host=d)) for d in sorted(found)]
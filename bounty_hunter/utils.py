@@ -1,11 +1,189 @@
 from __future__ import annotations
-import re
-from typing import Iterable
+import hashlib, json, math, os, re, sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 URL_RE = re.compile(r"https?://[\w.-]+(?:\:[0-9]+)?(?:/[\w\-./%?#=&+]*)?", re.I)
 
-def uniq(seq: Iterable[str]) -> list[str]:
-    seen=set(); out=[]
+def uniq(seq: Iterable[str], seen: Optional["SeenURLs"] = None) -> list[str]:
+    """Distinct items in order; with ``seen``, dedupe against (and record into) a :class:`SeenURLs`."""
+    if seen is not None:
+        return [s for s in seq if seen.add(s)]
+    seen_set=set(); out=[]
     for s in seq:
-        if s not in seen:
-            seen.add(s); out.append(s)
+        if s not in seen_set:
+            seen_set.add(s); out.append(s)
     return out
+
+
+def _hash_pair(key: bytes) -> Tuple[int, int]:
+    h = hashlib.blake2b(key, digest_size=16).digest()
+    return int.from_bytes(h[:8], "little"), int.from_bytes(h[8:], "little") | 1
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter over a ``bytearray`` (double hashing)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.m = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / self.capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def _positions(self, h1: int, h2: int) -> Iterator[int]:
+        m = self.m
+        return ((h1 + i * h2) % m for i in range(self.k))
+
+    def contains(self, h1: int, h2: int) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(h1, h2))
+
+    def insert(self, h1: int, h2: int) -> None:
+        bits = self.bits
+        for p in self._positions(h1, h2):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """Bloom filter that grows without exceeding ``error_rate`` overall.
+
+    When the current filter reaches capacity a new one is added with
+    ``growth`` times the capacity and half the error rate, so the compound
+    false-positive rate stays below ``error_rate`` (Almeida et al., 2007).
+    """
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 1e-4, growth: int = 2):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.filters: List[BloomFilter] = []
+
+    def __contains__(self, key: bytes) -> bool:
+        h1, h2 = _hash_pair(key)
+        return any(f.contains(h1, h2) for f in self.filters)
+
+    def add(self, key: bytes) -> bool:
+        """Insert ``key``; False if it was (probably) already present."""
+        h1, h2 = _hash_pair(key)
+        if any(f.contains(h1, h2) for f in self.filters):
+            return False
+        if not self.filters or self.filters[-1].full:
+            n = len(self.filters)
+            self.filters.append(
+                BloomFilter(self.initial_capacity * self.growth ** n, self.error_rate * 0.5 ** (n + 1))
+            )
+        self.filters[-1].insert(h1, h2)
+        return True
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(f.bits) for f in self.filters)
+
+
+# Directories interned before further ones are hashed verbatim.
+MAX_INTERNED_DIRS = 1 << 16
+
+
+class SeenURLs:
+    """Compact, approximate set of URLs for dedup at million-URL scale.
+
+    Origins (``scheme://host:port``) and the first :data:`MAX_INTERNED_DIRS`
+    directory paths are interned into small tables; the filter key is
+    ``origin id / dir id / leaf?query``, stored in a
+    :class:`ScalableBloomFilter`.  An unknown origin or directory is an
+    exact negative; otherwise a never-seen URL is reported as seen with
+    probability at most ``error_rate``.
+    """
+
+    def __init__(self, error_rate: float = 1e-4, capacity: int = 100_000):
+        self.origins: Dict[str, int] = {}
+        self.dirs: Dict[str, int] = {}
+        self.filter = ScalableBloomFilter(capacity, error_rate)
+
+    def _key(self, url: str, intern: bool) -> Optional[bytes]:
+        scheme, sep, rest = url.partition("://")
+        if not sep:
+            return b"\0" + url.encode()
+        host, _, path = rest.partition("/")
+        d, _, leaf = path.rpartition("/")
+        origin = f"{scheme}://{host}"
+        o = self.origins.get(origin)
+        if o is None:
+            if not intern:
+                return None
+            o = self.origins[origin] = len(self.origins)
+        di = self.dirs.get(d)
+        if di is None and len(self.dirs) < MAX_INTERNED_DIRS:
+            if not intern:
+                return None
+            di = self.dirs[d] = len(self.dirs)
+        # An un-interned directory is length-prefixed: it may itself contain ":".
+        tail = f"{di}" if di is not None else f"/{len(d)}/{d}"
+        return f"{o}:{tail}:{leaf}".encode()
+
+    def __contains__(self, url: str) -> bool:
+        key = self._key(url, intern=False)
+        return key is not None and key in self.filter
+
+    def add(self, url: str) -> bool:
+        """Record ``url``; True if it was not seen before."""
+        return self.filter.add(self._key(url, intern=True))
+
+    def update(self, urls: Iterable[str]) -> None:
+        for u in urls:
+            self.add(u)
+
+    def __len__(self) -> int:
+        return len(self.filter)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory: filter bits plus the intern tables."""
+        tables = sum(
+            sys.getsizeof(t) + sum(sys.getsizeof(k) for k in t) for t in (self.origins, self.dirs)
+        )
+        return self.filter.nbytes + tables
+
+
+def iter_endpoints(path: Path) -> Iterator[str]:
+    """Stream the URLs of an ``endpoints.json`` written one string per line (as the engine does)."""
+    with path.open(encoding="utf-8") as fh:
+        first = fh.readline()
+        if first.strip() != "[":
+            # Not line-oriented (hand-written or compact JSON): load it whole.
+            fh.seek(0)
+            yield from json.load(fh)
+            return
+        for line in fh:
+            line = line.strip().rstrip(",")
+            if line.startswith('"'):
+                yield json.loads(line)
+
+
+class EndpointsWriter:
+    """``endpoints.json`` written incrementally (one URL per line) and replaced atomically on close."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._fh = self._tmp.open("w", encoding="utf-8")
+        self._fh.write("[")
+        self.count = 0
+
+    def write(self, url: str) -> None:
+        self._fh.write(("\n  " if not self.count else ",\n  ") + json.dumps(url))
+        self.count += 1
+
+    def close(self) -> None:
+        self._fh.write("\n]\n" if self.count else "]\n")
+        self._fh.close()
+        os.replace(self._tmp, self.path)
@@ -0,0 +1,260 @@
+"""Chunk processing shared by in-process workers and ``bounty_hunter worker``.
+
+:func:`run_modules` runs the enabled modules over one chunk of endpoints.
+:func:`consume` drives it from a :class:`~bounty_hunter.workqueue.WorkQueue`
+(claim → process with a lease heartbeat → ack), and :func:`run_worker` is
+the standalone worker process: it takes module toggles from the
+coordinator's published config and sends findings back through Redis via
+:class:`RedisReporter`, so any number of processes or machines can drain
+the same queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import redis.asyncio as redis
+from rich.console import Console
+
+from .config import Settings
+from .fuzz import FuzzCoordinator
+from .llm import LLM
+from .redirects import RedirectChecker
+from .authchecks import AuthChecker
+from .oob import OOBSSRF
+from .signedurls import SignedURLChecker
+from .jwtcheck import JWTChecker
+from .access_control import AccessControl
+from .fingerprinter import Fingerprinter
+from .httpcache import CachedClient
+from .scheduler import HostScheduler, stage_var
+from .workqueue import Claim, WorkQueue
+
+__all__ = [
+    "MODULE_NAMES",
+    "RedisReporter",
+    "build_client",
+    "consume",
+    "replay",
+    "run_modules",
+    "run_worker",
+]
+
+console = Console()
+
+
+def build_client(settings: Settings) -> httpx.AsyncClient:
+    """The scanner's HTTP client: HTTP/2, pooled, retries, optional proxy."""
+    limits = httpx.Limits(
+        max_connections=settings.MAX_CONCURRENCY,
+        max_keepalive_connections=settings.MAX_CONCURRENCY,
+    )
+    transport = httpx.AsyncHTTPTransport(
+        retries=settings.RETRIES, http2=True, limits=limits
+    )
+    return httpx.AsyncClient(
+        http2=True,
+        limits=limits,
+        timeout=httpx.Timeout(settings.TIMEOUT_S),
+        transport=transport,
+        follow_redirects=False,
+        proxies=settings.PROXY_URL or None,
+    )
+
+
+class RedisReporter:
+    """ReportWriter stand-in that publishes findings to the coordinator."""
+
+    def __init__(self, queue: WorkQueue):
+        self.queue = queue
+
+    async def write_finding(self, f: Any, llm: LLM) -> None:
+        fields = dataclasses.asdict(f) if dataclasses.is_dataclass(f) else dict(vars(f))
+        await self.queue.publish({"kind": "finding", "fields": fields})
+
+    async def generic_finding(
+        self,
+        category: str,
+        endpoint: str,
+        evidence: str,
+        curl: str,
+        headers: str = "",
+        body: str = "",
+        cvss_vector: str = "",
+    ) -> None:
+        fields = {
+            "category": category,
+            "endpoint": endpoint,
+            "evidence": evidence,
+            "curl": curl,
+            "headers": headers,
+            "body": body,
+            "cvss_vector": cvss_vector,
+        }
+        await self.queue.publish({"kind": "generic", "fields": fields})
+
+
+async def replay(record: Dict[str, Any], reporter: Any, llm: LLM) -> None:
+    """Write a finding published by a :class:`RedisReporter` with the real reporter."""
+    if record.get("kind") == "finding":
+        await reporter.write_finding(SimpleNamespace(**record["fields"]), llm)
+    else:
+        await reporter.generic_finding(**record["fields"])
+
+
+# Testing modules in the order they run over a chunk.
+MODULE_NAMES = (
+    "fuzz",
+    "redirects",
+    "auth",
+    "signedurls",
+    "jwt",
+    "access_control",
+    "fingerprint",
+    "oob",
+)
+
+
+async def run_modules(
+    chunk: List[str],
+    modules: Dict[str, bool],
+    *,
+    client: httpx.AsyncClient,
+    probe_client: Any,
+    llm: LLM,
+    reporter: Any,
+    settings: Settings,
+    scheduler: HostScheduler,
+    only: Optional[List[str]] = None,
+    on_done: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> None:
+    """Run every enabled module (restricted to ``only``) over ``chunk``.
+
+    ``on_done(name)`` is awaited after each module finishes the chunk.
+    """
+
+    async def fingerprint() -> None:
+        for fp in await Fingerprinter(probe_client, settings, scheduler).run(chunk):
+            await reporter.generic_finding(
+                category=f"Fingerprint: {fp.product}",
+                endpoint=fp.endpoint,
+                evidence=(
+                    f"mmh3={fp.hash} headers="
+                    f"{dict(list(fp.headers.items())[:10])}\n{fp.notes}"
+                ),
+                curl=f"curl -i '{fp.endpoint}'",
+            )
+
+    runners: Dict[str, Callable[[], Awaitable[Any]]] = {
+        "fuzz": lambda: FuzzCoordinator(
+            client=client,
+            llm=llm,
+            reporter=reporter,
+            settings=settings,
+            scheduler=scheduler,
+        ).run(chunk),
+        "redirects": lambda: RedirectChecker(client, reporter, settings, scheduler).run(chunk),
+        "auth": lambda: AuthChecker(probe_client, reporter, settings, scheduler).run(chunk),
+        "signedurls": lambda: SignedURLChecker(client, reporter, settings, scheduler).run(chunk),
+        "jwt": lambda: JWTChecker(probe_client, reporter, settings, scheduler).run(chunk),
+        "access_control": lambda: AccessControl(probe_client, reporter, settings, scheduler).run(chunk),
+        "fingerprint": fingerprint,
+        "oob": lambda: OOBSSRF(client, reporter, settings, scheduler).run(chunk),
+    }
+    for name in MODULE_NAMES:
+        if not modules.get(name) or (only is not None and name not in only):
+            continue
+        await runners[name]()
+        if on_done is not None:
+            await on_done(name)
+
+
+async def consume(
+    queue: WorkQueue,
+    handle: Callable[[Claim], Awaitable[None]],
+    forever: bool = False,
+) -> None:
+    """Claim chunks from ``queue`` and ``handle`` them until it is drained.
+
+    The lease is renewed while a chunk is processed; a chunk whose handler
+    raises is logged and acknowledged so it cannot loop forever.  A chunk
+    whose lease expired and was requeued meanwhile is not acknowledged.  Expired
+    leases (dead workers) are requeued at most once per quarter timeout.
+    """
+    stage_var.set("modules")
+    heartbeat_s = max(1.0, queue.visibility_s / 3)
+    last_reap = 0.0
+    while True:
+        if time.monotonic() - last_reap >= queue.visibility_s / 4:
+            last_reap = time.monotonic()
+            if moved := await queue.requeue_stalled():
+                console.print(f"[yellow]Requeued {moved} stalled chunk(s)")
+        claim = await queue.claim(timeout=1)
+        if claim is None:
+            if not forever and await queue.drained():
+                return
+            continue
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(heartbeat_s)
+                await queue.extend(claim)
+
+        hb = asyncio.create_task(heartbeat())
+        try:
+            await handle(claim)
+        except Exception as e:
+            console.print(f"[red]worker:[/] chunk {claim.id}: {e}")
+        finally:
+            hb.cancel()
+        if not await queue.ack(claim):
+            console.print(f"[yellow]worker:[/] chunk {claim.id} was requeued before it finished; left to its new owner")
+
+
+async def run_worker(settings: Settings, forever: bool = False) -> None:
+    """Standalone worker process: drain ``BH_REDIS_QUEUE`` for a coordinator."""
+    rc = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    queue = WorkQueue(rc, settings.REDIS_QUEUE, settings.VISIBILITY_TIMEOUT_S)
+    while (config := await queue.config()) is None:
+        console.print("[yellow]Waiting for a coordinator to publish a scan…")
+        await asyncio.sleep(5)
+
+    async with build_client(settings) as client:
+        scheduler = HostScheduler.from_settings(settings)
+        scheduler.install(client)
+        probe_client = CachedClient.from_settings(client, settings)
+        llm = LLM.from_settings(settings)
+        reporter = RedisReporter(queue)
+
+        async def handle(claim: Claim) -> None:
+            # Re-read toggles so a long-lived worker follows the current scan.
+            modules = (await queue.config() or config)["modules"]
+
+            async def done(module: str) -> None:
+                # The coordinator journals completions for resume.
+                await queue.publish({"kind": "done", "module": module, "endpoints": claim.endpoints})
+
+            await run_modules(
+                claim.endpoints,
+                modules,
+                client=client,
+                probe_client=probe_client,
+                llm=llm,
+                reporter=reporter,
+                settings=settings,
+                scheduler=scheduler,
+                only=claim.modules,
+                on_done=done,
+            )
+
+        await asyncio.gather(
+            *(consume(queue, handle, forever) for _ in range(max(1, settings.WORKERS)))
+        )
+    done = await queue.done()
+    await rc.aclose()
+    console.print(f"[green]✔[/] Worker finished ({done} endpoints acknowledged)")
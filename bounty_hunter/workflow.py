@@ -16,12 +16,6 @@ class Navigation:
     target: str
     text: str | None = None
 
-@dataclass
-class HarvestResult:
-    endpoints: List[str]
-    forms: List[Form]
-    navigations: List[Navigation]
-
 @dataclass
 class Workflow:
     steps: List[Form | Navigation]
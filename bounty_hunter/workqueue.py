@@ -0,0 +1,209 @@
+"""Reliable Redis work queue shared by the coordinator and worker processes.
+
+Chunks are claimed with ``BLMOVE`` from the pending list onto a processing
+list and removed only when the worker acknowledges them, so a worker that
+dies mid-chunk does not lose it: each claim carries a lease in a hash, and
+once the lease expires any participant moves the chunk back to pending.
+Every claim gets its own lease token, and heartbeats and acks only act
+while the lease still carries it, so a slow worker whose chunk was requeued
+and claimed again cannot renew or acknowledge the new owner's claim.
+Findings and progress travel through shared keys under the same prefix.
+
+Keys (``<name>`` is ``BH_REDIS_QUEUE``)::
+
+    <name>             pending chunks (JSON envelopes)
+    <name>:processing  claimed, not yet acknowledged
+    <name>:leases      chunk id -> "<deadline epoch seconds> <lease token>"
+    <name>:findings    finding records published by workers
+    <name>:progress    endpoints acknowledged so far
+    <name>:config      scan configuration (module toggles) for workers
+    <name>:closed      set once the coordinator has enqueued everything
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import WatchError
+
+__all__ = ["Claim", "WorkQueue"]
+
+
+@dataclass
+class Claim:
+    id: str
+    endpoints: List[str]
+    payload: str
+    # Restrict the chunk to these modules (resume of partially tested endpoints)
+    modules: Optional[List[str]] = None
+    # Identifies this claim's lease; a later claim of the same chunk gets a new one
+    lease: str = ""
+
+
+def _lease(deadline: float, token: str) -> str:
+    return f"{deadline} {token}"
+
+
+def _parse_lease(raw: str) -> tuple[float, str]:
+    deadline, _, token = raw.partition(" ")
+    return float(deadline), token
+
+
+class WorkQueue:
+    def __init__(self, rc: redis.Redis, name: str, visibility_s: float = 300.0):
+        self.rc = rc
+        self.name = name
+        self.visibility_s = float(visibility_s)
+        self.processing = f"{name}:processing"
+        self.leases = f"{name}:leases"
+        self.findings = f"{name}:findings"
+        self.progress = f"{name}:progress"
+        self.config_key = f"{name}:config"
+        self.closed = f"{name}:closed"
+
+    # ----------------- coordinator side -----------------
+
+    async def reset(self, config: Dict[str, Any]) -> None:
+        """Drop any previous scan's keys and publish ``config`` for workers."""
+        await self.rc.delete(
+            self.name, self.processing, self.leases, self.findings,
+            self.progress, self.closed,
+        )
+        await self.rc.set(self.config_key, json.dumps(config))
+
+    async def push(self, endpoints: List[str], modules: Optional[List[str]] = None) -> None:
+        envelope: Dict[str, Any] = {"id": uuid.uuid4().hex, "endpoints": endpoints}
+        if modules is not None:
+            envelope["modules"] = modules
+        await self.rc.rpush(self.name, json.dumps(envelope))
+
+    async def close(self) -> None:
+        await self.rc.set(self.closed, "1")
+
+    async def backlog(self) -> int:
+        return int(await self.rc.llen(self.name))
+
+    async def collect(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Pop one published finding record (None on timeout)."""
+        item = await self.rc.blpop(self.findings, timeout=timeout)
+        return json.loads(item[1]) if item else None
+
+    async def collect_nowait(self) -> Optional[Dict[str, Any]]:
+        item = await self.rc.lpop(self.findings)
+        return json.loads(item) if item else None
+
+    # ----------------- worker side -----------------
+
+    async def config(self) -> Optional[Dict[str, Any]]:
+        raw = await self.rc.get(self.config_key)
+        return json.loads(raw) if raw else None
+
+    async def claim(self, timeout: float = 1.0) -> Optional[Claim]:
+        payload = await self.rc.blmove(self.name, self.processing, timeout, "LEFT", "RIGHT")
+        if payload is None:
+            return None
+        envelope = json.loads(payload)
+        claim = Claim(
+            id=envelope["id"],
+            endpoints=envelope["endpoints"],
+            payload=payload,
+            modules=envelope.get("modules"),
+            lease=uuid.uuid4().hex,
+        )
+        # We just moved the chunk, so this replaces at most a reaper's placeholder.
+        await self.rc.hset(self.leases, claim.id, _lease(time.time() + self.visibility_s, claim.lease))
+        return claim
+
+    async def _while_leased(self, claim: Claim, apply: Callable[[Any], None]) -> bool:
+        """Run ``apply(pipeline)`` atomically if ``claim`` still holds its lease."""
+        async with self.rc.pipeline(transaction=True) as p:
+            while True:
+                try:
+                    await p.watch(self.leases)
+                    raw = await p.hget(self.leases, claim.id)
+                    if raw is None or _parse_lease(raw)[1] != claim.lease:
+                        return False
+                    p.multi()
+                    apply(p)
+                    await p.execute()
+                    return True
+                except WatchError:
+                    continue  # another lease changed meanwhile; re-check ours
+
+    async def extend(self, claim: Claim) -> bool:
+        """Renew the lease on ``claim`` (workers heartbeat while processing).
+
+        False once the lease was lost, i.e. the chunk has been requeued.
+        """
+        deadline = time.time() + self.visibility_s
+        return await self._while_leased(
+            claim, lambda p: p.hset(self.leases, claim.id, _lease(deadline, claim.lease))
+        )
+
+    async def ack(self, claim: Claim) -> bool:
+        """Acknowledge ``claim``; False (and nothing removed) if its lease was lost."""
+
+        def apply(p: Any) -> None:
+            p.lrem(self.processing, 1, claim.payload)
+            p.hdel(self.leases, claim.id)
+            p.incrby(self.progress, len(claim.endpoints))
+
+        return await self._while_leased(claim, apply)
+
+    async def publish(self, record: Dict[str, Any]) -> None:
+        await self.rc.rpush(self.findings, json.dumps(record))
+
+    # ----------------- shared -----------------
+
+    async def requeue_stalled(self) -> int:
+        """Move chunks whose lease expired back to pending; returns how many.
+
+        The leases hash is WATCHed, so a chunk acknowledged (or requeued by
+        another participant) in the meantime is left alone.
+        """
+        moved = 0
+        async with self.rc.pipeline(transaction=True) as p:
+            try:
+                await p.watch(self.leases)
+                now = time.time()
+                leases = await p.hgetall(self.leases)
+                stalled, unleased = [], []
+                for payload in await p.lrange(self.processing, 0, -1):
+                    cid = json.loads(payload)["id"]
+                    raw = leases.get(cid)
+                    if raw is None:
+                        # Claimed but not leased yet (or the claimer died in between).
+                        unleased.append(cid)
+                    elif _parse_lease(raw)[0] < now:
+                        stalled.append((cid, payload))
+                if not stalled and not unleased:
+                    return 0
+                p.multi()
+                for cid in unleased:
+                    p.hsetnx(self.leases, cid, _lease(now + self.visibility_s, ""))
+                for cid, payload in stalled:
+                    p.lrem(self.processing, 1, payload)
+                    p.hdel(self.leases, cid)
+                    p.rpush(self.name, payload)
+                await p.execute()
+                moved = len(stalled)
+            except WatchError:
+                return 0
+        return moved
+
+    async def done(self) -> int:
+        return int(await self.rc.get(self.progress) or 0)
+
+    async def drained(self) -> bool:
+        """True once the coordinator closed the queue and nothing is pending or claimed."""
+        async with self.rc.pipeline(transaction=True) as p:
+            p.exists(self.closed)
+            p.llen(self.name)
+            p.llen(self.processing)
+            closed, pending, processing = await p.execute()
+        return bool(closed) and pending == 0 and processing == 0
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark: streaming lxml target extractor vs. BeautifulSoup trees.
+
+Compares speed and peak Python heap (tracemalloc) of ``extract_page`` with
+the BeautifulSoup code harvest and the JS miner used before, on synthetic
+pages of increasing size, and checks both produce the same result.  Links
+are resolved with ``join_url`` on both sides; only the parsing differs.
+
+Run from the repository root: ``python -m scripts.bench_extract``.
+"""
+from __future__ import annotations
+import argparse
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from bounty_hunter.parsers import extract_page, join_url
+from bounty_hunter.utils import URL_RE
+
+
+def legacy(content: bytes, encoding: str, base: str) -> tuple:
+    """Former harvest (full tree) plus JS-miner (second tree) extraction."""
+    html = content.decode(encoding, errors="replace")
+    urls = URL_RE.findall(html)
+    navs, forms = [], []
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup.find_all("a"):
+        v = tag.get("href")
+        if v and isinstance(v, str):
+            try:
+                u = join_url(base, v)
+                urls.append(u)
+                navs.append((u, tag.get_text(strip=True) or None))
+            except Exception:
+                pass
+    for tag in soup.find_all(["script", "link", "img"]):
+        for attr in ("href", "src"):
+            v = tag.get(attr)
+            if v and isinstance(v, str):
+                try:
+                    urls.append(join_url(base, v))
+                except Exception:
+                    pass
+    for form in soup.find_all("form"):
+        action = form.get("action") or base
+        method = (form.get("method") or "get").lower()
+        inputs = [i.get("name") for i in form.find_all(["input", "textarea", "select"]) if i.get("name")]
+        try:
+            action_url = join_url(base, action)
+        except Exception:
+            action_url = action
+        urls.append(action_url)
+        forms.append((action_url, method, inputs))
+    scripts = []
+    for s in BeautifulSoup(html, "lxml").find_all("script"):
+        src = s.get("src")
+        if src:
+            scripts.append(join_url(base, src))
+    return urls, navs, forms, scripts
+
+
+def page(n: int) -> bytes:
+    row = (
+        '<div class="card"><a href="item/{i}?ref=list"><b>Item</b> {i}</a>'
+        '<img src="img/{i}.png"><p>Lorem ipsum dolor sit amet, consectetur adipiscing '
+        'elit https://cdn.example.com/a/{i}.css</p></div>'
+    )
+    forms = "".join(
+        f'<form action="f{i}" method="POST"><input name="q{i}"><select name="s{i}"></select></form>'
+        for i in range(n // 100 + 1)
+    )
+    body = "".join(row.format(i=i) for i in range(n))
+    scripts = "".join(f'<script src="js/{i}.js"></script>' for i in range(n // 50 + 1))
+    return f"<html><head>{scripts}</head><body>{body}{forms}</body></html>".encode()
+
+
+def measure(fn, *args) -> tuple[float, float]:
+    tracemalloc.start()
+    t = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 40000])
+    args = p.parse_args()
+    base = "https://example.com/"
+    for n in args.rows:
+        content = page(n)
+        new = extract_page(content, "utf-8", base)
+        urls, navs, forms, scripts = legacy(content, "utf-8", base)
+        assert (new.urls, new.navs, new.forms, new.scripts) == (urls, navs, forms, scripts), n
+        old_t, old_m = measure(legacy, content, "utf-8", base)
+        new_t, new_m = measure(extract_page, content, "utf-8", base)
+        print(
+            f"{len(content) / 2**20:6.1f} MiB  bs4 {old_t * 1e3:7.0f}ms {old_m:7.1f}MiB  "
+            f"lxml-target {new_t * 1e3:7.0f}ms {new_m:7.1f}MiB  x{old_t / new_t:4.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Benchmark: ``SeenURLs`` vs. a ``set`` of URL strings for endpoint dedup.
+
+Inserts synthetic wildcard-program URLs (many hosts, REST paths with IDs,
+query strings) into both, and reports peak Python heap per million URLs
+(tracemalloc), insert time, and the measured false-positive rate of
+``SeenURLs`` on URLs that were never inserted.
+
+Run from the repository root: ``python -m scripts.bench_seen``.
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+import tracemalloc
+
+from bounty_hunter.utils import SeenURLs
+
+
+def urls(n: int, seed: int, hosts: int = 2000):
+    rnd = random.Random(seed)
+    words = ["api", "v1", "v2", "users", "orders", "items", "admin", "static", "search", "account"]
+    for i in range(n):
+        host = f"sub{rnd.randrange(hosts)}.example.com"
+        path = "/".join(rnd.choice(words) for _ in range(rnd.randint(1, 3)))
+        yield f"https://{host}/{path}/{rnd.randrange(10**7)}?page={rnd.randrange(100)}&s={seed}x{i}"
+
+
+def measure(make, n: int) -> tuple:
+    tracemalloc.start()
+    t = time.perf_counter()
+    s = make()
+    for u in urls(n, 1):
+        s.add(u)
+    elapsed = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return s, elapsed, peak
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--urls", type=int, default=1_000_000)
+    p.add_argument("--error-rate", type=float, default=1e-4)
+    p.add_argument("--probes", type=int, default=200_000)
+    args = p.parse_args()
+    per_m = 1_000_000 / args.urls
+    _, set_t, set_b = measure(set, args.urls)
+    seen, seen_t, seen_b = measure(lambda: SeenURLs(args.error_rate), args.urls)
+    fp = sum(u in seen for u in urls(args.probes, 2)) / args.probes
+    print(f"{args.urls} URLs inserted; memory scaled to per-million figures:")
+    print(f"  set       {set_b * per_m / 2**20:8.1f} MiB/M  {set_t:6.1f}s")
+    print(
+        f"  SeenURLs  {seen_b * per_m / 2**20:8.1f} MiB/M  {seen_t:6.1f}s  "
+        f"(filter {seen.filter.nbytes * per_m / 2**20:.1f} MiB/M, "
+        f"{len(seen.origins)} origins, {len(seen.dirs)} dirs interned)"
+    )
+    print(f"  false positives {fp:.2e} (target {args.error_rate:.0e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: combined signature matcher vs. per-pattern loops.
+
+Before timing anything, the combined matcher is checked against the legacy
+loops on crafted overlapping bodies and on random fragment soups.
+
+Run from the repository root: ``python -m scripts.bench_signatures``.
+"""
+from __future__ import annotations
+import argparse
+import random
+import string
+import timeit
+
+from bounty_hunter.signatures import (
+    MATCHER,
+    SQLI_ERRORS,
+    SSTI_PATTERNS,
+    XSS_PATTERNS,
+)
+
+
+def legacy(text: str) -> set[str]:
+    """The per-pattern loops previously inlined in ``FuzzCoordinator``."""
+    found = set()
+    if any(sig.search(text) for sig in XSS_PATTERNS):
+        found.add("xss")
+    if any(sig.search(text) for sig in SQLI_ERRORS):
+        found.add("sqli")
+    if any(sig.search(text) for sig in SSTI_PATTERNS):
+        found.add("ssti")
+    if ("169.254.169.254" in text) or ("127.0.0.1" in text) or ("localhost" in text):
+        found.add("ssrf")
+    return found
+
+
+def bodies(size: int) -> dict[str, str]:
+    rnd = random.Random(1)
+    words = ["<div class='row'>", "<p>", "</p>", "<a href='/x'>", "lorem", "ipsum", "data"]
+    clean = "".join(rnd.choice(words) + " " for _ in range(size // 6))[:size]
+    noise = "".join(rnd.choice(string.ascii_letters) for _ in range(size))
+    return {
+        "clean-html": clean,
+        "random": noise,
+        "xss-hit": clean[: size // 2] + "<xss>BHXSS</xss>" + clean[size // 2 :],
+        "sqli-hit": clean + " You have an error in your SQL syntax",
+    }
+
+
+# Bodies where one category's match overlaps another's.
+OVERLAPS = [
+    '<script data-x="SQL syntax">BHXSS</script>',
+    "SQL syntax BHXSS 7*7 localhost",
+    "{{7*7}} union select BHSTI",
+    '"BHXSS" ORA-00933 169.254.169.254',
+    "7 * 7",
+    "BHSTI",
+]
+FRAGMENTS = [
+    "BHXSS", "<script>", "</script>", "onerror=", '"', "SQL", " syntax", "union", " all", " select",
+    "PDO", "ora-", "12", "{{", "}}", "7", "*", " ", "BHSTI", "localhost", "127.0.0.1", "169.254.", "x",
+]
+
+
+def check(rounds: int = 20000) -> None:
+    """Fail if the combined matcher disagrees with the legacy loops."""
+    for text in OVERLAPS:
+        assert MATCHER.match(text) == legacy(text), text
+    rnd = random.Random(7)
+    for _ in range(rounds):
+        text = "".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(1, 12)))
+        if rnd.random() < 0.5:
+            text = text.upper()
+        assert MATCHER.match(text) == legacy(text), text
+        wanted = rnd.sample(sorted(MATCHER.categories), rnd.randint(1, 4))
+        assert MATCHER.match(text, wanted) == legacy(text) & set(wanted), (text, wanted)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--size", type=int, default=8000, help="body size in chars (fuzz reads 8000)")
+    p.add_argument("--number", type=int, default=2000)
+    args = p.parse_args()
+    check()
+    for name, text in bodies(args.size).items():
+        assert legacy(text) == MATCHER.match(text), name
+        old = timeit.timeit(lambda: legacy(text), number=args.number)
+        new = timeit.timeit(lambda: MATCHER.match(text), number=args.number)
+        per = 1e6 / args.number
+        print(f"{name:11} legacy {old * per:8.1f}us  combined {new * per:8.1f}us  x{old / new:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,28 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+from bounty_hunter.utils import SeenURLs, iter_endpoints
+
+
+def _endpoints(path: Path) -> Iterator[str]:
+    return iter_endpoints(path) if path.exists() else iter(())
 
 
 def diff_scope(prev: Path, curr: Path) -> Tuple[List[str], List[str]]:
-    """Return (added, removed) endpoints comparing prev to curr."""
-    prev_set = set(json.loads(prev.read_text())) if prev.exists() else set()
-    curr_set = set(json.loads(curr.read_text())) if curr.exists() else set()
-    added = sorted(curr_set - prev_set)
-    removed = sorted(prev_set - curr_set)
+    """Return (added, removed) endpoints comparing prev to curr.
+
+    Each side is streamed into a compact :class:`SeenURLs` rather than a set
+    of strings, so an endpoint can be missed from the diff with probability
+    at most its error rate.
+    """
+    prev_seen = SeenURLs()
+    prev_seen.update(_endpoints(prev))
+    curr_seen = SeenURLs()
+    added = sorted(u for u in _endpoints(curr) if curr_seen.add(u) and u not in prev_seen)
+    reported = SeenURLs()
+    removed = sorted(u for u in _endpoints(prev) if u not in curr_seen and reported.add(u))
     return added, removed
 
 